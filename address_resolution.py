@@ -0,0 +1,85 @@
+"""
+地址解析方式
+
+ARP_DYNAMIC: 每个接口运行 ARP，缓存 1s 后过期，持续有流量的链路每秒都要重新解析一次；
+ARP_GLOBAL:  使用 INET 的 GlobalArp，直接从全网接口表（即配置器按我们给定的地址配置的接口）
+             查询 MAC 地址，不发送任何 ARP 报文。
+
+estimate_arp_events 按链路数和仿真时长估算动态 ARP 额外产生的事件数（未经实测，显示时用 format_estimate
+标明是估算值），parse_event_count 从 Cmdenv 输出中读取实际事件数，用于比较两种方式并校准每次解析的事件数。
+"""
+import math
+import re
+from typing import Dict, Optional
+
+from topology import TopologySnapshot
+
+
+ARP_DYNAMIC = "dynamic"
+ARP_GLOBAL = "global"
+
+# 动态 ARP 的缓存过期时间（s），与原先写入 omnetpp.ini 的值相同
+ARP_CACHE_TIMEOUT = 1.0
+
+# 一次解析（请求 + 应答两个帧）在点对点以太网链路上产生的事件数，是假设值而不是测量值：
+# 每个帧约为 发送排队、开始发送、发送结束、接收 4 个事件，外加 ARP 模块处理请求和应答。
+# 用 benchmarks.py arp --parse-command ... 可以从实际事件数算出该值
+EVENTS_PER_RESOLUTION = 10
+
+_EVENT_PATTERN = re.compile(r"[Ee]vent #(\d+)")
+
+
+def ini_lines(mode: str) -> str:
+    """omnetpp.ini 中地址解析相关的配置"""
+    if mode == ARP_GLOBAL:
+        return '**.arp.typename = "GlobalArp"\n'
+    if mode == ARP_DYNAMIC:
+        return f"**.arp.cacheTimeout = {ARP_CACHE_TIMEOUT:g}s\n"
+    raise ValueError(f"未知的地址解析方式: {mode}")
+
+
+def task_duration(topology: TopologySnapshot) -> float:
+    """最后一个任务的产生时刻，作为流量持续时间的估计"""
+    latest = 0.0
+    for node in topology.user_nodes:
+        for task in getattr(node, "task_queue", ()):
+            latest = max(latest, float(task.get("任务产生的时刻", 0.0)))
+    return latest
+
+
+def estimate_arp_events(topology: TopologySnapshot, sim_time: Optional[float] = None,
+                        cache_timeout: float = ARP_CACHE_TIMEOUT,
+                        events_per_resolution: float = EVENTS_PER_RESOLUTION) -> Dict[str, float]:
+    """
+    估算动态 ARP 产生的事件数（上界：假设每条链路两个方向在整个仿真期间都有流量）
+
+    :param events_per_resolution: 每次解析的事件数，默认为假设值 EVENTS_PER_RESOLUTION，可换成实测值
+
+    返回:
+        dict: {"links", "sim_time", "resolutions", "events", "events_per_resolution"}
+    """
+    if sim_time is None:
+        sim_time = task_duration(topology) + cache_timeout
+    # 同一对节点之间的多条链路各自有独立的接口和 ARP 缓存
+    links = len(topology.channels)
+    resolutions = 2 * links * max(1, math.ceil(sim_time / cache_timeout))
+    return {
+        "links": links,
+        "sim_time": sim_time,
+        "resolutions": resolutions,
+        "events": round(resolutions * events_per_resolution),
+        "events_per_resolution": events_per_resolution,
+    }
+
+
+def format_estimate(estimate: Dict[str, float]) -> str:
+    """估算结果的说明文字，标明是估算值及其假设"""
+    return (f"{estimate['links']} 条链路、{estimate['sim_time']:g}s 内动态 ARP 约解析 {estimate['resolutions']} 次，"
+            f"约 {estimate['events']} 个事件（估算值：假设所有链路持续有流量、"
+            f"每次解析 {estimate['events_per_resolution']:g} 个事件，未经实测）")
+
+
+def parse_event_count(output: str) -> Optional[int]:
+    """从 Cmdenv 输出中取最后出现的事件编号（如 "... at t=10s, event #123456"）"""
+    matches = _EVENT_PATTERN.findall(output)
+    return int(matches[-1]) if matches else None
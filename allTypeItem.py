@@ -3,6 +3,7 @@ from PySide6.QtWidgets import QGraphicsItem, QMenu, QMessageBox
 from PySide6.QtGui import QPixmap, QAction
 from PySide6.QtCore import Qt, QObject, SignalInstance
 from nodeItem import NodeItem
+from load_badge import LoadBadgeItem
 from set_IPConfig_widget import IPConfigWidget
 from set_computingNode_widget import SetComputingNodeWidget
 
@@ -82,10 +83,14 @@ class ComputingNode(NodeItem):
         self.static_power = 1e-9 # 单位：nW
         self.price = 0.01 # 单位：元/s
         self.power_mix = 100 # 混合能源参数
+        # 仿真时显示的负载角标，首次有状态数据时创建
+        self.load_badge = None
 
     def __getstate__(self):
         # 调用父类的__getstate__方法获取节点的状态
         state = super().__getstate__()
+        # 负载角标只在仿真时显示，不保存
+        state.pop("load_badge", None)
         # 将算力节点特有的属性添加到状态中
         state["storage_space"] = self.storage_space
         state['computing_type'] = self.computing_type
@@ -109,6 +114,29 @@ class ComputingNode(NodeItem):
         self.price = state.get("price", 0.01)
         self.power_mix = state.get("power_mix", 100)
 
+    def show_load(self, queue_length, available_storage):
+        """
+        在图标右上角显示负载角标
+
+        :param queue_length: 任务队列长度
+        :param available_storage: 可用存储空间（GB）
+        """
+        if self.load_badge is None:
+            self.load_badge = LoadBadgeItem(self)
+            self.load_badge.setPos(self.boundingRect().width() - LoadBadgeItem.WIDTH / 2,
+                                   -LoadBadgeItem.HEIGHT / 2)
+        if self.storage_space and available_storage is not None:
+            storage_ratio = 1 - available_storage / self.storage_space
+        else:
+            storage_ratio = 0.0
+        self.load_badge.set_load(queue_length, storage_ratio)
+        self.load_badge.setVisible(True)
+
+    def hide_load(self):
+        """隐藏负载角标"""
+        if self.load_badge is not None:
+            self.load_badge.setVisible(False)
+
     def show_node_widget(self):
         self.widget = SetComputingNodeWidget(self)
         self.widget.ui.show()
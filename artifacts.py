@@ -0,0 +1,141 @@
+import os
+import json
+import hashlib
+import tempfile
+from typing import Dict, Optional, Union
+
+
+MANIFEST_NAME = ".artifact_hashes.json"
+
+# mkstemp 创建的文件权限为 0600，重命名前改为 open() 新建文件时的权限。
+# umask 只能通过设置来读取，在导入时读取一次，避免写入时与其他线程创建文件竞争
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_hash(path: str) -> Optional[str]:
+    """计算磁盘文件的哈希，文件不存在时返回 None"""
+    try:
+        with open(path, 'rb') as f:
+            return content_hash(f.read())
+    except OSError:
+        return None
+
+
+def atomic_write(path: str, data: bytes):
+    """先写入同目录下的临时文件再重命名，避免仿真程序读到写了一半的文件"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            if hasattr(os, "fchmod"):
+                os.fchmod(f.fileno(), 0o666 & ~_UMASK)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class ArtifactManifest:
+    """
+    生成产物的哈希清单
+
+    以项目目录下的 .artifact_hashes.json 记录每个产物的 sha256 及写入时的 (size, mtime_ns)。
+    文件大小和修改时间与记录一致时直接信任记录的哈希，否则重新计算磁盘文件的哈希，
+    因此手动修改过的文件也会被正确覆盖。
+    """
+
+    def __init__(self, project_dir: str):
+        self.project_dir = str(project_dir)
+        self.path = os.path.join(self.project_dir, MANIFEST_NAME)
+        # 相对路径 -> {"sha256", "size", "mtime_ns"}
+        self.entries: Dict[str, dict] = {}
+        self.written = []
+        self.unchanged = []
+        self.removed = []
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            if isinstance(entries, dict):
+                self.entries = entries
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def save(self):
+        atomic_write(self.path, json.dumps(self.entries, indent=1, sort_keys=True).encode('utf-8'))
+
+    def _relpath(self, path: str) -> str:
+        return os.path.relpath(os.path.abspath(path), os.path.abspath(self.project_dir)).replace(os.sep, '/')
+
+    def disk_hash(self, path: str) -> Optional[str]:
+        """磁盘上文件的哈希，优先使用清单记录"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        entry = self.entries.get(self._relpath(path))
+        if entry and entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+            return entry.get("sha256")
+        return file_hash(path)
+
+    def write_if_changed(self, path: str, content: Union[str, bytes]) -> bool:
+        """
+        内容与磁盘上的文件不同时才原子写入
+
+        返回:
+            bool: 实际写入返回 True
+        """
+        data = content.encode('utf-8') if isinstance(content, str) else content
+        digest = content_hash(data)
+        relpath = self._relpath(path)
+        if self.disk_hash(path) == digest:
+            self.unchanged.append(relpath)
+            self._record(path, relpath, digest)
+            return False
+        atomic_write(path, data)
+        self.written.append(relpath)
+        self._record(path, relpath, digest)
+        return True
+
+    def _record(self, path: str, relpath: str, digest: str):
+        stat = os.stat(path)
+        self.entries[relpath] = {"sha256": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def remove(self, path: str):
+        """删除产物文件及其记录"""
+        relpath = self._relpath(path)
+        if os.path.exists(path):
+            os.unlink(path)
+            self.removed.append(relpath)
+        self.entries.pop(relpath, None)
+
+    def report(self) -> dict:
+        return {"written": list(self.written), "unchanged": list(self.unchanged), "removed": list(self.removed)}
+
+
+def write_if_changed(path: str, content: Union[str, bytes], manifest: ArtifactManifest = None) -> bool:
+    """
+    内容变化时才原子写入文件
+
+    参数:
+        path: 目标文件路径
+        content: 文件内容
+        manifest: 产物哈希清单，为 None 时直接比较磁盘文件的哈希
+    """
+    if manifest is not None:
+        return manifest.write_if_changed(path, content)
+    data = content.encode('utf-8') if isinstance(content, str) else content
+    if file_hash(path) == content_hash(data):
+        return False
+    atomic_write(path, data)
+    return True
@@ -0,0 +1,235 @@
+"""
+生成流程的性能测试
+
+用法:
+    python benchmarks.py tasks --users 1000 --tasks 100
+    python benchmarks.py ned --compute-gateways 50 --computes 100 [--parse-command "opp_run ..."]
+    python benchmarks.py configurator --compute-gateways 50 --computes 50 [--parse-command "opp_run ..."]
+    python benchmarks.py arp --compute-gateways 50 --computes 50 [--parse-command "opp_run ..."]
+"""
+import os
+import json
+import time
+import shlex
+import shutil
+import argparse
+import tempfile
+import subprocess
+from types import SimpleNamespace
+
+import file_utils
+import address_resolution
+from topology import TopologySnapshot
+
+
+def make_user_nodes(user_count: int, tasks_per_user: int) -> list:
+    """构造只带任务队列的用户节点，字段与 set_task_widget 生成的任务一致"""
+    nodes = []
+    task_id = 0
+    for index in range(user_count):
+        task_queue = []
+        for i in range(tasks_per_user):
+            task_queue.append({
+                "任务编号": task_id,
+                "所属用户节点编号": index,
+                "任务产生的时刻": round(i * 0.01, 4),
+                "所需算力类型": i % 2,
+                "任务所需存储空间": 10 + i % 50,
+                "任务计算量": 1e9 + i,
+                "任务传输量": 1024 * (1 + i % 8),
+                "最大时延要求": 0.5,
+                "预算": 1.5,
+            })
+            task_id += 1
+        nodes.append(SimpleNamespace(nodetype="UserNode", index=index, task_queue=task_queue))
+    return nodes
+
+
+def _serial_baseline(nodes: list, project_dir: str):
+    """原先的写法：逐个用户串行翻译字段并以 indent=2 写文件"""
+    output_dir = os.path.join(project_dir, file_utils.TASK_DIR_NAME)
+    os.makedirs(output_dir, exist_ok=True)
+    for node in nodes:
+        tasks_data = []
+        for task in node.task_queue:
+            tasks_data.append({en: task[zh] for en, zh in file_utils.TASK_FIELDS})
+        with open(os.path.join(output_dir, f"tasks_user_{node.index}.json"), 'w', encoding='utf-8') as f:
+            json.dump(tasks_data, f, indent=2, ensure_ascii=False)
+
+
+def bench_task_writer(user_count: int, tasks_per_user: int, repeat: int = 3) -> dict:
+    """
+    比较各种任务输出方式的吞吐量
+
+    返回:
+        dict: 方式名称 -> 每秒写出的任务数（取多次运行中的最好成绩）
+    """
+    nodes = make_user_nodes(user_count, tasks_per_user)
+    total_tasks = user_count * tasks_per_user
+    cases = {
+        "serial(indent=2)": lambda d: _serial_baseline(nodes, d),
+        "per_user(indent=2)": lambda d: file_utils.TaskWriter(nodes, d, compact=False).write(),
+        "per_user(compact)": lambda d: file_utils.TaskWriter(nodes, d).write(),
+        "consolidated(jsonl)": lambda d: file_utils.TaskWriter(
+            nodes, d, mode=file_utils.TaskWriter.CONSOLIDATED).write(),
+    }
+    results = {}
+    for name, case in cases.items():
+        best = float("inf")
+        for _ in range(repeat):
+            # 每次写入新目录，避免内容哈希命中后跳过写入
+            project_dir = tempfile.mkdtemp(prefix="bench_tasks_")
+            try:
+                start = time.perf_counter()
+                case(project_dir)
+                best = min(best, time.perf_counter() - start)
+            finally:
+                shutil.rmtree(project_dir, ignore_errors=True)
+        results[name] = total_tasks / best
+        print(f"{name:<22}{best:>10.3f}s{results[name]:>14.0f} 任务/s")
+    return results
+
+
+# 比较生成方式时统计的产物
+PROJECT_FILES = ("network.ned", "omnetpp.ini", "config.xml", file_utils.CONFIGURATOR_FILE)
+
+
+def make_topology(params):
+    """按参数生成拓扑并分配地址，返回 (模型, 拓扑快照)"""
+    from topology_generator import generate_topology
+    from ip_allocator import allocate_addresses
+
+    model = generate_topology(params)
+    allocate_addresses(model.nodes, model.channels)
+    topology = TopologySnapshot(model.nodes, model.channels)
+    interfaces = sum(len(neighbours) for neighbours in topology.neighbours.values())
+    print(f"节点 {len(model.nodes)} 个，链路 {len(model.channels)} 条，接口 {interfaces} 个")
+    return model, topology
+
+
+def compare_generation_modes(model, topology, modes: dict, parse_command: str = None) -> dict:
+    """
+    用不同的 generate_project 参数生成同一拓扑，比较文件大小和耗时
+
+    :param modes: 模式名称 -> generate_project 的关键字参数，第一个模式作为基准
+    :param parse_command: 可选，在每种输出的目录中执行的命令（如 opp_run ... --sim-time-limit=0s），
+                          用于测量 OMNeT++ 读取 NED / ini / xml 并完成初始化的耗时
+    返回:
+        dict: 模式 -> {文件名: 字节数, "render": 生成耗时, "parse": 命令耗时}
+    """
+    results = {}
+    for mode, options in modes.items():
+        project_dir = tempfile.mkdtemp(prefix="bench_project_")
+        try:
+            start = time.perf_counter()
+            file_utils.generate_project(project_dir, os.path.basename(project_dir), model.nodes, model.channels,
+                                        topology=topology, **options)
+            result = {"render": time.perf_counter() - start}
+            for name in PROJECT_FILES:
+                path = os.path.join(project_dir, name)
+                result[name] = os.path.getsize(path) if os.path.exists(path) else 0
+            if parse_command:
+                start = time.perf_counter()
+                completed = subprocess.run(shlex.split(parse_command), cwd=project_dir, check=False,
+                                           stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                           text=True, errors="replace")
+                result["parse"] = time.perf_counter() - start
+                events = address_resolution.parse_event_count(completed.stdout)
+                if events is not None:
+                    result["events"] = events
+            results[mode] = result
+        finally:
+            shutil.rmtree(project_dir, ignore_errors=True)
+
+    names = list(results)
+    base = results[names[0]]
+    print(f"{'':<18}" + "".join(f"{name:>16}" for name in names))
+    for key in PROJECT_FILES + ("render", "parse", "events"):
+        if key not in base:
+            continue
+        if key == "events":
+            cells = "".join(f"{results[name][key]:>16d}" for name in names)
+        elif key in ("render", "parse"):
+            cells = "".join(f"{results[name][key]:>15.3f}s" for name in names)
+        else:
+            cells = "".join(f"{results[name][key]:>15d}B" for name in names)
+        print(f"{key:<18}{cells}")
+    return results
+
+
+def bench_compact_modules(params, parse_command: str = None) -> dict:
+    """比较逐个节点输出和紧凑输出（子模块向量 + 通配规则）"""
+    model, topology = make_topology(params)
+    return compare_generation_modes(model, topology, {
+        "逐个节点": {"compact_modules": False, "external_configurator": False},
+        "紧凑": {"compact_modules": True, "external_configurator": False},
+    }, parse_command)
+
+
+def bench_configurator(params, parse_command: str = None) -> dict:
+    """比较内联 xml() 表达式和外部 configurator.xml"""
+    model, topology = make_topology(params)
+    return compare_generation_modes(model, topology, {
+        "内联xml()": {"compact_modules": False, "external_configurator": False},
+        "外部xmldoc()": {"compact_modules": False, "external_configurator": True},
+        "外部+紧凑": {"compact_modules": True, "external_configurator": True},
+    }, parse_command)
+
+
+def bench_address_resolution(params, parse_command: str = None) -> dict:
+    """
+    比较动态 ARP 和全局地址解析
+    给出 parse_command（如 opp_run -u Cmdenv ... --sim-time-limit=10s）时从 Cmdenv 输出读取实际事件数，
+    否则只给出估算值
+    """
+    model, topology = make_topology(params)
+    estimate = address_resolution.estimate_arp_events(topology)
+    print(address_resolution.format_estimate(estimate))
+    results = compare_generation_modes(model, topology, {
+        "动态ARP": {"arp_mode": address_resolution.ARP_DYNAMIC},
+        "全局地址解析": {"arp_mode": address_resolution.ARP_GLOBAL},
+    }, parse_command)
+    dynamic, global_ = results["动态ARP"].get("events"), results["全局地址解析"].get("events")
+    if dynamic and global_ is not None:
+        print(f"实际事件数减少 {dynamic - global_}（{1 - global_ / dynamic:.1%}）")
+        # 实际运行的仿真时长与估算时不同时，每次解析的事件数只能作为参考
+        print(f"按估算的解析次数折合每次解析 {(dynamic - global_) / estimate['resolutions']:.1f} 个事件"
+              f"（估算时假设为 {address_resolution.EVENTS_PER_RESOLUTION}）")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="算力网络仿真生成流程性能测试")
+    subparsers = parser.add_subparsers(dest="bench", required=True)
+
+    tasks_parser = subparsers.add_parser("tasks", help="任务需求文件写入吞吐量")
+    tasks_parser.add_argument("--users", type=int, default=1000, help="用户节点数量")
+    tasks_parser.add_argument("--tasks", type=int, default=100, help="每个用户节点的任务数量")
+    tasks_parser.add_argument("--repeat", type=int, default=3, help="重复次数")
+
+    topology_benches = {
+        "ned": ("紧凑输出模式的文件大小和解析耗时", bench_compact_modules),
+        "configurator": ("外部配置器文件的文件大小和启动耗时", bench_configurator),
+        "arp": ("动态 ARP 与全局地址解析的事件数", bench_address_resolution),
+    }
+    for name, (help_text, _) in topology_benches.items():
+        topology_parser = subparsers.add_parser(name, help=help_text)
+        topology_parser.add_argument("--k", type=int, default=4, help="fat-tree 端口数")
+        topology_parser.add_argument("--compute-gateways", type=int, default=50)
+        topology_parser.add_argument("--computes", type=int, default=50, help="每个算力网关下的算力节点数量")
+        topology_parser.add_argument("--user-gateways", type=int, default=50)
+        topology_parser.add_argument("--users", type=int, default=50, help="每个用户网关下的用户节点数量")
+        topology_parser.add_argument("--parse-command", default=None,
+                                     help="在生成目录中执行并计时的命令，例如 opp_run 的 --sim-time-limit=0s 运行")
+
+    args = parser.parse_args()
+    if args.bench in topology_benches:
+        from topology_generator import TopologyParams
+        topology_benches[args.bench][1](TopologyParams(fat_tree_k=args.k, compute_gateways=args.compute_gateways,
+                                                       computes_per_gateway=args.computes,
+                                                       user_gateways=args.user_gateways,
+                                                       users_per_gateway=args.users),
+                                        args.parse_command)
+    elif args.bench == "tasks":
+        print(f"用户节点 {args.users} 个，每个 {args.tasks} 个任务")
+        bench_task_writer(args.users, args.tasks, args.repeat)
@@ -0,0 +1,218 @@
+"""
+命令行流程：读取保存的算网环境 -> 检查拓扑 -> 生成配置文件 -> 运行仿真 -> 导出结果
+
+不导入 PySide6，不创建任何窗口，可以在没有显示器的计算集群上运行。
+
+用法:
+    python cli.py network_data.pickle --omnetpp-dir ~/omnetpp-5.6.2 --project-name mytest
+    python cli.py network_data.pickle --project-dir /path/to/project --generate-only
+    python cli.py network_data.pickle --omnetpp-dir ~/omnetpp-5.6.2 --project-name mytest \\
+        --routing static --arp global --export results.xlsx
+    python cli.py network_data.pickle --project-dir /path/to/project --partitions 4 --generate-only
+
+配置文件和仿真程序都未变化时直接从结果缓存（见 result_cache）取得输出，--no-cache 总是运行仿真。
+
+使用仿真程序替身（不需要 OMNeT++）:
+    CPN_SIMULATOR="python3 fake_simulator.py" python cli.py network_data.pickle --omnetpp-dir . --project-dir /tmp/p
+"""
+import os
+import sys
+import time
+import argparse
+
+import file_utils
+from topology import TopologySnapshot
+from topology_model import load_project
+from topology_validator import validate_topology, format_issues, ERROR
+from address_resolution import task_duration
+from sim_process import (SimulationProcess, RunLimits, opp_run_command, check_simulator, check_runnable, STDERR,
+                         END_COMPLETED, END_REASON_TEXT)
+from sim_progress import CmdenvProgress, PROGRESS_FILE
+from resource_profile import PROFILE_FILE, DEFAULT_INTERVAL, profile_summary, format_summary
+from result_cache import ResultCache, run_key
+
+# 退出码
+EXIT_OK = 0
+EXIT_SIMULATION_FAILED = 1
+EXIT_INVALID_TOPOLOGY = 2
+EXIT_USAGE = 3
+
+# 输出不是终端（例如集群作业的日志）时，进度的输出间隔（s）
+LOG_PROGRESS_INTERVAL = 10.0
+
+
+def project_directory(omnetpp_dir: str, project_name: str) -> str:
+    """与路径配置对话框相同的项目目录位置"""
+    return os.path.join(omnetpp_dir, "samples", "inet", "examples", "computing_power_network", project_name)
+
+
+def generation_options(args, topology: TopologySnapshot) -> dict:
+    """按命令行参数组装 file_utils.generate_project 的参数（与界面菜单中的选项对应）"""
+    sharding = file_utils.SHARD_BALANCED if args.sharding == "balanced" else file_utils.SHARD_NEAREST
+    partitioning = None
+    if args.partitions > 1:
+        partitioning = file_utils.partition_topology(topology, args.partitions)
+    return dict(topology=topology,
+                routing=file_utils.ROUTING_STATIC if args.routing == "static" else file_utils.ROUTING_OSPF,
+                arp_mode=file_utils.ARP_GLOBAL if args.arp == "global" else file_utils.ARP_DYNAMIC,
+                assignment=file_utils.assign_schedulers(topology, sharding),
+                partitioning=partitioning,
+                run_mode=file_utils.RUN_REALTIME if args.realtime else file_utils.RUN_BATCH,
+                task_mode=file_utils.TaskWriter.CONSOLIDATED if args.task_format == "jsonl"
+                else file_utils.TaskWriter.PER_USER)
+
+
+def run_simulation(omnetpp_dir: str, project_dir: str, config: str, expected_sim_time: float,
+                   verbose: bool = False, cache: ResultCache = None, limits: RunLimits = None,
+                   profile_interval: float = DEFAULT_INTERVAL) -> bool:
+    """运行仿真直到结束，进度输出到 stderr，正常结束时返回 True"""
+    error = check_runnable(project_dir)
+    if error:
+        print(error, file=sys.stderr)
+        return False
+    command, env = opp_run_command(omnetpp_dir, project_dir, config)
+    key = None
+    if cache is not None:
+        key = run_key(project_dir, command)
+        if cache.restore(key, project_dir) is not None:
+            print(f"配置与仿真程序未变化，输出取自结果缓存 {key[:12]}")
+            return True
+    progress = CmdenvProgress(expected_sim_time)
+    # 终端中在同一行刷新进度，写入日志时按固定间隔输出一行
+    interactive = sys.stderr.isatty()
+    last_printed = [0.0]
+
+    def on_output(stream, line):
+        if stream == STDERR:
+            print(line, file=sys.stderr)
+            return
+        if verbose:
+            print(line)
+        if not progress.feed(line) or verbose:
+            return
+        if interactive:
+            print(f"\r{progress.status_text():<80}", end="", file=sys.stderr, flush=True)
+        elif time.monotonic() - last_printed[0] >= LOG_PROGRESS_INTERVAL:
+            last_printed[0] = time.monotonic()
+            print(progress.status_text(), file=sys.stderr, flush=True)
+
+    process = SimulationProcess(command, project_dir, env, on_output=on_output, limits=limits,
+                                profile_interval=profile_interval)
+    print(f"启动仿真: {' '.join(command)}")
+    process.start()
+    try:
+        returncode = process.wait()
+    except KeyboardInterrupt:
+        print("\n正在结束仿真……", file=sys.stderr)
+        returncode = process.terminate()
+    if interactive and progress.samples and not verbose:
+        print(file=sys.stderr)
+    progress.save(os.path.join(project_dir, PROGRESS_FILE))
+    process.save_profile(os.path.join(project_dir, PROFILE_FILE))
+    summary = profile_summary(os.path.join(project_dir, PROFILE_FILE))
+    if summary is not None:
+        print("资源占用：" + "，".join(f"{name} {value}" for name, value in format_summary(summary)))
+    completed = process.end_reason == END_COMPLETED
+    print(f"仿真程序已退出（{END_REASON_TEXT[process.end_reason]}），退出码 {returncode}，用时 {process.elapsed:.1f}s",
+          file=sys.stdout if completed else sys.stderr)
+    if completed and cache is not None:
+        cache.store(key, project_dir, elapsed=process.elapsed)
+    return completed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="不依赖图形界面运行算力网络仿真")
+    parser.add_argument("project_file", help="界面保存的算网环境文件（.pickle）")
+    parser.add_argument("--omnetpp-dir", help="OMNeT++ 根目录")
+    parser.add_argument("--project-name", help="项目名，项目目录为 <OMNeT++>/samples/inet/examples/"
+                                               "computing_power_network/<项目名>")
+    parser.add_argument("--project-dir", help="直接指定项目目录（项目名取目录名）")
+    parser.add_argument("--config", default="static", help="omnetpp.ini 中的配置名")
+    parser.add_argument("--routing", choices=["ospf", "static"], default="ospf")
+    parser.add_argument("--arp", choices=["dynamic", "global"], default="dynamic")
+    parser.add_argument("--sharding", choices=["nearest", "balanced"], default="nearest")
+    parser.add_argument("--task-format", choices=["per-user", "jsonl"], default="per-user",
+                        help="任务需求文件：每个用户节点一个 JSON，或全部写入一个 tasks.jsonl（仿真程序需支持读取）")
+    parser.add_argument("--realtime", action="store_true", help="使用实时调度器（仿真时间与真实时间同步）")
+    parser.add_argument("--partitions", type=int, default=1, help="并行仿真分区数，1 表示顺序仿真；大于 1 时只能与 --generate-only 一起使用")
+    parser.add_argument("--ignore-warnings", action="store_true", help="拓扑检查有警告时仍继续（错误总是中止）")
+    parser.add_argument("--generate-only", action="store_true", help="只生成配置文件，不运行仿真")
+    parser.add_argument("--export", metavar="PATH", help="把 results.json 导出为 .csv 或 .xlsx")
+    parser.add_argument("--timeout", type=float, metavar="SECONDS", help="墙钟时间限制，超出时结束仿真")
+    parser.add_argument("--cpu-time", type=float, metavar="SECONDS", help="CPU 时间限制（Linux）")
+    parser.add_argument("--memory", type=int, metavar="MB", help="仿真程序的内存限制（Linux）")
+    parser.add_argument("--profile-interval", type=float, default=DEFAULT_INTERVAL, metavar="SECONDS",
+                        help="CPU 和内存的采样间隔，0 表示不采样（需要 psutil）")
+    parser.add_argument("--no-cache", action="store_true", help="不使用结果缓存，总是运行仿真")
+    parser.add_argument("--verbose", action="store_true", help="输出仿真程序的全部 stdout")
+    args = parser.parse_args(argv)
+
+    if args.project_dir:
+        project_dir = os.path.normpath(args.project_dir)
+    elif args.omnetpp_dir and args.project_name:
+        project_dir = project_directory(args.omnetpp_dir, args.project_name)
+    else:
+        parser.error("需要指定 --project-dir，或同时指定 --omnetpp-dir 和 --project-name")
+    project_name = os.path.basename(project_dir)
+    if not args.generate_only and not args.omnetpp_dir:
+        parser.error("运行仿真需要指定 --omnetpp-dir")
+    if args.partitions < 1:
+        parser.error("--partitions 必须大于 0")
+    if args.partitions > 1 and not args.generate_only:
+        parser.error("并行仿真配置只能生成，--partitions 大于 1 时需要指定 --generate-only")
+    if args.partitions > 1 and args.arp == "global":
+        parser.error("并行仿真不能使用全局地址解析（--arp global）")
+
+    # 读取
+    model = load_project(args.project_file)
+    topology = TopologySnapshot(model.nodes, model.channels)
+    print(f"已读取 {args.project_file}：节点 {len(model.nodes)} 个，链路 {len(model.channels)} 条")
+
+    # 检查
+    issues = validate_topology(model.nodes, model.channels, topology)
+    if issues:
+        print(format_issues(issues), file=sys.stderr)
+    if any(issue.level == ERROR for issue in issues):
+        return EXIT_INVALID_TOPOLOGY
+    if issues and not args.ignore_warnings and not args.generate_only:
+        print("拓扑检查有警告，使用 --ignore-warnings 继续", file=sys.stderr)
+        return EXIT_INVALID_TOPOLOGY
+
+    # 生成
+    os.makedirs(project_dir, exist_ok=True)
+    options = generation_options(args, topology)
+    report = file_utils.generate_project(project_dir, project_name, model.nodes, model.channels, **options)
+    print(f"配置文件已生成：重写 {len(report['written'])} 个，"
+          f"未变化 {len(report['unchanged'])} 个，删除 {len(report['removed'])} 个")
+    for line in options["assignment"].report():
+        print(f"调度分片 {line}")
+    if options["partitioning"] is not None:
+        for line in options["partitioning"].report():
+            print(f"并行仿真 {line}")
+    if args.generate_only:
+        return EXIT_OK
+
+    # 运行
+    error = check_simulator(args.omnetpp_dir)
+    if error:
+        print(error, file=sys.stderr)
+        return EXIT_USAGE
+    file_utils.clean_simulator_outputs(project_dir)
+    limits = RunLimits(wall_time=args.timeout, cpu_time=args.cpu_time,
+                       memory=args.memory * 2 ** 20 if args.memory else None)
+    if not run_simulation(args.omnetpp_dir, project_dir, args.config, task_duration(topology),
+                          args.verbose, None if args.no_cache else ResultCache(), limits,
+                          args.profile_interval):
+        return EXIT_SIMULATION_FAILED
+
+    # 导出
+    if args.export:
+        # pandas 只在导出时需要
+        from result_output import export_simulation_results, FULL_EXPORT_CONFIG
+        export_simulation_results(os.path.join(project_dir, "results.json"), FULL_EXPORT_CONFIG, args.export)
+        print(f"结果已导出到 {args.export}")
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
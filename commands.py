@@ -1,4 +1,5 @@
 from PySide6.QtGui import QUndoCommand
+from PySide6.QtWidgets import QGraphicsScene
 from channel import Channel
 
 
@@ -420,4 +421,183 @@ class CutCommand(QUndoCommand):
             self.window.scene.addItem(channel)
             self.window.channels.append(channel)
             start_item.channelList.append(channel)
-            end_item.channelList.append(channel)
\ No newline at end of file
+            end_item.channelList.append(channel)
+
+class GenerateTopologyCommand(QUndoCommand):
+    """
+    把 topology_generator 生成的拓扑一次性放到画布上，整体作为一条撤销记录
+
+    插入期间关闭视图刷新、场景索引和 channelList 的回调，
+    全部节点和链路加入后再统一刷新路由器的 ip_dict / mask_dict，
+    避免逐个添加时每次都触发重绘、BSP 树更新和字典重建。
+    """
+
+    # 不从数据对象复制到画布节点的属性
+    SKIPPED_ATTRIBUTES = ("index", "name", "x", "y", "channelList", "ip_dict", "mask_dict")
+
+    def __init__(self, window, model):
+        super().__init__()
+        self.window = window
+        self.model = model
+        self.new_nodes = []
+        self.new_channels = []
+        self.saved_index_dict = None
+        self.setText(f"生成拓扑（{len(model.nodes)}个节点，{len(model.channels)}条链路）")
+
+    def materialize(self):
+        """根据数据对象创建画布节点和链路（只在第一次执行时调用）"""
+        window = self.window
+        item_of = {}
+        for record in self.model.nodes:
+            display_name = window.type_to_name(record.nodetype)
+            node = window.createNewItemByType(record.nodetype, display_name, record.index,
+                                              f"icon/{display_name}.png")
+            node.setPos(record.x, record.y)
+            for key, value in vars(record).items():
+                if key not in self.SKIPPED_ATTRIBUTES and hasattr(node, key):
+                    setattr(node, key, value)
+            node.delete_self.connect(window.remove_node)
+            item_of[record] = node
+            self.new_nodes.append(node)
+
+        for record in self.model.channels:
+            start_item = item_of[record.start_item]
+            end_item = item_of[record.end_item]
+            start_item.interface_counter += 1
+            end_item.interface_counter += 1
+            start_item.interface_id_to_object.append(
+                [start_item.interface_counter, type(end_item), end_item.index])
+            end_item.interface_id_to_object.append(
+                [end_item.interface_counter, type(start_item), start_item.index])
+
+            channel = Channel(start_item, end_item)
+            channel.bandwidth = record.bandwidth
+            channel.banddelay = record.banddelay
+            channel.delete_self.connect(window.remove_channel)
+            self.new_channels.append((channel, start_item, end_item))
+
+        # 地址已由生成器或 IP 分配器写入数据对象时，一并换成画布节点作为键
+        self.address_dicts = {}
+        for record in self.model.nodes:
+            if hasattr(record, "ip_dict"):
+                self.address_dicts[item_of[record]] = (
+                    {item_of[another]: ip for another, ip in record.ip_dict.items()},
+                    {item_of[another]: mask for another, mask in record.mask_dict.items()},
+                )
+
+    def redo(self):
+        window = self.window
+        if not self.new_nodes:
+            self.materialize()
+        self.saved_index_dict = dict(window.indexDict)
+
+        view = window.ui.graphicsView
+        scene = window.scene
+        view.setUpdatesEnabled(False)
+        index_method = scene.itemIndexMethod()
+        scene.setItemIndexMethod(QGraphicsScene.NoIndex)
+        try:
+            for node in self.new_nodes:
+                node.channelList.unlock()
+                scene.addItem(node)
+                window.nodes.append(node)
+                window.typeNumDict[node.nodetype] += 1
+                if node.index > window.indexDict[node.nodetype]:
+                    window.indexDict[node.nodetype] = node.index
+
+            for channel, start_item, end_item in self.new_channels:
+                scene.addItem(channel)
+                window.channels.append(channel)
+                start_item.channelList.append(channel)
+                end_item.channelList.append(channel)
+
+            for node in self.new_nodes:
+                node.channelList.lock()
+                if node in self.address_dicts:
+                    node.update_dicts()
+                    ip_dict, mask_dict = self.address_dicts[node]
+                    for another, ip in ip_dict.items():
+                        if ip is not None:
+                            node.ip_dict[another] = ip
+                            node.mask_dict[another] = mask_dict.get(another)
+        finally:
+            scene.setItemIndexMethod(index_method)
+            view.setUpdatesEnabled(True)
+
+    def undo(self):
+        window = self.window
+        view = window.ui.graphicsView
+        scene = window.scene
+        view.setUpdatesEnabled(False)
+        try:
+            new_channels = {channel for channel, _, _ in self.new_channels}
+            new_nodes = set(self.new_nodes)
+            for channel in new_channels:
+                scene.removeItem(channel)
+            for node in self.new_nodes:
+                scene.removeItem(node)
+                window.typeNumDict[node.nodetype] -= 1
+                node.channelList.unlock()
+                node.channelList.clear()
+                node.channelList.lock()
+            # 生成的节点只与彼此相连，一次过滤即可，不必对列表逐个 remove
+            window.channels[:] = [channel for channel in window.channels if channel not in new_channels]
+            window.nodes[:] = [node for node in window.nodes if node not in new_nodes]
+            window.indexDict.update(self.saved_index_dict)
+        finally:
+            view.setUpdatesEnabled(True)
+
+
+class AllocateAddressesCommand(QUndoCommand):
+    """
+    自动分配 IP 地址，整体作为一条撤销记录
+
+    构造时保存全部节点的 ip_dict / mask_dict 和主机的 ip / mask，
+    allocate() 运行分配器并保存分配后的地址，redo / undo 只在两份地址之间切换。
+    """
+
+    def __init__(self, window):
+        super().__init__()
+        self.window = window
+        self.nodes = list(window.nodes)
+        self.before = self.save_addresses()
+        self.after = None
+        self.setText("自动分配IP地址")
+
+    def save_addresses(self) -> dict:
+        addresses = {}
+        for node in self.nodes:
+            if hasattr(node, "ip_dict"):
+                addresses[node] = (dict(node.ip_dict), dict(node.mask_dict))
+            else:
+                addresses[node] = (getattr(node, "ip", None), getattr(node, "mask", None))
+        return addresses
+
+    def restore_addresses(self, addresses: dict):
+        for node, (ip, mask) in addresses.items():
+            if hasattr(node, "ip_dict"):
+                node.ip_dict.clear()
+                node.ip_dict.update(ip)
+                node.mask_dict.clear()
+                node.mask_dict.update(mask)
+            else:
+                node.ip = ip
+                node.mask = mask
+
+    def allocate(self) -> dict:
+        """运行分配器（入栈前调用一次），出错时恢复原有地址后抛出"""
+        from ip_allocator import allocate_addresses
+        try:
+            report = allocate_addresses(self.nodes, list(self.window.channels))
+        except Exception:
+            self.restore_addresses(self.before)
+            raise
+        self.after = self.save_addresses()
+        return report
+
+    def redo(self):
+        # 第一次入栈时地址已由 allocate() 写入
+        self.restore_addresses(self.after)
+
+    def undo(self):
+        self.restore_addresses(self.before)
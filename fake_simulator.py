@@ -0,0 +1,210 @@
+"""
+仿真程序替身
+
+不需要 OMNeT++ / INET，按 opp_run 的方式调用（忽略不认识的参数），在工作目录中读取
+生成的 network_topology.json 和 task_requirements，写出与真实仿真相同格式的
+results.json、dispatch_events.csv、compute_node_status.json、network_status.json，
+并在 stdout 输出 Cmdenv 风格的进度，用于在 Linux 上测试运行器和界面。
+
+任务按产生时刻依次轮流分配给算力节点，计算时长 = 计算量 / 1 GFLOPS。
+
+    export CPN_SIMULATOR="python3 /path/to/fake_simulator.py"
+    python3 fake_simulator.py -u Cmdenv -c static omnetpp.ini --fake-step-delay 0.1
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from typing import Dict, List
+
+# 与 file_utils 中的任务文件位置相同（不导入 file_utils，替身不依赖 Qt）
+TASK_DIR_NAME = "task_requirements"
+CONSOLIDATED_TASK_FILE = "tasks.jsonl"
+
+# 与界面中的事件类型和节点类型编号一致
+TASK_REPORT, TASK_DECISION, TASK_TRANSFER, TASK_RESULT = 1, 6, 7, 8
+USER_NODE, USER_GATEWAY, COMPUTE_NODE, COMPUTING_GATEWAY, SCHEDULER = 1, 2, 3, 4, 6
+
+COMPUTING_POWER = 1e9
+PRICE = 0.01
+STATIC_POWER = 1e-9
+# 每一跳的传输时延（s）
+HOP_DELAY = 5.224e-05
+# 模拟的每个任务对应的事件数
+EVENTS_PER_TASK = 40
+
+
+def load_tasks(project_dir: str) -> List[dict]:
+    """读取按用户输出的 tasks_user_*.json 或合并输出的 tasks.jsonl"""
+    task_dir = os.path.join(project_dir, TASK_DIR_NAME)
+    tasks = []
+    if not os.path.isdir(task_dir):
+        return tasks
+    for filename in sorted(os.listdir(task_dir)):
+        path = os.path.join(task_dir, filename)
+        if filename == CONSOLIDATED_TASK_FILE:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        tasks.extend(json.loads(line)["tasks"])
+        elif filename.endswith(".json"):
+            with open(path, encoding="utf-8") as f:
+                tasks.extend(json.load(f))
+    tasks.sort(key=lambda task: (float(task["generationTime"]), task["userNodeId"], task["taskId"]))
+    return tasks
+
+
+def load_compute_nodes(project_dir: str) -> Dict[int, int]:
+    """算力节点编号 -> 所属算力网关编号"""
+    path = os.path.join(project_dir, "network_topology.json")
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        topology = json.load(f)
+    return {node["nodeId"]: gateway["gatewayId"]
+            for gateway in topology.get("computeGateways", [])
+            for node in gateway.get("computeNodes", [])}
+
+
+def metric(description: str, value) -> dict:
+    return {"description": description, "value": value}
+
+
+def simulate(project_dir: str, step_delay: float = 0.0, sim_time_limit: float = None) -> int:
+    """运行替身仿真，返回处理的事件数"""
+    tasks = load_tasks(project_dir)
+    compute_nodes = load_compute_nodes(project_dir)
+    node_ids = sorted(compute_nodes) or [1]
+    busy_until = {node_id: 0.0 for node_id in node_ids}
+    busy_time = {node_id: 0.0 for node_id in node_ids}
+    assigned = {node_id: 0 for node_id in node_ids}
+    processed_load = {node_id: 0.0 for node_id in node_ids}
+    task_info = []
+    events = 0
+    now = 0.0
+    total = max(len(tasks), 1)
+    wall_start = time.monotonic()
+
+    with open(os.path.join(project_dir, "dispatch_events.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["simTime", "packetType", "packetId", "sourceNodeType", "sourceNodeId",
+                         "destNodeType", "destNodeId"])
+        for position, task in enumerate(tasks):
+            generation_time = float(task["generationTime"])
+            if sim_time_limit is not None and generation_time > sim_time_limit:
+                break
+            node_id = node_ids[position % len(node_ids)]
+            user_id = task["userNodeId"]
+            task_id = task["taskId"]
+            arrival = generation_time + 4 * HOP_DELAY
+            start = max(arrival, busy_until[node_id])
+            computation = float(task["computingAmount"]) / COMPUTING_POWER
+            finish = start + computation
+            end_to_end = finish + 3 * HOP_DELAY - generation_time
+            busy_until[node_id] = finish
+            busy_time[node_id] += computation
+            assigned[node_id] += 1
+            processed_load[node_id] += float(task["computingAmount"])
+            now = max(now, finish)
+
+            packet_id = position + 1
+            writer.writerow([generation_time + HOP_DELAY, TASK_REPORT, packet_id, USER_NODE, user_id,
+                             USER_GATEWAY, user_id])
+            writer.writerow([generation_time + 2 * HOP_DELAY, TASK_DECISION, packet_id, SCHEDULER, 1,
+                             USER_GATEWAY, user_id])
+            writer.writerow([arrival, TASK_TRANSFER, packet_id, USER_NODE, user_id, COMPUTE_NODE, node_id])
+            writer.writerow([finish + 3 * HOP_DELAY, TASK_RESULT, packet_id, COMPUTE_NODE, node_id,
+                             USER_NODE, user_id])
+
+            success = end_to_end <= float(task.get("maxDelay") or float("inf"))
+            task_info.append({
+                "computeNodeId": node_id,
+                "cost": metric("任务成本: 任务计算时长 * 所在算力节点的价格", computation * PRICE)
+                if success else metric("未成功处理的任务成本为 0", 0),
+                "delayDistribution": {
+                    "computationTime": metric("任务计算时长: 任务到达算力节点至处理完成的时延", computation),
+                    "endToEndDelay": metric("端到端任务延迟: 任务从用户节点发出到最终用户接收到结果消息的总时延",
+                                            end_to_end),
+                } if success else None,
+                "status": 1 if success else 0,
+                "taskId": task_id,
+                "userNodeId": user_id,
+            })
+            events += EVENTS_PER_TASK
+            elapsed = time.monotonic() - wall_start
+            minutes, seconds = divmod(int(elapsed), 60)
+            percent = (position + 1) * 100 // total
+            print(f"** Event #{events}   t={now}   Elapsed: {elapsed:.3f}s ({minutes}m {seconds:02d}s)  "
+                  f"{percent}% completed  ({percent}% total)")
+            print(f"     Speed:     ev/sec={events / elapsed if elapsed else 0:g}   "
+                  f"simsec/sec={now / elapsed if elapsed else 0:g}   ev/simsec={events / now if now else 0:g}")
+            print(f"     Messages:  created: {events}   present: {len(node_ids)}   in FES: {len(node_ids)}",
+                  flush=True)
+            if step_delay:
+                time.sleep(step_delay)
+
+    sim_time = sim_time_limit if sim_time_limit is not None else now
+    completed = sum(1 for task in task_info if task["status"] == 1)
+    results = {
+        "computeNodeInfo": [{
+            "computeNodeId": node_id,
+            "energyConsumption": metric("算力节点总能耗 = (静态功耗 * 总运行时长) + (动态功耗 * 总繁忙时长)",
+                                        STATIC_POWER * sim_time + busy_time[node_id] * 1e-6),
+            "loadBalancingMetrics": {
+                "averageUtilization": metric("节点利用率：仿真期间，节点处于'处理任务'状态的时间占总时间的百分比",
+                                             busy_time[node_id] / sim_time if sim_time else 0.0),
+                "totalAssignedTasks": metric("仿真结束时，分配给此节点的总任务数", assigned[node_id]),
+                "totalProcessedLoad": metric("仿真结束时，此节点处理的所有任务的计算量之和", processed_load[node_id]),
+            },
+        } for node_id in node_ids],
+        "globalInfo": {
+            "taskThroughput": metric("系统在单位时间内成功完成的任务数量 (总完成任务数 / 总仿真时长)",
+                                     completed / sim_time if sim_time else 0.0),
+        },
+        "taskInfo": task_info,
+    }
+    with open(os.path.join(project_dir, "compute_node_status.json"), "w") as f:
+        json.dump({"nodeStates": [{"availableStorage": 1024.0, "nodeId": node_id, "taskQueue": []}
+                                  for node_id in node_ids], "timestamp": sim_time}, f, indent=2)
+    with open(os.path.join(project_dir, "network_status.json"), "w") as f:
+        json.dump({"delayMatrix": {"computeNodeIds": node_ids, "delays": [], "userIds": []},
+                   "packetLoss": {"packetLossRate": 0.0, "packetsDroppedSinceLastLog": 0,
+                                  "packetsSentSinceLastLog": len(task_info) * 4},
+                   "timestamp": sim_time}, f)
+    # 结果文件最后写出，界面以它的出现作为仿真完成的标志
+    with open(os.path.join(project_dir, "results.json"), "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    return events
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="仿真程序替身，参数与 opp_run 兼容")
+    parser.add_argument("-u", dest="user_interface", default="Cmdenv")
+    parser.add_argument("-c", dest="config", default="General")
+    parser.add_argument("--sim-time-limit", default=None,
+                        help="仿真时间上限，如 10s")
+    parser.add_argument("--fake-step-delay", type=float, default=0.0,
+                        help="每个任务之间等待的真实秒数，用于模拟长时间运行")
+    parser.add_argument("--fake-exit-code", type=int, default=0,
+                        help="以给定的退出码结束，用于测试出错处理")
+    args, _ = parser.parse_known_args(argv)
+
+    sim_time_limit = float(args.sim_time_limit.rstrip("s")) if args.sim_time_limit else None
+    print("OMNeT++ Discrete Event Simulation  (fake_simulator)")
+    print(f"Setting up network \"Network\" (config {args.config})...")
+    print("Initializing...")
+    print("\nRunning simulation...", flush=True)
+    events = simulate(os.getcwd(), args.fake_step_delay, sim_time_limit)
+    if args.fake_exit_code:
+        print(f"<!> Error: 模拟的仿真错误 -- at event #{events}", file=sys.stderr, flush=True)
+        return args.fake_exit_code
+    print(f"\n<!> No more events, simulation completed -- at event #{events}")
+    print("\nCalling finish() at end of Run #0...")
+    print("End.", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,28 +1,73 @@
+from __future__ import annotations
+
 import os
+import re
 import json
+import shutil
 import pathlib
 import pickle
-from typing import Dict, Any, List, Union
-from io import TextIOWrapper
+from typing import Dict, Any, List, Union, TYPE_CHECKING
+from operator import itemgetter
+from io import TextIOWrapper, StringIO
 import weakref
 
-from allTypeItem import *
-from channel import Channel
+if TYPE_CHECKING:
+    # 只用于类型标注；写入器只读取字段，画布对象和 topology_model 中的数据对象都可以使用
+    from allTypeItem import UserNode, ComputingNode, UserGateway, ComputingGateway
+    from channel import Channel
+from topology import TopologySnapshot
+from module_groups import ModuleGroups, vector_parameter_lines
+from static_routes import StaticRoute, ROUTING_OSPF, ROUTING_STATIC, METRIC_DELAY, compute_static_routes
+import address_resolution
+from address_resolution import ARP_DYNAMIC, ARP_GLOBAL
+from scheduler_sharding import (SchedulerAssignment, SHARD_NEAREST, SHARD_BALANCED,
+                                assign_schedulers, scheduler_address)
+from partitioning import Partitioning, partition_topology, parsim_ini_lines
+from artifacts import ArtifactManifest, write_if_changed
+from sim_progress import PROGRESS_FILE
+from resource_profile import PROFILE_FILE
+from sim_process import RUN_BATCH, RUN_REALTIME, scheduler_ini_lines
 
 
 ROUTERTYPE = ["Router", "ComputingGateway", "UserGateway"]
 EDGETYPE = ["ComputingNode", "ComputeScheduleNode", "UserNode"]
 
+# 仿真程序在项目目录下产生的输出，每次运行前清理
+SIMULATOR_OUTPUTS = [
+    "results.json",
+    "dispatch_events.csv",
+    "compute_node_status.json",
+    "network_status.json",
+    "results",
+    # 运行器根据 Cmdenv 输出记录的吞吐曲线
+    PROGRESS_FILE,
+    # 运行器采样的仿真程序 CPU 和内存占用
+    PROFILE_FILE,
+]
+TASK_DIR_NAME = "task_requirements"
+# 节点数达到该值时默认使用紧凑输出（同构节点合并为子模块向量、配置器规则写入单独文件）
+COMPACT_MODULE_THRESHOLD = 200
+# Ipv4NetworkConfigurator 的规则文件，由 network.ned 通过 xmldoc() 引用
+CONFIGURATOR_FILE = "configurator.xml"
+TASK_FILE_PATTERN = re.compile(r"^tasks_user_(\d+)\.json$")
+
 def get_node_en_name(node) -> str:
     return f"{node.nodetype}{node.index}"
 
 
-def write_network_topology(nodes_list: List[Union[UserGateway, ComputingGateway]],
-                           project_dir:str):
-    user_gateways = [node for node in nodes_list if isinstance(node, UserGateway)]
-    computing_gateways = [node for node in nodes_list if isinstance(node, ComputingGateway)]
+def static_route_rule(route: StaticRoute, en_names) -> str:
+    """静态路由对应的配置器 route 规则"""
+    return (f"<route hosts='{en_names[route.router]}' destination='{route.destination}'"
+            f" netmask='{route.netmask}' gateway='{route.gateway}' interface='{route.interface}'/>")
+
+
+def render_network_topology(nodes_list: List[Union[UserGateway, ComputingGateway]],
+                            topology: TopologySnapshot = None) -> str:
+    topology = TopologySnapshot.ensure(topology, nodes_list, [])
+    user_gateways = topology.user_gateways
+    computing_gateways = topology.computing_gateways
 
-    topology = {
+    topology_info = {
         "userGateways": [],
         "computeGateways": []
     }
@@ -30,123 +75,210 @@ def write_network_topology(nodes_list: List[Union[UserGateway, ComputingGateway]
     # Process user gateways and their user nodes
     for gateway in user_gateways:
         user_nodes = []
-        for channel in gateway.channelList:
-            another_node = channel.another_point_of_channel(gateway)
-            if isinstance(another_node, UserNode):
-                user_nodes.append({
-                    "nodeId": another_node.index,
-                    "nodeIp": another_node.ip
-                })
+        for another_node in topology.neighbours_of_type(gateway, "UserNode"):
+            user_nodes.append({
+                "nodeId": another_node.index,
+                "nodeIp": another_node.ip
+            })
 
         gateway_info = {
             "gatewayId": gateway.index,
             "gatewayIp": list(gateway.ip_dict.values())[0],
             "userNodes": user_nodes
         }
-        topology["userGateways"].append(gateway_info)
+        topology_info["userGateways"].append(gateway_info)
 
     # Process computing gateways and their compute nodes
     for gateway in computing_gateways:
         compute_nodes = []
-        for channel in gateway.channelList:
-            another_node = channel.another_point_of_channel(gateway)
-            if isinstance(another_node, ComputingNode):
-                compute_nodes.append({
-                    "nodeId": another_node.index,
-                    "nodeIp": another_node.ip
-                })
+        for another_node in topology.neighbours_of_type(gateway, "ComputingNode"):
+            compute_nodes.append({
+                "nodeId": another_node.index,
+                "nodeIp": another_node.ip
+            })
 
         gateway_info = {
             "gatewayId": gateway.index,
             "gatewayIp": list(gateway.ip_dict.values())[0],
             "computeNodes": compute_nodes
         }
-        topology["computeGateways"].append(gateway_info)
+        topology_info["computeGateways"].append(gateway_info)
 
-    with open(os.path.join(project_dir,'network_topology.json'), 'w') as f:
-        json.dump(topology, f, indent=2)
+    return json.dumps(topology_info, indent=2)
 
 
+def write_network_topology(nodes_list: List[Union[UserGateway, ComputingGateway]],
+                           project_dir:str, topology: TopologySnapshot = None,
+                           manifest: ArtifactManifest = None) -> bool:
+    return write_if_changed(os.path.join(project_dir, 'network_topology.json'),
+                            render_network_topology(nodes_list, topology), manifest)
+
+
+
+# 任务字段：英文键（写入文件） -> 中文键（任务队列中）
+TASK_FIELDS = (
+    ("taskId", "任务编号"),
+    ("userNodeId", "所属用户节点编号"),
+    ("generationTime", "任务产生的时刻"),
+    ("computingType", "所需算力类型"),
+    ("requiredStorage", "任务所需存储空间"),
+    ("computingAmount", "任务计算量"),
+    ("transferAmount", "任务传输量"),
+    ("maxDelay", "最大时延要求"),
+    ("budget", "预算"),
+)
+TASK_EN_KEYS = tuple(en for en, _ in TASK_FIELDS)
+# 一次 C 层调用取出全部中文键对应的值
+_task_values = itemgetter(*(zh for _, zh in TASK_FIELDS))
+CONSOLIDATED_TASK_FILE = "tasks.jsonl"
+
 
 class TaskWriter:
-    def __init__(self, node_list:List[UserNode], project_dir:Union[str,pathlib.Path]):
-        self.nodes = [node for node in node_list if isinstance(node, UserNode)]
+    """
+    任务需求写入器
+
+    两种输出方式：
+        PER_USER:     每个用户节点一个 task_requirements/tasks_user_{index}.json
+        CONSOLIDATED: 所有任务写入一个 task_requirements/tasks.jsonl，
+                      每行一个用户节点 {"userNodeId": ..., "tasks": [...]}，只打开一个文件、只比较一次哈希
+    默认输出紧凑 JSON：带缩进时 json 模块会退回纯 Python 编码器，速度慢一倍以上。
+    按用户并行写入实测比串行更慢（瓶颈是持有 GIL 的 JSON 编码），因此总是串行写入。
+    """
+    PER_USER = "per_user"
+    CONSOLIDATED = "consolidated"
+
+    def __init__(self, node_list:List[UserNode], project_dir:Union[str,pathlib.Path],
+                 topology: TopologySnapshot = None, mode: str = PER_USER, compact: bool = True):
+        """
+        :param mode: 输出方式，PER_USER 或 CONSOLIDATED（界面菜单“合并任务文件”、命令行 --task-format jsonl）
+        :param compact: 按用户输出时是否写紧凑 JSON，False 时使用原先 indent=2 的格式
+        """
+        if topology is not None:
+            self.nodes = topology.user_nodes
+        else:
+            self.nodes = [node for node in node_list if node.nodetype == "UserNode"]
         self.project_dir = str(project_dir)
         if project_dir and os.path.exists(project_dir):
             pass
         else:
             raise ValueError("错误的项目地址")
+        if mode not in (self.PER_USER, self.CONSOLIDATED):
+            raise ValueError(f"未知的任务输出方式: {mode}")
+        self.mode = mode
+        self.compact = compact
+
+    def write(self, manifest: ArtifactManifest = None):
+        if self.mode == self.CONSOLIDATED:
+            write_if_changed(self.consolidated_file_path(), self.render_consolidated(), manifest)
+        else:
+            for node in self.nodes:
+                self.save_tasks_to_json(node, self.project_dir, manifest)
+        self.remove_stale_files(manifest)
+
+    def task_file_path(self, node) -> str:
+        return os.path.join(self.project_dir, TASK_DIR_NAME, f"tasks_user_{node.index}.json")
+
+    def consolidated_file_path(self) -> str:
+        return os.path.join(self.project_dir, TASK_DIR_NAME, CONSOLIDATED_TASK_FILE)
+
+    def remove_stale_files(self, manifest: ArtifactManifest = None):
+        """删除已不存在的用户节点留下的任务文件，以及另一种输出方式留下的文件"""
+        output_dir = os.path.join(self.project_dir, TASK_DIR_NAME)
+        if not os.path.isdir(output_dir):
+            return
+        if self.mode == self.CONSOLIDATED:
+            current = {CONSOLIDATED_TASK_FILE}
+        else:
+            current = {os.path.basename(self.task_file_path(node)) for node in self.nodes}
+        for filename in os.listdir(output_dir):
+            if filename in current:
+                continue
+            if TASK_FILE_PATTERN.match(filename) or filename == CONSOLIDATED_TASK_FILE:
+                path = os.path.join(output_dir, filename)
+                if manifest is not None:
+                    manifest.remove(path)
+                else:
+                    os.unlink(path)
+
+    @staticmethod
+    def translate_tasks(task_queue) -> List[dict]:
+        """将任务队列中的中文键转换为英文键"""
+        keys = TASK_EN_KEYS
+        return [dict(zip(keys, _task_values(task))) for task in task_queue]
+
+    def render_tasks(self, node:UserNode) -> str:
+        """
+        将Node的task_queue渲染为JSON文本
 
-    def write(self):
-        for node in self.nodes:
-            self.save_tasks_to_json(node, self.project_dir)
+        参数:
+            node: 用户节点对象，包含task_queue和index属性
+        """
+        tasks_data = self.translate_tasks(node.task_queue)
+        if self.compact:
+            return json.dumps(tasks_data, ensure_ascii=False, separators=(',', ':'))
+        return json.dumps(tasks_data, indent=2, ensure_ascii=False)
+
+    def render_consolidated(self) -> str:
+        """所有用户节点的任务渲染为 JSONL 文本，每行一个用户节点，按用户节点顺序排列"""
+        encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+        lines = [
+            encode({"userNodeId": node.index, "tasks": self.translate_tasks(node.task_queue)})
+            for node in self.nodes
+        ]
+        return "\n".join(lines) + "\n" if lines else ""
 
-    def save_tasks_to_json(self, node:UserNode, project_dir:Union[str,pathlib.Path]):
+    def save_tasks_to_json(self, node:UserNode, project_dir:Union[str,pathlib.Path],
+                           manifest: ArtifactManifest = None) -> bool:
         """
-        将Node的task_queue保存为JSON文件
+        将Node的task_queue保存为JSON文件，内容未变化时不重写
 
         参数:
             node: 用户节点对象，包含task_queue和index属性
             project_dir: 项目根目录路径
+            manifest: 产物哈希清单
         """
-        # 准备要保存的数据列表
-        tasks_data = []
-
-        for task in node.task_queue:
-            task_data = {
-                "taskId": task["任务编号"],
-                "userNodeId": task["所属用户节点编号"],
-                "generationTime": task["任务产生的时刻"],
-                "computingType": task["所需算力类型"],
-                "requiredStorage": task["任务所需存储空间"],
-                "computingAmount": task["任务计算量"],
-                "transferAmount": task["任务传输量"],
-                "maxDelay": task["最大时延要求"],
-                "budget": task["预算"]
-            }
-            tasks_data.append(task_data)
-
-        # 创建目录（如果不存在）
-        output_dir = os.path.join(project_dir, "task_requirements")
-        os.makedirs(output_dir, exist_ok=True)
-
-        # 构建文件路径
-        filename = f"tasks_user_{node.index}.json"
-        filepath = os.path.join(output_dir, filename)
-
-        # 写入JSON文件
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(tasks_data, f, indent=2, ensure_ascii=False)
-
-        # print(f"任务数据已保存到: {filepath}")
+        # 构建文件路径（目录不存在时由原子写入创建）
+        filepath = os.path.join(str(project_dir), TASK_DIR_NAME, f"tasks_user_{node.index}.json")
+        return write_if_changed(filepath, self.render_tasks(node), manifest)
 
 class NEDWriter:
-    def __init__(self, filename: str, nodeList: list, channelList: list, project_name:str):
+    def __init__(self, filename: str, nodeList: list, channelList: list, project_name:str,
+                 topology: TopologySnapshot = None, compact: bool = False, groups: ModuleGroups = None,
+                 external_configurator: bool = False, routes: List[StaticRoute] = None):
         self.filename = filename
         self.nodeList = nodeList
         self.channelList = channelList
+        # 编译后的拓扑快照（未传入时自行构建）
+        self.topology = TopologySnapshot.ensure(topology, nodeList, channelList)
+        # 节点 -> 模块名，紧凑模式下同构节点合并为子模块向量
+        self.groups = groups if groups is not None else ModuleGroups(self.topology, compact)
+        # 为 True 时配置器规则由 ConfiguratorWriter 写入 CONFIGURATOR_FILE，NED 中只引用该文件
+        self.external_configurator = external_configurator
+        # 离线计算的静态路由（ROUTING_STATIC），为 None 时由 OSPF 计算路由
+        self.routes = routes
         # 用户节点列表
-        self.user_nodes = [node for node in nodeList if node.nodetype == "UserNode"]
+        self.user_nodes = self.topology.user_nodes
         # 算力节点列表
-        self.compute_nodes = [node for node in nodeList if node.nodetype == "ComputingNode"]
+        self.compute_nodes = self.topology.compute_nodes
         # 用户网关列表
-        self.user_gateways = [node for node in nodeList if node.nodetype == "UserGateway"]
+        self.user_gateways = self.topology.user_gateways
         # 算力网关列表
-        self.computing_gateways = [
-            node for node in nodeList if node.nodetype == "ComputingGateway"
-        ]
+        self.computing_gateways = self.topology.computing_gateways
         # 调度决策网关列表
-        self.compute_schedule_nodes = [
-            node for node in nodeList if node.nodetype == "ComputeScheduleNode"
-        ]
+        self.compute_schedule_nodes = self.topology.compute_schedule_nodes
         # 路由器列表
-        self.routers = [node for node in nodeList if node.nodetype == "Router"]
+        self.routers = self.topology.routers
         # 项目名称
         self.project_name = project_name
 
 
-    def write(self):
-        self.write_network_ned(open(self.filename, "w"))
+    def render(self) -> str:
+        f = StringIO()
+        self.write_network_ned(f)
+        return f.getvalue()
+
+    def write(self, manifest: ArtifactManifest = None) -> bool:
+        return write_if_changed(self.filename, self.render(), manifest)
 
     def write_network_ned(self, f):
         # 示例：写一个简单的 OMNeT++ 网络模块结构
@@ -170,10 +302,11 @@ class NEDWriter:
                 return "ComputeNode"
             else:
                 return node.nodetype
-        for node in self.nodeList:
+        en_names = self.groups.names
+        for node in self.groups.individual_nodes:
             f.write(
                 "\t\t"
-                + get_node_en_name(node)
+                + en_names[node]
                 + ":"
                 + get_new_type(node)
                 + "{\n"
@@ -186,6 +319,11 @@ class NEDWriter:
             f.write(f"\t\t\t\tethg[{len(node.channelList)}];\n")
             f.write("\t\t}\n")
             pass
+        for vector in self.groups.vectors:
+            f.write(f"\t\t{vector.name}[{len(vector)}]:{vector.module_type}{{\n")
+            f.write("\t\t\tgates:\n")
+            f.write(f"\t\t\t\tethg[{vector.gate_count}];\n")
+            f.write("\t\t}\n")
         f.write("""
         EventLogger: NetworkEventLogger {
             @display("p=97.57126,244.92377;is=s");
@@ -193,47 +331,54 @@ class NEDWriter:
 """)
         f.write("\t\tconfigurator: Ipv4NetworkConfigurator {\n")
         f.write("\t\t\tparameters:\n")
+        if self.external_configurator:
+            f.write("\t"*4+f"config = xmldoc(\"{CONFIGURATOR_FILE}\");\n")
+        else:
+            self.write_inline_configurator(f)
+        f.write("\t\t}\n\n")
+        f.write('''
+        scenarioManager: ScenarioManager {
+            @display("p=98.15749,135.4325;is=s");
+        }
+''')
+        f.write('\n')
+
+    def write_inline_configurator(self, f):
+        """把配置器规则逐条拼接成 xml() 表达式内联在 NED 中"""
+        en_names = self.groups.names
         f.write("\t"*4+"config = xml(\"<config>\" +\n")
         edgenodes = self.user_nodes+self.compute_nodes+self.compute_schedule_nodes
         routernodes = self.computing_gateways+self.user_gateways+self.routers
+        neighbours = self.topology.neighbours
         for node in edgenodes:
-            for channel in node.channelList:
-                another = channel.another_point_of_channel(node)
-                f.write("\t"*6+f"\"<interface hosts='{get_node_en_name(node)}'"
-                               f" towards='{get_node_en_name(another)}' address='{node.ip}' netmask='{node.mask}'  />\" +\n")
+            for _, _, another in neighbours[node]:
+                f.write("\t"*6+f"\"<interface hosts='{en_names[node]}'"
+                               f" towards='{en_names[another]}' address='{node.ip}' netmask='{node.mask}'  />\" +\n")
 
         for node in routernodes:
-            for channel in node.channelList:
-                another = channel.another_point_of_channel(node)
-                f.write("\t"*6+f"\"<interface hosts='{get_node_en_name(node)}'"
-                               f" towards='{get_node_en_name(another)}' address='{node.ip_dict[another]}' netmask='{node.mask_dict[another]}'  />\" +\n")
+            for _, _, another in neighbours[node]:
+                f.write("\t"*6+f"\"<interface hosts='{en_names[node]}'"
+                               f" towards='{en_names[another]}' address='{node.ip_dict[another]}' netmask='{node.mask_dict[another]}'  />\" +\n")
 
         for node in edgenodes:
-            another = None
-            # print(len(node.channelList), node.name)
-            for channel in node.channelList:
-                another = channel.another_point_of_channel(node)
-                # print(node.nodetype, another.nodetype)
-                if another.nodetype in ROUTERTYPE:
-                    break
+            # 第一个路由类邻居，没有时为最后一个邻居
+            another = self.topology.route_gateway(node)
             if another is not None:
-                f.write("\t"*6+f"\"<route hosts='{get_node_en_name(node)}' destination='*' gateway='{get_node_en_name(another)}'/>\"+\n")
+                f.write("\t"*6+f"\"<route hosts='{en_names[node]}' destination='*' gateway='{en_names[another]}'/>\"+\n")
+
+        for route in self.routes or ():
+            f.write("\t"*6+f"\"{static_route_rule(route, en_names)}\"+\n")
 
         f.write("\t"*4+"\"</config>\");\n")
-        f.write("\t\t}\n\n")
-        f.write('''
-        scenarioManager: ScenarioManager {
-            @display("p=98.15749,135.4325;is=s");
-        }
-''')
-        f.write('\n')
 
     def write_connections(self, f):
-        for channel in self.channelList:
-            start_name = get_node_en_name(channel.start_item)
-            start_index = channel.start_item.channelList.index(channel)
-            end_name = get_node_en_name(channel.end_item)
-            end_index = channel.end_item.channelList.index(channel)
+        en_names = self.groups.names
+        gate_indices = self.topology.gate_indices
+        for channel in self.topology.channels:
+            start_name = en_names[channel.start_item]
+            start_index = gate_indices[(channel, channel.start_item)]
+            end_name = en_names[channel.end_item]
+            end_index = gate_indices[(channel, channel.end_item)]
             # bandwidth = channel.bandwidth if channel.bandwidth != 0 else 100
             f.write(
                 f"\t\t{start_name}.ethg[{start_index}]"
@@ -259,19 +404,138 @@ class NEDWriter:
         f.write("import inet.computing_power_network.node.IndexedOspfRouter;\n")
         f.write("import inet.computing_power_network.logger.NetworkEventLogger;\n\n")
 
+class ConfiguratorWriter:
+    """
+    Ipv4NetworkConfigurator 的规则文件（configurator.xml）
+
+    与内联的 xml() 表达式内容等价，但合并了可以合并的规则：
+        - 同一接口朝向多个邻居且地址、掩码相同时，合并为一条 towards 列表；
+        - 默认路由按网关合并为一条 hosts 列表，子模块向量中的连续下标写成 [a..b]。
+    每个接口的地址都不同，不同主机的 interface 规则无法合并。
+    传入 routes 时在默认路由之后写出路由器的静态路由表。
+    """
+
+    def __init__(self, filename: str, nodeList: list, channelList: list,
+                 topology: TopologySnapshot = None, compact: bool = False, groups: ModuleGroups = None,
+                 routes: List[StaticRoute] = None):
+        self.filename = filename
+        self.nodeList = nodeList
+        self.channelList = channelList
+        # 编译后的拓扑快照（未传入时自行构建）
+        self.topology = TopologySnapshot.ensure(topology, nodeList, channelList)
+        # 节点 -> 模块名，须与 NEDWriter 使用的一致
+        self.groups = groups if groups is not None else ModuleGroups(self.topology, compact)
+        self.routes = routes
+
+    def render(self) -> str:
+        f = StringIO()
+        f.write("<config>\n")
+        self.write_interfaces(f)
+        self.write_routes(f)
+        self.write_static_routes(f)
+        f.write("</config>\n")
+        return f.getvalue()
+
+    def write(self, manifest: ArtifactManifest = None) -> bool:
+        return write_if_changed(self.filename, self.render(), manifest)
+
+    def write_interfaces(self, f):
+        topology = self.topology
+        en_names = self.groups.names
+        edgenodes = topology.user_nodes + topology.compute_nodes + topology.compute_schedule_nodes
+        routernodes = topology.computing_gateways + topology.user_gateways + topology.routers
+        for node in edgenodes + routernodes:
+            # (地址, 掩码) -> 朝向的邻居，保持链路顺序并去掉重复链路
+            towards = {}
+            for _, _, another in topology.neighbours[node]:
+                if node.nodetype in ROUTERTYPE:
+                    key = (node.ip_dict[another], node.mask_dict[another])
+                else:
+                    key = (node.ip, node.mask)
+                names = towards.setdefault(key, [])
+                if en_names[another] not in names:
+                    names.append(en_names[another])
+            for (address, netmask), names in towards.items():
+                f.write(f"  <interface hosts='{en_names[node]}' towards='{' '.join(names)}'"
+                        f" address='{address}' netmask='{netmask}'/>\n")
+
+    def write_routes(self, f):
+        topology = self.topology
+        groups = self.groups
+        # 网关 -> 以其为默认路由的边缘节点
+        hosts_by_gateway = {}
+        for node in topology.user_nodes + topology.compute_nodes + topology.compute_schedule_nodes:
+            another = topology.route_gateway(node)
+            if another is not None:
+                hosts_by_gateway.setdefault(another, []).append(node)
+        for gateway, hosts in hosts_by_gateway.items():
+            f.write(f"  <route hosts='{' '.join(self.host_patterns(hosts))}'"
+                    f" destination='*' gateway='{groups.names[gateway]}'/>\n")
+
+    def write_static_routes(self, f):
+        en_names = self.groups.names
+        for route in self.routes or ():
+            f.write(f"  {static_route_rule(route, en_names)}\n")
+
+    def host_patterns(self, hosts: list) -> List[str]:
+        """向量中下标连续的主机合并为 name[a..b]，其余使用模块名"""
+        positions = self.groups.positions
+        patterns = []
+        # 向量 -> 下标列表
+        vector_positions = {}
+        for node in hosts:
+            if node in positions:
+                vector, position = positions[node]
+                vector_positions.setdefault(vector, []).append(position)
+            else:
+                patterns.append(self.groups.names[node])
+        for vector, indices in vector_positions.items():
+            indices.sort()
+            start = previous = indices[0]
+            for position in indices[1:] + [None]:
+                if position is not None and position == previous + 1:
+                    previous = position
+                    continue
+                patterns.append(vector.element(start) if start == previous
+                                else f"{vector.name}[{start}..{previous}]")
+                if position is not None:
+                    start = previous = position
+        return patterns
+
+
 class INIWriter:
-    def __init__(self, filename: str, nodeList: list, channelList: list, project_dir:str):
+    def __init__(self, filename: str, nodeList: list, channelList: list, project_dir:str,
+                 topology: TopologySnapshot = None, compact: bool = False, groups: ModuleGroups = None,
+                 arp_mode: str = ARP_DYNAMIC, sharding: str = SHARD_NEAREST, run_mode: str = RUN_BATCH,
+                 assignment: SchedulerAssignment = None, partitioning: Partitioning = None):
         self.filename = filename
         self.nodeList = nodeList
         self.channelList = channelList
         self.project_dir = project_dir
-
-    def write(self):
+        # 地址解析方式，见 address_resolution
+        self.arp_mode = arp_mode
+        # 运行方式，见 sim_process.scheduler_ini_lines
+        self.run_mode = run_mode
+        # 编译后的拓扑快照（未传入时自行构建）
+        self.topology = TopologySnapshot.ensure(topology, nodeList, channelList)
+        # 节点 -> 模块名，紧凑模式下同构节点的参数写成通配规则
+        self.groups = groups if groups is not None else ModuleGroups(self.topology, compact)
+        # 网关 -> 调度决策网关，见 scheduler_sharding
+        self.assignment = assignment if assignment is not None else assign_schedulers(self.topology, sharding)
+        # 并行仿真分区，见 partitioning；为 None 或只有一个分区时写顺序仿真配置
+        self.partitioning = partitioning if partitioning is not None and partitioning.count > 1 else None
+
+    def render(self) -> str:
+        f = StringIO()
         self.write_omnetpp_ini(
-            f=open(self.filename, "w"),
+            f=f,
             nodeList=self.nodeList,
             channelList=self.channelList,
         )
+        return f.getvalue()
+
+    def write(self, manifest: ArtifactManifest = None) -> bool:
+        return write_if_changed(self.filename, self.render(), manifest)
         # return True
 
     # 写入 omnetpp.ini 的具体内容
@@ -280,31 +544,33 @@ class INIWriter:
         f.write(
             f"network = inet.examples.computing_power_network.{self.project_dir}.Network\n"
         )
-        f.write("scheduler-class = \"cRealTimeScheduler\"\n")
-        f.write("realtimescheduler-scaling = 1\n")
-        # f.write("cmdenv-express-mode = false\n")
+        if self.partitioning is not None:
+            # 并行仿真使用 parsim 自己的调度器
+            f.write(parsim_ini_lines(self.partitioning))
+        else:
+            f.write(scheduler_ini_lines(self.run_mode))
         f.write("")
         f.write('\n')
         f.write('**.ospf.ospfConfig = xmldoc("config.xml")\n\n')
-        # 用户节点列表
-        user_nodes = [node for node in nodeList if node.nodetype == "UserNode"]
+        topology = self.topology
+        groups = self.groups
+        en_names = groups.names
+        # 用户节点列表（合并为向量的节点另行写通配规则）
+        user_nodes = groups.individual_of_type("UserNode")
         # 算力节点列表
-        compute_nodes = [node for node in nodeList if node.nodetype == "ComputingNode"]
+        compute_nodes = groups.individual_of_type("ComputingNode")
         # 用户网关列表
-        user_gateways = [node for node in nodeList if node.nodetype == "UserGateway"]
+        user_gateways = topology.user_gateways
         # 算力网关列表
-        computing_gateways = [
-            node for node in nodeList if node.nodetype == "ComputingGateway"
-        ]
+        computing_gateways = topology.computing_gateways
         # 调度决策网关列表
-        compute_schedule_nodes = [
-            node for node in nodeList if node.nodetype == "ComputeScheduleNode"
-        ]
+        compute_schedule_nodes = topology.compute_schedule_nodes
+        assignment = self.assignment
 
         # 一个一个写
         for node in compute_schedule_nodes:
             # node = ComputeScheduleNode(node)
-            pref = f"**.{get_node_en_name(node)}"
+            pref = f"**.{en_names[node]}"
             f.write(f"{pref}.numApps = 1\n")
             f.write(f'{pref}.app[0].typename = "ComputeScheduleApp"\n')
             f.write(f'{pref}.app[0].localAddress = "{node.ip}"\n')
@@ -313,42 +579,35 @@ class INIWriter:
             f.write(f"{pref}.app[0].userGatewayPort = 13333\n")
         f.write('\n')
         for node in user_nodes:
-            pref = f"**.{get_node_en_name(node)}"
+            pref = f"**.{en_names[node]}"
             f.write(f"{pref}.numApps = 1\n")
             f.write(f"{pref}.app[0].typename = \"UserNodeApp\"\n")
             f.write(f"{pref}.app[0].mask = \"255.255.255.0\"\n")
             # === 业务属性 ===
             f.write(f"{pref}.app[0].userNodeId = {node.index}\n")  # 使用节点ID
-            for channel in node.channelList:
-                if channel.start_item == node and isinstance(channel.end_item, UserGateway):
-                    f.write(f"{pref}.app[0].userRouterId = {channel.end_item.index}\n")
-                    break
-                elif channel.end_item == node and isinstance(channel.start_item, UserGateway):
-                    f.write(f"{pref}.app[0].userRouterId = {channel.start_item.index}\n")
-                    break
+            user_gateway_neighbours = topology.neighbours_of_type(node, "UserGateway")
+            if user_gateway_neighbours:
+                f.write(f"{pref}.app[0].userRouterId = {user_gateway_neighbours[0].index}\n")
             # === 端口与地址信息 ===
             f.write(f"{pref}.app[0].localAddress = \"{node.ip}\"\n")  # 使用节点IP
             f.write(f"{pref}.app[0].localPort = 13333\n")
-            for channel in node.channelList:
-                another = channel.another_point_of_channel(node)
-                if another and isinstance(another, UserGateway):
-                    f.write(f"{pref}.app[0].gatewayAddress = \"{another.ip_dict[node]}\"\n")
+            for another in user_gateway_neighbours:
+                f.write(f"{pref}.app[0].gatewayAddress = \"{another.ip_dict[node]}\"\n")
             f.write(f"{pref}.app[0].gatewayPort = 13333\n")
             f.write(f"{pref}.app[0].computeNodePort = 1234\n")
+        self.write_vector_parameters(f, groups.vector_of("UserNode"), self.user_node_parameters())
         f.write('\n')
         for node in compute_nodes:
             node: ComputingNode  # 类型标注
-            pref = f"**.{get_node_en_name(node)}"
+            pref = f"**.{en_names[node]}"
             f.write(f"{pref}.numApps = 1\n")
             f.write(f"{pref}.app[0].typename = \"ComputeNodeApp\"\n")
             f.write(f"{pref}.app[0].mask = \"{node.mask}\"\n")
             f.write(f"{pref}.app[0].computeNodeId = {node.index}\n")  # 使用节点ID
-            for channel in node.channelList:
-                another = channel.another_point_of_channel(node)
-                if another and isinstance(another, ComputingGateway):
-                    f.write(f"{pref}.app[0].computeRouterId = {another.index}\n")
-                    f.write(f"{pref}.app[0].gatewayAddress = \"{another.ip_dict[node]}\"\n")
-                    break
+            another = topology.first_neighbour_of_type(node, "ComputingGateway")
+            if another is not None:
+                f.write(f"{pref}.app[0].computeRouterId = {another.index}\n")
+                f.write(f"{pref}.app[0].gatewayAddress = \"{another.ip_dict[node]}\"\n")
             f.write(f"{pref}.app[0].localAddress = \"{node.ip}\"\n")  # 使用节点IP
             f.write(f"{pref}.app[0].localPort = 1234\n")
             f.write(f"{pref}.app[0].gatewayPort = 12344\n")
@@ -359,12 +618,13 @@ class INIWriter:
             f.write(f"{pref}.app[0].quiescentDissipation = {node.static_power}\n")  # 使用节点功耗
             f.write(f"{pref}.app[0].powerGenerationMix = {node.power_mix}\n")  # 使用节点能源混合比
             f.write(f"{pref}.app[0].price = {node.price}\n")  # 使用节点价格
+        self.write_vector_parameters(f, groups.vector_of("ComputingNode"), self.compute_node_parameters())
         f.write('\n')
         for node in computing_gateways:
             node: ComputingGateway  # 类型标注
-            pref = f"**.{get_node_en_name(node)}"
+            pref = f"**.{en_names[node]}"
             f.write(f"{pref}.computingGatewayApp.computingGatewayId = {node.index}\n")
-            f.write(f"{pref}.computingGatewayApp.schedulerAddress = \"{compute_schedule_nodes[0].ip}\"\n")
+            f.write(f"{pref}.computingGatewayApp.schedulerAddress = \"{scheduler_address(assignment, node)}\"\n")
             f.write(f"{pref}.computingGatewayApp.port = 12344\n")
             f.write(f"{pref}.computingGatewayApp.scheduleNodePort = 13333\n")
             f.write(f"{pref}.computingGatewayApp.computeNodePort = 1234\n")
@@ -386,17 +646,20 @@ class INIWriter:
         f.write('\n')
         for node in user_gateways:
             node: UserGateway  # 类型标注
-            pref = f"**.{get_node_en_name(node)}"
+            pref = f"**.{en_names[node]}"
             f.write(f"{pref}.userGatewayApp.userRouterId = {node.index}\n")
             f.write(f"{pref}.userGatewayApp.port = 13333\n")
             f.write(f"{pref}.userGatewayApp.scheduleNodePort = 13333\n")
             f.write(f"{pref}.userGatewayApp.userNodePort = 13333\n")
-            f.write(f"{pref}.userGatewayApp.schedulerAddress = \"{compute_schedule_nodes[0].ip}\"\n")
+            f.write(f"{pref}.userGatewayApp.schedulerAddress = \"{scheduler_address(assignment, node)}\"\n")
 
+        f.write('\n')
+        if self.partitioning is not None:
+            self.write_partition_ids(f)
+            f.write('\n')
+        f.write(address_resolution.ini_lines(self.arp_mode))
         f.write(
             '''
-**.arp.cacheTimeout = 1s
-
 
 *.configurator.addStaticRoutes = false
 *.configurator.addSubnetRoutes = true
@@ -408,30 +671,120 @@ description = static topology
             '''
         )
 
+    def write_partition_ids(self, f):
+        """每个节点模块的 partition-id，其余顶层模块（配置器、场景管理器等）放在 0 号分区"""
+        groups = self.groups
+        partition_of = self.partitioning.partition_of
+        for node in groups.individual_nodes:
+            f.write(f"*.{groups.names[node]}.partition-id = {partition_of[node]}\n")
+        for vector in groups.vectors:
+            f.writelines(vector_parameter_lines(vector, "partition-id", partition_of.__getitem__))
+        # 只匹配顶层模块，子模块随所在的节点模块
+        f.write("*.*.partition-id = 0\n")
+
+    @staticmethod
+    def write_vector_parameters(f, vector, parameters):
+        """向量中的节点按参数写通配规则，parameters 为 (参数路径, 取值函数, 是否随下标线性变化)"""
+        if vector is None:
+            return
+        for key, value_of, linear in parameters:
+            f.writelines(vector_parameter_lines(vector, key, value_of, linear))
+
+    def user_node_parameters(self):
+        """用户节点的 ini 参数，与逐个节点写出的内容一一对应"""
+        topology = self.topology
+
+        def gateway(node):
+            return topology.first_neighbour_of_type(node, "UserGateway")
+
+        def gateway_id(node):
+            another = gateway(node)
+            return another.index if another is not None else None
+
+        def gateway_address(node):
+            another = gateway(node)
+            return another.ip_dict[node] if another is not None else None
+
+        return [
+            ("numApps", lambda node: 1, False),
+            ("app[0].typename", lambda node: "UserNodeApp", False),
+            ("app[0].mask", lambda node: "255.255.255.0", False),
+            ("app[0].userNodeId", lambda node: node.index, True),
+            ("app[0].userRouterId", gateway_id, False),
+            ("app[0].localAddress", lambda node: node.ip, False),
+            ("app[0].localPort", lambda node: 13333, False),
+            ("app[0].gatewayAddress", gateway_address, False),
+            ("app[0].gatewayPort", lambda node: 13333, False),
+            ("app[0].computeNodePort", lambda node: 1234, False),
+        ]
+
+    def compute_node_parameters(self):
+        """算力节点的 ini 参数，与逐个节点写出的内容一一对应"""
+        topology = self.topology
+
+        def gateway(node):
+            return topology.first_neighbour_of_type(node, "ComputingGateway")
+
+        def gateway_id(node):
+            another = gateway(node)
+            return another.index if another is not None else None
+
+        def gateway_address(node):
+            another = gateway(node)
+            return another.ip_dict[node] if another is not None else None
+
+        return [
+            ("numApps", lambda node: 1, False),
+            ("app[0].typename", lambda node: "ComputeNodeApp", False),
+            ("app[0].mask", lambda node: node.mask, False),
+            ("app[0].computeNodeId", lambda node: node.index, True),
+            ("app[0].computeRouterId", gateway_id, False),
+            ("app[0].gatewayAddress", gateway_address, False),
+            ("app[0].localAddress", lambda node: node.ip, False),
+            ("app[0].localPort", lambda node: 1234, False),
+            ("app[0].gatewayPort", lambda node: 12344, False),
+            ("app[0].computingType", lambda node: node.computing_type, False),
+            ("app[0].computingCapacity", lambda node: node.computing_power, False),
+            ("app[0].storageCapacity", lambda node: node.storage_space, False),
+            ("app[0].switchedCapacitance", lambda node: node.switching_capacitance, False),
+            ("app[0].quiescentDissipation", lambda node: node.static_power, False),
+            ("app[0].powerGenerationMix", lambda node: node.power_mix, False),
+            ("app[0].price", lambda node: node.price, False),
+        ]
+
 class XMLWriter:
-    def __init__(self, filename: str, nodeList: list, channelList: list):
+    def __init__(self, filename: str, nodeList: list, channelList: list,
+                 topology: TopologySnapshot = None, compact: bool = False, groups: ModuleGroups = None,
+                 routing: str = ROUTING_OSPF):
         self.filename = filename
         self.nodeList = nodeList
         self.channelList = channelList
+        # 编译后的拓扑快照（未传入时自行构建）
+        self.topology = TopologySnapshot.ensure(topology, nodeList, channelList)
+        # 节点 -> 模块名，须与 NEDWriter 使用的一致
+        self.groups = groups if groups is not None else ModuleGroups(self.topology, compact)
+        # ROUTING_STATIC 时路由已由配置器写入，各路由器的 OSPF 不配置任何接口
+        self.routing = routing
         # 用户节点列表
-        self.user_nodes = [node for node in nodeList if node.nodetype == "UserNode"]
+        self.user_nodes = self.topology.user_nodes
         # 算力节点列表
-        self.compute_nodes = [node for node in nodeList if node.nodetype == "ComputingNode"]
+        self.compute_nodes = self.topology.compute_nodes
         # 用户网关列表
-        self.user_gateways = [node for node in nodeList if node.nodetype == "UserGateway"]
+        self.user_gateways = self.topology.user_gateways
         # 算力网关列表
-        self.computing_gateways = [
-            node for node in nodeList if node.nodetype == "ComputingGateway"
-        ]
+        self.computing_gateways = self.topology.computing_gateways
         # 调度决策网关列表
-        self.compute_schedule_nodes = [
-            node for node in nodeList if node.nodetype == "ComputeScheduleNode"
-        ]
+        self.compute_schedule_nodes = self.topology.compute_schedule_nodes
         # 路由器列表
-        self.routers = [node for node in nodeList if node.nodetype == "Router"]
+        self.routers = self.topology.routers
+
+    def render(self) -> str:
+        file = StringIO()
+        self.write_xml(file=file)
+        return file.getvalue()
 
-    def write(self):
-        self.write_xml(file=open(self.filename, 'w'))
+    def write(self, manifest: ArtifactManifest = None) -> bool:
+        return write_if_changed(self.filename, self.render(), manifest)
 
     def write_xml(self,file):
         # 写入 XML 头部
@@ -439,44 +792,142 @@ class XMLWriter:
         file.write(
             '<OSPFASConfig xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xsi:schemaLocation="OSPF.xsd">\n\n'
         )
-        self.write_routers_connection(file)
-        self.write_non_routers(file)
-        self.write_routers_config(file)
+        if self.routing == ROUTING_STATIC:
+            self.write_idle_routers(file)
+        else:
+            self.write_routers_connection(file)
+            self.write_non_routers(file)
+            self.write_routers_config(file)
         # 关闭根元素
         file.write("</OSPFASConfig>\n")
 
+    def write_idle_routers(self, f):
+        """OSPF 模块要求每个路由器都有配置，不配置接口则不发送任何 OSPF 报文"""
+        en_names = self.groups.names
+        for router in self.routers+self.user_gateways+self.computing_gateways:
+            f.write(f"  <Router name=\"{en_names[router]}\" RFC1583Compatible=\"true\" />\n")
+
     def write_routers_connection(self, f):
         f.write('  <Area id="0.0.0.0">\n')
-        routers_connections = [channel for channel in self.channelList if channel.start_item.nodetype in ROUTERTYPE and channel.end_item.nodetype in ROUTERTYPE]
+        en_names = self.groups.names
+        routers_connections = [channel for channel in self.topology.channels if channel.start_item.nodetype in ROUTERTYPE and channel.end_item.nodetype in ROUTERTYPE]
         for conn in routers_connections:
             conn:Channel
-            f.write(f"    <AddressRange address=\"{get_node_en_name(conn.start_item)}>{get_node_en_name(conn.end_item)}\""
-                    f" mask=\"{get_node_en_name(conn.start_item)}>{get_node_en_name(conn.end_item)}\" />\n")
-            f.write(f"    <AddressRange address=\"{get_node_en_name(conn.end_item)}>{get_node_en_name(conn.start_item)}\""
-                    f" mask=\"{get_node_en_name(conn.end_item)}>{get_node_en_name(conn.start_item)}\" />\n")
+            start_name = en_names[conn.start_item]
+            end_name = en_names[conn.end_item]
+            f.write(f"    <AddressRange address=\"{start_name}>{end_name}\""
+                    f" mask=\"{start_name}>{end_name}\" />\n")
+            f.write(f"    <AddressRange address=\"{end_name}>{start_name}\""
+                    f" mask=\"{end_name}>{start_name}\" />\n")
         pass
 
     def write_non_routers(self, f):
-        for node in self.user_nodes:
-            f.write(f"    <AddressRange address=\"{get_node_en_name(node)}\" mask=\"{get_node_en_name(node)}\" />\n")
-        for node in self.compute_nodes:
-            f.write(f"    <AddressRange address=\"{get_node_en_name(node)}\" mask=\"{get_node_en_name(node)}\" />\n")
-        for node in self.compute_schedule_nodes:
-            f.write(f"    <AddressRange address=\"{get_node_en_name(node)}\" mask=\"{get_node_en_name(node)}\" />\n")
+        en_names = self.groups.names
+        for node in self.user_nodes + self.compute_nodes + self.compute_schedule_nodes:
+            f.write(f"    <AddressRange address=\"{en_names[node]}\" mask=\"{en_names[node]}\" />\n")
         f.write("  </Area>\n\n")
         pass
 
     def write_routers_config(self, f):
         all_routers = self.routers+self.user_gateways+self.computing_gateways
+        en_names = self.groups.names
+        gate_indices = self.topology.gate_indices
         for router in all_routers:
-            f.write(f"  <Router name=\"{get_node_en_name(router)}\" RFC1583Compatible=\"true\">\n")
-            for channel in router.channelList:
-                item = channel.another_point_of_channel(router)
+            f.write(f"  <Router name=\"{en_names[router]}\" RFC1583Compatible=\"true\">\n")
+            for _, channel, item in self.topology.neighbours[router]:
                 if item.nodetype in EDGETYPE:
-                    f.write(f"    <BroadcastInterface ifName=\"eth{router.channelList.index(channel)}\" area=\"0.0.0.0\" interfaceOutputCost=\"1\" />\n")
+                    f.write(f"    <BroadcastInterface ifName=\"eth{gate_indices[(channel, router)]}\" area=\"0.0.0.0\" interfaceOutputCost=\"1\" />\n")
                 elif item.nodetype in ROUTERTYPE:
                     f.write(
-                        f"    <PointToPointInterface ifName=\"eth{router.channelList.index(channel)}\" area=\"0.0.0.0\" interfaceOutputCost=\"1\" />\n")
+                        f"    <PointToPointInterface ifName=\"eth{gate_indices[(channel, router)]}\" area=\"0.0.0.0\" interfaceOutputCost=\"1\" />\n")
 
             f.write(f"  </Router>\n\n")
-        pass
\ No newline at end of file
+        pass
+
+
+def clean_simulator_outputs(project_dir: str) -> List[str]:
+    """
+    只删除上一次仿真产生的输出文件，保留生成的配置文件和哈希清单
+
+    返回:
+        List[str]: 被删除的路径
+    """
+    removed = []
+    for name in SIMULATOR_OUTPUTS:
+        path = os.path.join(project_dir, name)
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path)
+        elif os.path.lexists(path):
+            os.unlink(path)
+        else:
+            continue
+        removed.append(path)
+    return removed
+
+
+def generate_project(project_dir: str, project_name: str, nodes: list, channels: list,
+                     topology: TopologySnapshot = None, task_mode: str = TaskWriter.PER_USER,
+                     compact_tasks: bool = True, compact_modules: bool = None,
+                     external_configurator: bool = None, routing: str = ROUTING_OSPF,
+                     route_metric: str = METRIC_DELAY, arp_mode: str = ARP_DYNAMIC,
+                     sharding: str = SHARD_NEAREST, assignment: SchedulerAssignment = None,
+                     partitions: int = 1, partitioning: Partitioning = None,
+                     run_mode: str = RUN_BATCH) -> dict:
+    """
+    生成仿真所需的全部配置文件（不依赖 Qt）
+
+    每个产物先在内存中渲染，与磁盘上的哈希比较后只重写有变化的文件。
+    task_mode / compact_tasks 见 TaskWriter。
+    compact_modules 见 ModuleGroups，external_configurator 见 ConfiguratorWriter，
+    为 None 时节点数达到 COMPACT_MODULE_THRESHOLD 才启用。
+    routing 为 ROUTING_STATIC 时按 route_metric 离线计算静态路由写入配置器，不再运行 OSPF。
+    arp_mode 为 ARP_GLOBAL 时使用全局地址解析，不发送 ARP 报文。
+    网关按 sharding 分配给调度决策网关（见 scheduler_sharding），已算好的分配结果可通过 assignment 传入。
+    partitions 大于 1 时把拓扑划分为多个分区并写入并行仿真配置（见 partitioning），
+    已算好的分区结果可通过 partitioning 传入；并行仿真配置只生成不运行，且不能与 ARP_GLOBAL 同时使用。
+    run_mode 为 RUN_REALTIME 时使用实时调度器（现场演示），默认尽可能快地运行（见 sim_process）。
+
+    返回:
+        dict: {"written": [...], "unchanged": [...], "removed": [...]}，路径相对于项目目录
+    """
+    if not project_dir or not os.path.isdir(project_dir):
+        raise ValueError("错误的项目地址")
+
+    # 编译一次拓扑快照，供所有写入器共享
+    topology = TopologySnapshot.ensure(topology, nodes, channels)
+    manifest = ArtifactManifest(project_dir)
+    if compact_modules is None:
+        compact_modules = len(topology.nodes) >= COMPACT_MODULE_THRESHOLD
+    if external_configurator is None:
+        external_configurator = len(topology.nodes) >= COMPACT_MODULE_THRESHOLD
+    # 三个写入器必须使用同一套模块名
+    groups = ModuleGroups(topology, compact_modules)
+    if partitioning is None and partitions > 1:
+        partitioning = partition_topology(topology, partitions)
+    if partitioning is not None and partitioning.count > 1 and arp_mode == ARP_GLOBAL:
+        raise ValueError("并行仿真中 GlobalArp 只能看到本分区的接口，不能与全局地址解析同时使用")
+    routes = None
+    if routing == ROUTING_STATIC:
+        routes = compute_static_routes(nodes, channels, topology=topology, metric=route_metric)
+
+    NEDWriter(os.path.join(project_dir, "network.ned"), nodes, channels, project_name,
+              topology=topology, groups=groups, external_configurator=external_configurator,
+              routes=routes).write(manifest)
+    configurator_path = os.path.join(project_dir, CONFIGURATOR_FILE)
+    if external_configurator:
+        ConfiguratorWriter(configurator_path, nodes, channels,
+                           topology=topology, groups=groups, routes=routes).write(manifest)
+    else:
+        manifest.remove(configurator_path)
+    INIWriter(os.path.join(project_dir, "omnetpp.ini"), nodes, channels, project_name,
+              topology=topology, groups=groups, arp_mode=arp_mode,
+              sharding=sharding, assignment=assignment, partitioning=partitioning,
+              run_mode=run_mode).write(manifest)
+    XMLWriter(os.path.join(project_dir, "config.xml"), nodes, channels,
+              topology=topology, groups=groups, routing=routing).write(manifest)
+    TaskWriter(nodes, project_dir, topology=topology, mode=task_mode,
+               compact=compact_tasks).write(manifest)
+    write_network_topology(nodes, project_dir, topology=topology, manifest=manifest)
+
+    manifest.save()
+    return manifest.report()
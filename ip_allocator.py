@@ -0,0 +1,284 @@
+import socket
+import ipaddress
+from functools import lru_cache
+from typing import Dict, List, Optional, Set
+
+from topology import ROUTERTYPE
+
+
+DEFAULT_IP = '111.111.111.111'
+
+
+def parse_ip(ip) -> Optional[int]:
+    """解析 IP 地址为整数，未设置或格式错误时返回 None"""
+    if not ip or ip == DEFAULT_IP or not isinstance(ip, str) or ip.count('.') != 3:
+        return None
+    # inet_aton 比 ipaddress.IPv4Address 快一个数量级，大拓扑下这是主要开销
+    try:
+        return int.from_bytes(socket.inet_aton(ip), 'big')
+    except OSError:
+        return None
+
+
+def _format(value: int) -> str:
+    return f"{value >> 24}.{(value >> 16) & 255}.{(value >> 8) & 255}.{value & 255}"
+
+
+@lru_cache(maxsize=64)
+def mask_prefix(mask) -> Optional[int]:
+    """子网掩码转前缀长度，非法掩码返回 None"""
+    if not mask:
+        return None
+    try:
+        return ipaddress.IPv4Network(f"0.0.0.0/{mask}").prefixlen
+    except (ipaddress.NetmaskValueError, ValueError):
+        return None
+
+
+def _route_gateway(node):
+    """边缘节点的默认路由网关：第一个路由类邻居，没有时为最后一个邻居"""
+    another = None
+    for channel in node.channelList:
+        another = channel.end_item if channel.start_item is node else channel.start_item
+        if another.nodetype in ROUTERTYPE:
+            break
+    return another
+
+
+class IpAllocator:
+    """
+    自动分配子网和 IP 地址
+
+    - 路由类节点之间（Router / UserGateway / ComputingGateway）的链路分配 /30 点对点子网，
+      起点一侧取 .1，终点一侧取 .2，写入双方的 ip_dict / mask_dict；
+    - 每个网关从局域网地址池申请地址块（默认 /24），为挂接的用户节点、算力节点、调度决策网关
+      各分配一个 /30，网关一侧取 .1 写入 ip_dict，主机一侧取 .2 写入 ip / mask。
+
+    分配是增量的：已有的合法且不冲突的地址保持不变，只为缺失或非法的接口分配新地址。
+    地址运算全部使用整数，只有写回节点时才格式化为字符串。
+    """
+
+    def __init__(self, backbone_pool: str = "10.0.0.0/11", lan_pool: str = "10.64.0.0/10",
+                 link_prefix: int = 30, lan_block_prefix: int = 24):
+        """
+        :param backbone_pool: 路由器之间点对点链路使用的地址池，默认 /11 可容纳 524288 条 /30 链路，
+            足够 topology_generator 生成的上万个路由器的拓扑
+        :param lan_pool: 网关局域网使用的地址池
+        :param link_prefix: 每条链路子网的前缀长度
+        :param lan_block_prefix: 每个网关一次申请的局域网地址块前缀长度
+        """
+        self.backbone_pool = ipaddress.IPv4Network(backbone_pool)
+        self.lan_pool = ipaddress.IPv4Network(lan_pool)
+        if self.backbone_pool.overlaps(self.lan_pool):
+            raise ValueError("骨干地址池与局域网地址池重叠")
+        if not (self.lan_pool.prefixlen <= lan_block_prefix <= link_prefix <= 30):
+            raise ValueError("前缀长度设置错误")
+        self.link_prefix = link_prefix
+        self.lan_block_prefix = lan_block_prefix
+        self.link_size = 1 << (32 - link_prefix)
+        self.block_size = 1 << (32 - lan_block_prefix)
+        self.link_mask = str(ipaddress.IPv4Network(f"0.0.0.0/{link_prefix}").netmask)
+        lan_start = int(self.lan_pool.network_address)
+        self.lan_pool_range = range(lan_start, lan_start + self.lan_pool.num_addresses)
+
+    def allocate(self, nodes: list, channels: list) -> Dict[str, list]:
+        """
+        为拓扑分配地址
+
+        返回:
+            dict: {"kept": [...], "assigned": [...], "skipped": [...]}，元素为链路描述字符串
+        """
+        # 只需要节点名和主机的默认路由网关，不构建只读的 TopologySnapshot
+        en_names = {node: f"{node.nodetype}{node.index}" for node in nodes}
+        report = {"kept": [], "assigned": [], "skipped": []}
+
+        # 已占用的链路子网（以子网起始地址的整数表示）和地址
+        self._used_links: Set[int] = set()
+        self._used_addresses: Set[int] = set()
+        # 网关 -> 拥有的局域网地址块；地址块 -> 网关
+        self._gateway_blocks: Dict[object, List[int]] = {}
+        self._block_owner: Dict[int, object] = {}
+        # 地址块 -> 下一个候选链路子网，已分配过的位置不再扫描
+        self._block_cursors: Dict[int, int] = {}
+        self._backbone_cursor = int(self.backbone_pool.network_address)
+        self._lan_cursor = int(self.lan_pool.network_address)
+
+        p2p_links, host_links = self._classify(channels, en_names, report)
+
+        # 第一遍：保留合法的已有分配并登记占用
+        pending_p2p = []
+        for a, b in p2p_links:
+            if self._claim_p2p(a, b):
+                report["kept"].append(f"{en_names[a]}<->{en_names[b]}")
+            else:
+                pending_p2p.append((a, b))
+        pending_hosts = []
+        for gateway, host, primary in host_links:
+            if self._claim_host(gateway, host, primary):
+                report["kept"].append(f"{en_names[gateway]}<->{en_names[host]}")
+            else:
+                pending_hosts.append((gateway, host, primary))
+
+        # 第二遍：为缺失的接口分配新地址
+        for a, b in pending_p2p:
+            network = self._next_backbone_link()
+            a.ip_dict[b] = _format(network + 1)
+            b.ip_dict[a] = _format(network + 2)
+            a.mask_dict[b] = b.mask_dict[a] = self.link_mask
+            report["assigned"].append(f"{en_names[a]}<->{en_names[b]}")
+        for gateway, host, primary in pending_hosts:
+            network = self._next_lan_link(gateway)
+            gateway.ip_dict[host] = _format(network + 1)
+            gateway.mask_dict[host] = self.link_mask
+            if primary:
+                host.ip = _format(network + 2)
+                host.mask = self.link_mask
+            report["assigned"].append(f"{en_names[gateway]}<->{en_names[host]}")
+
+        return report
+
+    # ---------- 链路分类 ----------
+    def _classify(self, channels: list, en_names: Dict[object, str], report):
+        """
+        返回 (路由器间链路列表, 网关-主机链路列表)
+        同一对节点之间的多条链路只处理一次（ip_dict 以对端节点为键）
+        主机只有第一个路由类邻居的链路决定其自身地址（primary）
+        """
+        # 主机 -> 默认路由网关，与 TopologySnapshot.route_gateway 一致，按需计算
+        route_gateways = {}
+        seen = set()
+        p2p_links = []
+        host_links = []
+        for channel in channels:
+            a, b = channel.start_item, channel.end_item
+            key = (a, b) if id(a) < id(b) else (b, a)
+            if key in seen:
+                continue
+            seen.add(key)
+            a_router = a.nodetype in ROUTERTYPE
+            b_router = b.nodetype in ROUTERTYPE
+            if a_router and b_router:
+                p2p_links.append((a, b))
+            elif a_router or b_router:
+                gateway, host = (a, b) if a_router else (b, a)
+                if host not in route_gateways:
+                    route_gateways[host] = _route_gateway(host)
+                primary = route_gateways[host] is gateway
+                host_links.append((gateway, host, primary))
+            else:
+                report["skipped"].append(f"{en_names[a]}<->{en_names[b]}")
+        return p2p_links, host_links
+
+    # ---------- 已有分配的校验与登记 ----------
+    def _subnet_slots(self, network: int, prefix: int) -> range:
+        """子网覆盖的链路子网起始地址"""
+        if prefix >= self.link_prefix:
+            start = network - network % self.link_size
+            return range(start, start + 1)
+        return range(network, network + (1 << (32 - prefix)), self.link_size)
+
+    def _claim(self, addresses, mask_a, mask_b) -> Optional[int]:
+        """校验一对接口地址，合法则登记占用并返回子网起始地址"""
+        if None in addresses or mask_a != mask_b:
+            return None
+        prefix = mask_prefix(mask_a)
+        # 过大的子网不做整体登记，视为需要重新分配
+        if prefix is None or prefix > 30 or prefix < 16:
+            return None
+        host_bits = (1 << (32 - prefix)) - 1
+        network = addresses[0] & ~host_bits & 0xFFFFFFFF
+        for address in addresses:
+            if address & ~host_bits & 0xFFFFFFFF != network:
+                return None
+            # 不能是网络地址或广播地址，也不能与其他接口重复
+            if address == network or address == network | host_bits or address in self._used_addresses:
+                return None
+        if addresses[0] == addresses[1]:
+            return None
+        slots = self._subnet_slots(network, prefix)
+        if any(slot in self._used_links for slot in slots):
+            return None
+        self._used_links.update(slots)
+        self._used_addresses.update(addresses)
+        return network
+
+    def _claim_p2p(self, a, b) -> bool:
+        addresses = (parse_ip(a.ip_dict.get(b)), parse_ip(b.ip_dict.get(a)))
+        return self._claim(addresses, a.mask_dict.get(b), b.mask_dict.get(a)) is not None
+
+    def _claim_host(self, gateway, host, primary) -> bool:
+        gateway_address = parse_ip(gateway.ip_dict.get(host))
+        if not primary:
+            # 次要链路只需要网关一侧的地址，占用其所在的链路子网
+            prefix = mask_prefix(gateway.mask_dict.get(host))
+            if gateway_address is None or prefix is None or prefix > 30 or gateway_address in self._used_addresses:
+                return False
+            slot = gateway_address - gateway_address % self.link_size
+            if slot in self._used_links:
+                return False
+            self._used_links.add(slot)
+            self._used_addresses.add(gateway_address)
+            self._adopt_block(gateway, gateway_address)
+            return True
+        network = self._claim((gateway_address, parse_ip(host.ip)), gateway.mask_dict.get(host), host.mask)
+        if network is None:
+            return False
+        self._adopt_block(gateway, network)
+        return True
+
+    def _adopt_block(self, gateway, address: int):
+        """已有地址所在的局域网地址块归属该网关，后续新主机优先从中分配"""
+        if address not in self.lan_pool_range:
+            return
+        block = address - address % self.block_size
+        if block not in self._block_owner:
+            self._block_owner[block] = gateway
+            self._gateway_blocks.setdefault(gateway, []).append(block)
+
+    # ---------- 新地址分配 ----------
+    def _next_backbone_link(self) -> int:
+        end = int(self.backbone_pool.broadcast_address)
+        while self._backbone_cursor + self.link_size - 1 <= end:
+            network = self._backbone_cursor
+            self._backbone_cursor += self.link_size
+            if network not in self._used_links:
+                self._used_links.add(network)
+                return network
+        raise RuntimeError(f"骨干地址池 {self.backbone_pool} 已耗尽")
+
+    def _next_lan_link(self, gateway) -> int:
+        blocks = self._gateway_blocks.setdefault(gateway, [])
+        while True:
+            for block in blocks:
+                network = self._free_link_in_block(block)
+                if network is not None:
+                    return network
+            blocks.append(self._next_lan_block(gateway))
+
+    def _free_link_in_block(self, block: int) -> Optional[int]:
+        cursors = self._block_cursors
+        network = cursors.get(block, block)
+        end = block + self.block_size
+        while network < end:
+            if network not in self._used_links:
+                self._used_links.add(network)
+                cursors[block] = network + self.link_size
+                return network
+            network += self.link_size
+        cursors[block] = end
+        return None
+
+    def _next_lan_block(self, gateway) -> int:
+        end = int(self.lan_pool.broadcast_address)
+        while self._lan_cursor + self.block_size - 1 <= end:
+            block = self._lan_cursor
+            self._lan_cursor += self.block_size
+            if block not in self._block_owner:
+                self._block_owner[block] = gateway
+                return block
+        raise RuntimeError(f"局域网地址池 {self.lan_pool} 已耗尽")
+
+
+def allocate_addresses(nodes: list, channels: list, **kwargs) -> Dict[str, list]:
+    """使用默认地址池为拓扑增量分配地址"""
+    return IpAllocator(**kwargs).allocate(nodes, channels)
@@ -0,0 +1,135 @@
+from PySide6.QtWidgets import QGraphicsItem
+from PySide6.QtCore import Qt, QRectF
+from PySide6.QtGui import QColor, QPen, QBrush, QFont
+
+
+class LoadBadgeItem(QGraphicsItem):
+    """
+    算力节点负载角标
+
+    作为算力节点的子图元显示在图标右上角，内容为任务队列长度和存储占用率，
+    背景色按负载高低变化。开启设备坐标缓存，只有数值变化时才重绘。
+    """
+
+    WIDTH = 64
+    HEIGHT = 18
+
+    # 负载等级 -> 背景色（低/中/高）
+    LEVEL_BRUSHES = [
+        QBrush(QColor(76, 175, 80, 220)),
+        QBrush(QColor(255, 193, 7, 220)),
+        QBrush(QColor(244, 67, 54, 220)),
+    ]
+    BORDER_PEN = QPen(QColor(60, 60, 60), 1)
+    TEXT_PEN = QPen(QColor(255, 255, 255))
+    # QFont 需要在 QApplication 创建之后构造，首次使用时再初始化
+    FONT = None
+
+    # 任务队列长度阈值（中/高）
+    QUEUE_THRESHOLDS = (3, 8)
+    # 存储占用率阈值（中/高）
+    STORAGE_THRESHOLDS = (0.6, 0.85)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.queue_length = 0
+        self.storage_ratio = 0.0
+        self.level = 0
+        self.text = ""
+        self.setZValue(5)
+        self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+        # 角标不参与选择和拖动，点击交给节点本身
+        self.setAcceptedMouseButtons(Qt.NoButton)
+        if LoadBadgeItem.FONT is None:
+            LoadBadgeItem.FONT = QFont("Arial", 7, QFont.Bold)
+
+    @classmethod
+    def level_of(cls, queue_length, storage_ratio):
+        """根据队列长度和存储占用率计算负载等级"""
+        level = 0
+        for i, threshold in enumerate(cls.QUEUE_THRESHOLDS):
+            if queue_length >= threshold:
+                level = max(level, i + 1)
+        for i, threshold in enumerate(cls.STORAGE_THRESHOLDS):
+            if storage_ratio >= threshold:
+                level = max(level, i + 1)
+        return level
+
+    def set_load(self, queue_length, storage_ratio):
+        """
+        更新角标数值
+
+        返回:
+            bool: 显示内容有变化时返回 True
+        """
+        storage_ratio = min(max(storage_ratio, 0.0), 1.0)
+        text = f"Q{queue_length} S{storage_ratio:.0%}"
+        if text == self.text:
+            return False
+        self.queue_length = queue_length
+        self.storage_ratio = storage_ratio
+        self.level = self.level_of(queue_length, storage_ratio)
+        self.text = text
+        self.setToolTip(f"任务队列: {queue_length}个任务\n存储占用: {storage_ratio:.1%}")
+        self.update()
+        return True
+
+    def boundingRect(self):
+        return QRectF(0, 0, self.WIDTH, self.HEIGHT)
+
+    def paint(self, painter, option, widget=None):
+        rect = self.boundingRect().adjusted(0.5, 0.5, -0.5, -0.5)
+        painter.setPen(self.BORDER_PEN)
+        painter.setBrush(self.LEVEL_BRUSHES[self.level])
+        painter.drawRoundedRect(rect, 4, 4)
+        painter.setPen(self.TEXT_PEN)
+        painter.setFont(self.FONT)
+        painter.drawText(rect, Qt.AlignCenter, self.text)
+
+
+class LoadBadgeController:
+    """
+    负载角标增量更新
+
+    记录上一次显示的每个节点的 (队列长度, 可用存储)，
+    新快照到来时只更新数值发生变化的节点角标。
+    """
+
+    def __init__(self):
+        # 算力节点编号 -> 算力节点对象
+        self.node_dict = {}
+        # 算力节点编号 -> (队列长度, 可用存储)
+        self.last_values = {}
+
+    def set_nodes(self, node_dict: dict):
+        """设置算力节点编号到节点对象的映射，并清除旧角标"""
+        self.reset()
+        self.node_dict = node_dict
+
+    def apply_snapshot(self, snapshot: dict) -> int:
+        """
+        按快照与上次显示值的差异更新角标
+
+        返回:
+            int: 实际更新的角标数量
+        """
+        changed = 0
+        last_values = self.last_values
+        for node_state in snapshot.get("nodeStates", []):
+            node_id = node_state["nodeId"]
+            values = (len(node_state.get("taskQueue", [])), node_state.get("availableStorage"))
+            if last_values.get(node_id) == values:
+                continue
+            last_values[node_id] = values
+            node = self.node_dict.get(node_id)
+            if node is None:
+                continue
+            node.show_load(*values)
+            changed += 1
+        return changed
+
+    def reset(self):
+        """隐藏所有角标并清空记录"""
+        for node in self.node_dict.values():
+            node.hide_load()
+        self.last_values.clear()
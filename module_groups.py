@@ -0,0 +1,173 @@
+"""
+紧凑输出模式：把同构节点合并为 NED 子模块向量
+
+同一类型、接口数相同的用户节点 / 算力节点合并成 userNode[n] / computeNode[n]，
+omnetpp.ini 中相同的参数只写一条通配规则，编号等随位置线性变化的参数写成
+下标区间 + parentIndex() 表达式，只有确实不同的参数（地址、离群值）才逐个写出。
+接口数与组内多数不同的节点保持原来的单独子模块。
+"""
+from collections import Counter
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from topology import TopologySnapshot
+
+
+# 可以合并为向量的节点类型 -> (向量名, NED 模块类型)
+VECTOR_TYPES = {
+    "UserNode": ("userNode", "UserNode"),
+    "ComputingNode": ("computeNode", "ComputeNode"),
+}
+
+# 少于该数量的同构节点不合并
+MIN_VECTOR_SIZE = 2
+
+
+class ModuleVector:
+    """一个子模块向量"""
+
+    __slots__ = ("name", "nodetype", "module_type", "gate_count", "members")
+
+    def __init__(self, name: str, nodetype: str, module_type: str, gate_count: int, members: list):
+        self.name = name
+        self.nodetype = nodetype
+        self.module_type = module_type
+        self.gate_count = gate_count
+        # 按节点编号排序，编号连续时向量下标与编号线性对应
+        self.members = members
+
+    def __len__(self):
+        return len(self.members)
+
+    def element(self, position) -> str:
+        return f"{self.name}[{position}]"
+
+    def pattern(self, first: int, last: int) -> str:
+        """下标区间对应的 ini 通配模式"""
+        if first == last:
+            return self.element(first)
+        if first == 0 and last == len(self.members) - 1:
+            return f"{self.name}[*]"
+        return f"{self.name}[{first}..{last}]"
+
+
+class ModuleGroups:
+    """
+    节点到 NED 模块名的映射
+
+    compact=False 时所有节点都是单独的子模块，名称与 TopologySnapshot.en_names 相同。
+    """
+
+    def __init__(self, topology: TopologySnapshot, compact: bool = True,
+                 min_vector_size: int = MIN_VECTOR_SIZE):
+        self.topology = topology
+        self.vectors: List[ModuleVector] = []
+        # 节点 -> (所属向量, 下标)
+        self.positions: Dict[object, Tuple[ModuleVector, int]] = {}
+        names = dict(topology.en_names)
+
+        if compact:
+            for nodetype, (vector_name, module_type) in VECTOR_TYPES.items():
+                nodes = topology.of_type(nodetype)
+                if len(nodes) < min_vector_size:
+                    continue
+                # 接口数最常见的一组合并为向量，其余作为离群节点单独声明
+                gate_count, size = Counter(len(topology.neighbours[node]) for node in nodes).most_common(1)[0]
+                if size < min_vector_size:
+                    continue
+                members = sorted((node for node in nodes if len(topology.neighbours[node]) == gate_count),
+                                 key=lambda node: node.index)
+                vector = ModuleVector(vector_name, nodetype, module_type, gate_count, members)
+                self.vectors.append(vector)
+                for position, node in enumerate(members):
+                    self.positions[node] = (vector, position)
+                    names[node] = vector.element(position)
+
+        self.names = names
+        # 不属于任何向量的节点，保持拓扑中的顺序
+        self.individual_nodes = tuple(node for node in topology.nodes if node not in self.positions)
+
+    def name(self, node) -> str:
+        return self.names[node]
+
+    def vector_of(self, nodetype: str) -> Optional[ModuleVector]:
+        for vector in self.vectors:
+            if vector.nodetype == nodetype:
+                return vector
+        return None
+
+    def individual_of_type(self, nodetype: str) -> tuple:
+        return tuple(node for node in self.topology.of_type(nodetype) if node not in self.positions)
+
+
+def _runs(values: list, step: int) -> Iterator[Tuple[int, int]]:
+    """
+    把值序列切分为相邻元素之差恒为 step 的最长区间
+    step=0 时是相等值的区间，step=1 时是随下标递增的区间
+    """
+    def continues(previous, current):
+        if previous is None or current is None:
+            return False
+        return current == previous if step == 0 else current == previous + step
+
+    start = 0
+    for position in range(1, len(values) + 1):
+        if position == len(values) or not continues(values[position - 1], values[position]):
+            yield start, position - 1
+            start = position
+
+
+def _format_value(value) -> str:
+    if isinstance(value, str):
+        return f"\"{value}\""
+    return str(value)
+
+
+def vector_parameter_lines(vector: ModuleVector, key: str, value_of: Callable,
+                           linear: bool = False) -> List[str]:
+    """
+    生成一个参数在整个向量上的 ini 行
+
+    :param key: 模块以下的参数路径，如 "app[0].computeNodeId"
+    :param value_of: 节点 -> 参数值，返回 None 表示该节点不写这个参数
+    :param linear: 参数是否为整数且通常随下标递增（如节点编号），是则尝试写成 parentIndex() 表达式
+
+    ini 中先匹配到的规则生效，因此单个下标和下标区间的行在前，覆盖全部下标的通配行在最后。
+    """
+    values = [value_of(node) for node in vector.members]
+    specific = []
+    fallback = None
+
+    if linear:
+        for first, last in _runs(values, 1):
+            if values[first] is None:
+                continue
+            if first == last:
+                specific.append((first, last, _format_value(values[first])))
+                continue
+            offset = values[first] - first
+            if offset == 0:
+                expression = "parentIndex()"
+            elif offset > 0:
+                expression = f"parentIndex() + {offset}"
+            else:
+                expression = f"parentIndex() - {-offset}"
+            if first == 0 and last == len(values) - 1:
+                fallback = expression
+            else:
+                specific.append((first, last, expression))
+    else:
+        present = [value for value in values if value is not None]
+        # 没有节点缺省该参数时，出现次数最多的值写成通配行
+        if present and len(present) == len(values):
+            fallback = _format_value(Counter(present).most_common(1)[0][0])
+        for first, last in _runs(values, 0):
+            if values[first] is None:
+                continue
+            text = _format_value(values[first])
+            if text != fallback:
+                specific.append((first, last, text))
+
+    lines = [f"**.{vector.pattern(first, last)}.{key} = {text}\n" for first, last, text in specific]
+    if fallback is not None:
+        lines.append(f"**.{vector.name}[*].{key} = {fallback}\n")
+    return lines
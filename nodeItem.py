@@ -15,6 +15,7 @@ from PySide6.QtGui import QPixmap, QPen, QColor, QTransform, QAction, QPainterPa
 from io import BytesIO
 import weakref
 from set_ip_and_mask import SetIpAndMask
+from shard_badge import ShardBadgeItem
 
 class ObservableList(list):
     """自定义列表类，任何修改都会触发回调函数"""
@@ -101,6 +102,8 @@ class ObservableList(list):
 class NodeItem(QGraphicsItem, QObject):
     # 定义一个信号，用于在删除节点时发射，传递当前节点对象
     delete_self = Signal(object)
+    # 图标缓存：同类节点共用一个 QPixmap（隐式共享），批量创建节点时不必重复读取和解码图片
+    _icon_cache = {}
 
     def __init__(self, name:str, nodetype, index, icon_path, mainwindow, parent=None):
         """
@@ -128,7 +131,7 @@ class NodeItem(QGraphicsItem, QObject):
         self.mainwindow = mainwindow
         self.icon_path = icon_path
         # 加载节点图标
-        self.icon = QPixmap(icon_path)
+        self.icon = NodeItem.load_icon(icon_path)
         # 存储与该节点相连的通道列表
         self.channelList = ObservableList(callback=self.update_dicts)
         # 初始化节点的控件，初始值为 0
@@ -138,6 +141,8 @@ class NodeItem(QGraphicsItem, QObject):
         self.mask = '255.255.255.0'
         # 定义节点选中时的边框样式，蓝色虚线边框，线宽为 2
         self.border_pen = QPen(QColor(0, 0, 255), 2, Qt.DashLine)
+        # 调度分片角标，生成配置文件后显示在网关和调度决策网关上
+        self.shard_badge = None
         # 设置节点可移动
         self.setFlag(QGraphicsItem.ItemIsMovable)
         # 设置节点可选择
@@ -149,6 +154,15 @@ class NodeItem(QGraphicsItem, QObject):
         # 初始化节点的用户界面
         self.init_ui()
 
+    @classmethod
+    def load_icon(cls, icon_path):
+        """按路径缓存图标"""
+        icon = cls._icon_cache.get(icon_path)
+        if icon is None:
+            icon = QPixmap(icon_path)
+            cls._icon_cache[icon_path] = icon
+        return icon
+
     def init_ui(self):
         """
         初始化节点的用户界面，添加可编辑的文本框。
@@ -215,6 +229,8 @@ class NodeItem(QGraphicsItem, QObject):
         state["y"] = self.scenePos().y()
         # 清空通道列表，避免序列化时出现问题
         state.pop('channelList')
+        # 调度分片角标每次生成配置文件时重新计算，不保存
+        state.pop("shard_badge", None)
         # 删除元对象属性，因为它不可序列化
         # del state["__METAOBJECT__"]
         if "__METAOBJECT__" in state.keys():
@@ -468,6 +484,25 @@ class NodeItem(QGraphicsItem, QObject):
         new_node.mask = self.mask
         return new_node
 
+    def show_shard(self, text, order, tooltip):
+        """
+        在图标左上角显示调度分片角标
+
+        :param text: 角标文字（所属调度决策网关）
+        :param order: 调度决策网关的序号，决定角标颜色
+        :param tooltip: 鼠标悬停时的提示
+        """
+        if self.shard_badge is None:
+            self.shard_badge = ShardBadgeItem(self)
+            self.shard_badge.setPos(-ShardBadgeItem.WIDTH / 2, -ShardBadgeItem.HEIGHT / 2)
+        self.shard_badge.set_shard(text, order, tooltip)
+        self.shard_badge.setVisible(True)
+
+    def hide_shard(self):
+        """隐藏调度分片角标"""
+        if self.shard_badge is not None:
+            self.shard_badge.setVisible(False)
+
     def update_dicts(self):
         # Router类特有的函数
         pass
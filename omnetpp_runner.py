@@ -9,7 +9,12 @@ from pathlib import Path
 import copy
 from typing_extensions import overload
 from PySide6.QtCore import QTimer, QObject, Signal
-import psutil
+
+from sim_process import (SimulationProcess, RunLimits, opp_run_command, check_simulator, check_runnable, STDOUT,
+                         END_COMPLETED, END_REASON_TEXT)
+from sim_progress import CmdenvProgress, PROGRESS_FILE
+from resource_profile import PROFILE_FILE
+from result_cache import run_key
 
 '''
 算力网络仿真程序，基于修改MSYS2的配置实现
@@ -76,7 +81,9 @@ class OmnetppRunner(QObject):
 
         # 完成标志
         self._finished = False
-        # self._process = None
+        # 启动的 cmd.exe 进程，以及找到的 mintty 窗口进程句柄（psutil.Process）
+        self._process = None
+        self._windows = []
         self._current_test_id = None
 
     def _generate_lock_name(self, test_id):
@@ -152,8 +159,8 @@ class OmnetppRunner(QObject):
             self._backup_file()
             self._inject_command()
 
-            # 启动子进程（非阻塞）
-            subprocess.Popen(
+            # 启动子进程（非阻塞），保留句柄用于判断是否结束
+            self._process = subprocess.Popen(
                 [
                     "cmd.exe",
                     "/c",
@@ -187,25 +194,32 @@ class OmnetppRunner(QObject):
         self._timer.timeout.connect(self._check_result_file)
         self._timer.start(500)  # 每500ms检查一次
 
+    def _track_windows(self):
+        """
+        记录 cmd.exe 启动的子孙进程（mintty 窗口及其中的 bash、opp_run）
+        只查询自己启动的进程的子进程，不扫描系统进程表；cmd.exe 退出后已记录的句柄仍然有效
+        """
+        import psutil
+        if self._process is None or self._process.poll() is not None:
+            return
+        try:
+            known = {proc.pid for proc in self._windows}
+            for child in psutil.Process(self._process.pid).children(recursive=True):
+                if child.pid not in known:
+                    self._windows.append(child)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+
+    def _simulator_running(self) -> bool:
+        """cmd.exe 或记录的任一子孙进程仍在运行"""
+        self._track_windows()
+        if self._process is not None and self._process.poll() is None:
+            return True
+        return any(proc.is_running() for proc in self._windows)
+
     def _check_result_file(self):
         """检查结果文件是否存在/窗口是否打开"""
-        windows_closed = False
-        # 检查mintty是否打开
-        import psutil
-        for proc in psutil.process_iter(['name', 'exe', 'cmdline']):
-            try:
-                # 检查进程名是否为 mintty.exe
-                if proc.info['name'] == 'mintty.exe':
-                    exe_path = proc.info['exe'] or ""
-                    target_dir = os.path.normcase(self.OMNETPP_ROOT)
-                    exe_dir = os.path.normcase(os.path.dirname(exe_path))
-                    if target_dir in exe_dir:  # 严格匹配目录
-                        windows_closed = False
-                        break
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
-        else:
-            windows_closed = True
+        windows_closed = not self._simulator_running()
         file_path = Path(self.PROJECT_ROOT) / "results.json"
         # 检查文件是否存在或进程是否已结束
         if file_path.exists() or windows_closed:
@@ -217,6 +231,27 @@ class OmnetppRunner(QObject):
             self.deleteLater()
             self.simulation_finished.emit()
 
+    def terminate(self) -> bool:
+        """
+        关闭启动的 mintty 窗口及其子孙进程
+
+        返回:
+            bool: 权限不足未能关闭时返回 False
+        """
+        import psutil
+        if hasattr(self, "_timer"):
+            self._timer.stop()
+        self._track_windows()
+        closed = True
+        for proc in self._windows:
+            try:
+                proc.terminate()
+            except psutil.NoSuchProcess:
+                continue
+            except psutil.AccessDenied:
+                closed = False
+        return closed
+
     def _cleanup_on_error(self):
         """出错时的清理"""
         print("出错了！")
@@ -293,6 +328,145 @@ class OmnetppRunner(QObject):
             print(f"检测过程中发生错误: {e}")
             return False
 
+class ProcessRunner(QObject):
+    """
+    直接启动仿真程序的运行器（Linux 等 POSIX 系统）
+
+    信号与 OmnetppRunner 相同；子进程的输出逐行通过 output_received(流名称, 行) 发出，
+    解析到 Cmdenv 的进度输出时发出 progress_changed(CmdenvProgress)，
+    进程正常结束时发出 simulation_finished，出错或超出资源限制（见 RunLimits）时
+    先发出 encountering_errors 再发出 simulation_finished，结束原因见 end_reason。
+    进度曲线和资源占用采样在进程退出后保存为项目目录中的 progress.csv 和 resource_profile.csv。
+    给定结果缓存时，缓存命中则直接复制输出而不启动仿真程序，成功的运行结束后存入缓存。
+    """
+    simulation_finished = Signal()
+    encountering_errors = Signal()
+    output_received = Signal(str, str)
+    progress_changed = Signal(object)
+
+    # 轮询输出的间隔（ms）
+    POLL_INTERVAL = 100
+
+    def __init__(self, command: list, projectdir: str | Path, env: dict = None, expected_sim_time: float = None,
+                 cache=None, limits: RunLimits = None):
+        """
+        :param expected_sim_time: 预计的仿真时长（s），用于估算进度和剩余时间
+        :param cache: 结果缓存（result_cache.ResultCache），为 None 时总是运行仿真
+        :param limits: 墙钟时间、CPU 时间和内存限制
+        """
+        super().__init__()
+        self.PROJECT_ROOT = projectdir
+        self.progress = CmdenvProgress(expected_sim_time)
+        self.process = SimulationProcess(command, str(projectdir), env, on_output=self._on_output, limits=limits)
+        self.cache = cache
+        self.cache_key = None
+        # 输出是否取自缓存
+        self.cached = False
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._poll)
+
+    @property
+    def returncode(self):
+        return 0 if self.cached else self.process.returncode
+
+    @property
+    def end_reason(self):
+        """结束原因（sim_process 的 END_*），运行中为 None"""
+        return END_COMPLETED if self.cached else self.process.end_reason
+
+    def run(self):
+        """启动仿真程序后立即返回，由定时器读取输出"""
+        if self.cache is not None:
+            self.cache_key = run_key(str(self.PROJECT_ROOT), self.process.command)
+            meta = self.cache.restore(self.cache_key, str(self.PROJECT_ROOT))
+            if meta is not None:
+                self.cached = True
+                print(f"配置与仿真程序未变化，输出取自结果缓存 {self.cache_key[:12]}")
+                # 界面在仿真结束后回放调度事件日志，与仿真程序运行了多久无关；等调用方连接好信号后再结束
+                self._timer.singleShot(0, self._finish_cached)
+                return
+        print(f"启动仿真: {' '.join(self.process.command)}")
+        self.process.start()
+        self._timer.start(self.POLL_INTERVAL)
+
+    def _finish_cached(self):
+        if self.cached:
+            self.simulation_finished.emit()
+
+    def _on_output(self, stream, line):
+        self.output_received.emit(stream, line)
+        if stream == STDOUT and self.progress.feed(line):
+            self.progress_changed.emit(self.progress)
+
+    def _poll(self):
+        returncode = self.process.poll()
+        if returncode is None:
+            return
+        self._timer.stop()
+        self._save_progress()
+        print(f"仿真程序已退出（{END_REASON_TEXT[self.end_reason]}），退出码 {returncode}，"
+              f"用时 {self.process.elapsed:.1f}s")
+        if self.end_reason == END_COMPLETED and self.cache is not None:
+            self.cache.store(self.cache_key, str(self.PROJECT_ROOT), elapsed=self.process.elapsed)
+        if self.end_reason != END_COMPLETED:
+            self.encountering_errors.emit()
+        self.simulation_finished.emit()
+
+    def terminate(self):
+        """结束仿真程序"""
+        self._timer.stop()
+        if self.cached:
+            # 没有启动仿真程序；之后不再发出 simulation_finished
+            self.cached = False
+            return
+        if self.process.process is None:
+            return
+        self.process.terminate()
+        self._save_progress()
+
+    def _save_progress(self):
+        try:
+            self.progress.save(os.path.join(self.PROJECT_ROOT, PROGRESS_FILE))
+            self.process.save_profile(os.path.join(self.PROJECT_ROOT, PROFILE_FILE))
+        except OSError as e:
+            print(f"保存仿真进度失败: {e}")
+
+    def error_output(self, lines: int = 20) -> str:
+        """结束原因和最后若干行输出，用于出错提示"""
+        output = [line for _, line in list(self.process.tail)[-lines:]]
+        if self.end_reason not in (None, END_COMPLETED):
+            reason = END_REASON_TEXT[self.end_reason]
+            if self.process.limits:
+                reason += f"（{self.process.limits.describe()}）"
+            output.insert(0, reason)
+        return "\n".join(output)
+
+
+def create_runner(omnetpp_dir: str, project_dir: str, project_name: str, config: str = "static",
+                  expected_sim_time: float = None, cache=None, limits: RunLimits = None):
+    """
+    按平台选择运行器：Windows 使用 MSYS2 方式，其他系统直接启动 opp_run（或 CPN_SIMULATOR 指定的命令）
+
+    :param expected_sim_time: 预计的仿真时长（s），直接启动时用于估算进度
+    :param cache: 结果缓存，直接启动时使用
+    :param limits: 资源限制，直接启动时使用
+    """
+    error = check_runnable(project_dir)
+    if error:
+        raise ValueError(error)
+    if sys.platform == "win32":
+        run_command = [f"cd ./samples/inet/examples/computing_power_network/{project_name}",
+                       f"opp_run -u Cmdenv -c {config} -n ../../../src:../..:../../../tutorials:../../../showcases"
+                       " -l ../../../src/INET omnetpp.ini"
+                       ]
+        return OmnetppRunner(omnetpp_dir, project_dir, run_command)
+    error = check_simulator(omnetpp_dir)
+    if error:
+        raise ValueError(error)
+    command, env = opp_run_command(omnetpp_dir, project_dir, config)
+    return ProcessRunner(command, project_dir, env, expected_sim_time, cache, limits)
+
+
 if __name__ == "__main__":
     print("测试")
     from PySide6.QtWidgets import QApplication
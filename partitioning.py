@@ -0,0 +1,300 @@
+"""
+并行仿真（parsim）分区
+
+把拓扑划分为若干个分区，每个分区由一个仿真进程运行。分区之间的链路时延就是 lookahead，
+null message 同步的开销随 lookahead 减小而增大，因此：
+
+1. 时延为 0 的链路不能被切开，先用并查集把其两端合并为一个整体；
+2. 切开一条链路的代价为 1 / 时延，优先切时延大的链路；
+3. 每个节点的负载为 1 + 接口数（事件数大致与经过的帧数成正比）。
+
+初始划分从彼此相距最远的种子节点同时向外生长（总是让当前负载最小的分区吸收与它连接最紧的邻居），
+随后做若干轮边界节点的贪心移动（Fiduccia-Mattheyses 的简化形式），在负载不超过
+(1 + imbalance) * 平均负载的前提下减小切边代价。
+
+注意 Ipv4NetworkConfigurator、GlobalArp 等需要访问全网模块的组件在多进程下只能看到本分区的模块，
+使用并行仿真时应保留 config.xml 中的静态地址配置并使用动态 ARP（generate_project 拒绝 GlobalArp）。
+
+目前只生成并行仿真配置：界面、命令行和多次运行执行器都只启动单个仿真进程，
+不会运行并行仿真配置（见 sim_process.check_runnable）。需要时在项目目录中为每个分区
+分别启动 opp_run（--parsim-procid=<分区号> --parsim-num-partitions=<分区数>）。
+"""
+from collections import deque
+from typing import Dict, List
+
+from topology import TopologySnapshot
+
+
+# 写入 omnetpp.ini 的并行仿真设置（check_runnable 按第一行识别并行仿真配置）
+PARSIM_ENABLED_LINE = "parallel-simulation = true"
+PARSIM_COMMUNICATIONS = "cNamedPipeCommunications"
+PARSIM_SYNCHRONIZATION = "cNullMessageProtocol"
+
+# 允许的负载不均衡度
+DEFAULT_IMBALANCE = 0.05
+# 边界优化的最大轮数
+REFINE_PASSES = 8
+
+
+class _Clusters:
+    """用并查集把零时延链路两端的节点合并为不可分割的整体"""
+
+    def __init__(self, topology: TopologySnapshot):
+        parent = {node: node for node in topology.nodes}
+
+        def find(node):
+            while parent[node] is not node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+
+        for channel in topology.channels:
+            if float(channel.banddelay) <= 0:
+                a, b = find(channel.start_item), find(channel.end_item)
+                if a is not b:
+                    parent[b] = a
+
+        # 整体编号按节点在画布上的顺序，结果稳定
+        self.id_of: Dict[object, int] = {}
+        self.members: List[list] = []
+        roots = {}
+        for node in topology.nodes:
+            root = find(node)
+            if root not in roots:
+                roots[root] = len(self.members)
+                self.members.append([])
+            self.id_of[node] = roots[root]
+            self.members[roots[root]].append(node)
+
+        count = len(self.members)
+        self.weights = [0] * count
+        for node in topology.nodes:
+            self.weights[self.id_of[node]] += 1 + len(topology.neighbours[node])
+        # 整体 -> {相邻整体: 切开代价}
+        self.edges: List[Dict[int, float]] = [{} for _ in range(count)]
+        for channel in topology.channels:
+            a, b = self.id_of[channel.start_item], self.id_of[channel.end_item]
+            if a == b:
+                continue
+            cost = 1.0 / float(channel.banddelay)
+            self.edges[a][b] = self.edges[a].get(b, 0.0) + cost
+            self.edges[b][a] = self.edges[b].get(a, 0.0) + cost
+
+
+class Partitioning:
+    """分区结果"""
+
+    def __init__(self, topology: TopologySnapshot, count: int, partition_of: Dict[object, int]):
+        self.topology = topology
+        self.count = count
+        # 节点 -> 分区编号（0 .. count-1）
+        self.partition_of = partition_of
+        self.loads = [0] * count
+        self.sizes = [0] * count
+        for node in topology.nodes:
+            self.loads[partition_of[node]] += 1 + len(topology.neighbours[node])
+            self.sizes[partition_of[node]] += 1
+        self.cut_channels = [channel for channel in topology.channels
+                             if partition_of[channel.start_item] != partition_of[channel.end_item]]
+
+    @property
+    def imbalance(self) -> float:
+        """最大分区负载 / 平均负载 - 1"""
+        average = sum(self.loads) / self.count
+        return max(self.loads) / average - 1 if average else 0.0
+
+    @property
+    def lookahead(self):
+        """切边的最小时延（us），没有切边时为 None"""
+        delays = [float(channel.banddelay) for channel in self.cut_channels]
+        return min(delays) if delays else None
+
+    def report(self, limit: int = 20) -> List[str]:
+        lines = [f"分区数 {self.count}，切边 {len(self.cut_channels)} 条，负载不均衡度 {self.imbalance:.1%}"]
+        if self.lookahead is not None:
+            lines.append(f"lookahead（切边最小时延）{self.lookahead:g}us")
+        for partition in range(self.count):
+            lines.append(f"分区 {partition}: {self.sizes[partition]} 个节点，负载 {self.loads[partition]}")
+        en_names = self.topology.en_names
+        for channel in self.cut_channels[:limit]:
+            lines.append(f"切边 {en_names[channel.start_item]}({self.partition_of[channel.start_item]}) <--> "
+                         f"{en_names[channel.end_item]}({self.partition_of[channel.end_item]})，"
+                         f"时延 {channel.banddelay}us")
+        if len(self.cut_channels) > limit:
+            lines.append(f"……共 {len(self.cut_channels)} 条切边")
+        return lines
+
+
+def _hops(edges, source) -> Dict[int, int]:
+    distances = {source: 0}
+    queue = deque([source])
+    while queue:
+        cluster = queue.popleft()
+        for another in edges[cluster]:
+            if another not in distances:
+                distances[another] = distances[cluster] + 1
+                queue.append(another)
+    return distances
+
+
+def _seeds(clusters: _Clusters, count: int) -> List[int]:
+    """依次取离已选种子最远的整体作为种子（第一个取负载最大的）"""
+    edges = clusters.edges
+    first = max(range(len(edges)), key=lambda cluster: clusters.weights[cluster])
+    seeds = [first]
+    nearest = _hops(edges, first)
+    while len(seeds) < count:
+        # 不连通的整体距离视为无穷远，优先作为种子
+        candidates = [cluster for cluster in range(len(edges)) if cluster not in seeds]
+        seed = max(candidates, key=lambda cluster: nearest.get(cluster, len(edges)))
+        seeds.append(seed)
+        for cluster, hops in _hops(edges, seed).items():
+            if hops < nearest.get(cluster, len(edges)):
+                nearest[cluster] = hops
+    return seeds
+
+
+def _grow(clusters: _Clusters, seeds: List[int]) -> List[int]:
+    """各分区从种子同时生长，每步由负载最小的分区吸收连接代价最大的相邻整体"""
+    edges, weights = clusters.edges, clusters.weights
+    assigned = [-1] * len(edges)
+    loads = [0] * len(seeds)
+    # 分区 -> {未分配的相邻整体: 与分区的连接代价}
+    frontiers = [{} for _ in seeds]
+
+    def take(partition, cluster):
+        assigned[cluster] = partition
+        loads[partition] += weights[cluster]
+        for frontier in frontiers:
+            frontier.pop(cluster, None)
+        for another, cost in edges[cluster].items():
+            if assigned[another] < 0:
+                frontiers[partition][another] = frontiers[partition].get(another, 0.0) + cost
+
+    for partition, seed in enumerate(seeds):
+        take(partition, seed)
+    remaining = len(edges) - len(seeds)
+    while remaining:
+        growing = [partition for partition in range(len(seeds)) if frontiers[partition]]
+        if growing:
+            partition = min(growing, key=lambda p: (loads[p], p))
+            frontier = frontiers[partition]
+            cluster = max(frontier, key=lambda c: (frontier[c], -c))
+        else:
+            # 与所有分区都不连通的整体，交给负载最小的分区
+            partition = min(range(len(seeds)), key=lambda p: (loads[p], p))
+            cluster = next(c for c in range(len(edges)) if assigned[c] < 0)
+        take(partition, cluster)
+        remaining -= 1
+    return assigned
+
+
+def _connection(clusters: _Clusters, assigned: List[int], cluster: int) -> Dict[int, float]:
+    """整体与各分区的连接代价"""
+    connection = {}
+    for another, cost in clusters.edges[cluster].items():
+        partition = assigned[another]
+        connection[partition] = connection.get(partition, 0.0) + cost
+    return connection
+
+
+def _rebalance(clusters: _Clusters, assigned: List[int], loads: List[int], sizes: List[int], limit: float):
+    """负载超过上限的分区把边界整体移给未超限的相邻分区，每次选切边代价增加最少的"""
+    weights = clusters.weights
+    for _ in range(len(assigned)):
+        heaviest = max(range(len(loads)), key=loads.__getitem__)
+        if loads[heaviest] <= limit or sizes[heaviest] == 1:
+            return
+        best = None
+        for cluster, own in enumerate(assigned):
+            if own != heaviest:
+                continue
+            connection = _connection(clusters, assigned, cluster)
+            internal = connection.get(own, 0.0)
+            for partition, external in connection.items():
+                if partition == own or loads[partition] + weights[cluster] > limit:
+                    continue
+                gain = external - internal
+                if best is None or gain > best[0]:
+                    best = (gain, cluster, partition)
+        if best is None:
+            return
+        _, cluster, partition = best
+        assigned[cluster] = partition
+        loads[heaviest] -= weights[cluster]
+        loads[partition] += weights[cluster]
+        sizes[heaviest] -= 1
+        sizes[partition] += 1
+
+
+def _refine(clusters: _Clusters, assigned: List[int], count: int, imbalance: float):
+    """
+    先把超限分区的边界整体移出使负载不超过上限，
+    再做边界整体的贪心移动：代价下降且负载不超过上限时移动
+    """
+    edges, weights = clusters.edges, clusters.weights
+    loads = [0] * count
+    sizes = [0] * count
+    for cluster, partition in enumerate(assigned):
+        loads[partition] += weights[cluster]
+        sizes[partition] += 1
+    limit = (1 + imbalance) * sum(weights) / count
+    _rebalance(clusters, assigned, loads, sizes, limit)
+
+    for _ in range(REFINE_PASSES):
+        moved = 0
+        for cluster in range(len(edges)):
+            own = assigned[cluster]
+            if sizes[own] == 1:
+                continue
+            connection = _connection(clusters, assigned, cluster)
+            internal = connection.get(own, 0.0)
+            best, best_gain = own, 0.0
+            for partition, external in connection.items():
+                gain = external - internal
+                if partition == own or gain <= best_gain:
+                    continue
+                if loads[partition] + weights[cluster] > limit:
+                    continue
+                best, best_gain = partition, gain
+            if best != own:
+                assigned[cluster] = best
+                loads[own] -= weights[cluster]
+                loads[best] += weights[cluster]
+                sizes[own] -= 1
+                sizes[best] += 1
+                moved += 1
+        if not moved:
+            break
+
+
+def partition_topology(topology: TopologySnapshot, count: int,
+                       imbalance: float = DEFAULT_IMBALANCE) -> Partitioning:
+    """
+    把拓扑划分为 count 个分区
+
+    count 大于不可分割整体的数量时按整体数量划分。
+    """
+    if count < 1:
+        raise ValueError(f"分区数必须大于 0: {count}")
+    if not topology.nodes:
+        return Partitioning(topology, 1, {})
+    clusters = _Clusters(topology)
+    count = min(count, len(clusters.members))
+    if count == 1:
+        assigned = [0] * len(clusters.members)
+    else:
+        assigned = _grow(clusters, _seeds(clusters, count))
+        _refine(clusters, assigned, count, imbalance)
+    partition_of = {node: assigned[clusters.id_of[node]] for node in topology.nodes}
+    return Partitioning(topology, count, partition_of)
+
+
+def parsim_ini_lines(partitioning: Partitioning) -> str:
+    """[General] 中的并行仿真设置"""
+    return (
+        f"{PARSIM_ENABLED_LINE}\n"
+        f"parsim-communications-class = \"{PARSIM_COMMUNICATIONS}\"\n"
+        f"parsim-synchronization-class = \"{PARSIM_SYNCHRONIZATION}\"\n"
+        f"parsim-num-partitions = {partitioning.count}\n"
+    )
@@ -0,0 +1,181 @@
+"""
+仿真程序的资源占用采样
+
+ResourceProfiler 按固定间隔用 psutil 采样仿真进程及其全部子孙进程，记录
+CPU 使用率（100% 为一个核）、累计 CPU 时间、常驻内存之和和进程数，
+运行结束后保存为运行目录中的 resource_profile.csv，与 progress.csv 并列。
+profile_summary 从该文件计算峰值和平均值，用于结果对话框和参数扫描的汇总表，
+比较不同规模拓扑的仿真开销。
+
+采样只查询仿真进程自己的子孙进程，不扫描系统进程表。没有安装 psutil 时不采样。
+"""
+import csv
+import time
+from typing import Dict, List, Optional
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+PROFILE_FILE = "resource_profile.csv"
+# 默认采样间隔（s）
+DEFAULT_INTERVAL = 1.0
+
+CSV_COLUMNS = ("elapsed", "cpu_percent", "cpu_time", "rss", "processes")
+
+
+class ResourceProfiler:
+    """
+    采样一个进程树的 CPU 和内存
+
+    用法：
+        profiler = ResourceProfiler(process.pid, interval=1.0)
+        while process.poll() is None:
+            profiler.poll()
+        profiler.save(os.path.join(run_dir, PROFILE_FILE))
+    """
+
+    def __init__(self, pid: int, interval: float = DEFAULT_INTERVAL):
+        """
+        :param pid: 仿真进程号
+        :param interval: 采样间隔（s）
+        """
+        self.pid = pid
+        self.interval = interval
+        # 每行对应 CSV_COLUMNS
+        self.samples: List[tuple] = []
+        self.started_at = time.monotonic()
+        # 启动后立即采样时 CPU 时间的分母太小，第一次采样也等一个间隔
+        self._next_sample = self.started_at + interval
+        # 进程号 -> psutil.Process，保留对象才能区分进程号被复用的新进程
+        self._processes: Dict[int, "psutil.Process"] = {}
+        # 进程号 -> 上次采样时的 CPU 时间（用户态 + 内核态）
+        self._cpu_times: Dict[int, float] = {}
+        # 已退出进程的 CPU 时间也计入累计值
+        self._cpu_total = 0.0
+        self._last_sample_at = None
+        try:
+            self._root = psutil.Process(pid)
+        except psutil.Error:
+            self._root = None
+
+    def poll(self) -> bool:
+        """到达采样时刻时采样一次，返回是否采样"""
+        now = time.monotonic()
+        if self._root is None or now < self._next_sample:
+            return False
+        self._next_sample = now + self.interval
+        self.sample(now)
+        return True
+
+    def tree(self) -> Optional[list]:
+        """仿真进程及其全部子孙进程，仿真进程已退出时返回 None"""
+        if self._root is None:
+            return None
+        try:
+            return [self._root] + self._root.children(recursive=True)
+        except psutil.Error:
+            # 仿真进程已退出
+            self._root = None
+            return None
+
+    def resident_memory(self) -> Optional[int]:
+        """进程树的常驻内存之和（字节），用于内存限制；仿真进程已退出时返回 None"""
+        tree = self.tree()
+        if tree is None:
+            return None
+        rss = 0
+        for process in tree:
+            try:
+                rss += process.memory_info().rss
+            except psutil.Error:
+                continue
+        return rss
+
+    def sample(self, now: float = None):
+        now = time.monotonic() if now is None else now
+        tree = self.tree()
+        if tree is None:
+            return
+        rss = 0
+        cpu_delta = 0.0
+        alive = 0
+        for process in tree:
+            known = self._processes.get(process.pid)
+            if known is None or known != process:
+                self._processes[process.pid] = known = process
+                self._cpu_times[process.pid] = 0.0
+            try:
+                with known.oneshot():
+                    times = known.cpu_times()
+                    memory = known.memory_info().rss
+            except psutil.Error:
+                continue
+            cpu_time = times.user + times.system
+            cpu_delta += max(0.0, cpu_time - self._cpu_times[process.pid])
+            self._cpu_times[process.pid] = cpu_time
+            rss += memory
+            alive += 1
+        self._cpu_total += cpu_delta
+        wall = now - (self._last_sample_at or self.started_at)
+        self._last_sample_at = now
+        cpu_percent = 100.0 * cpu_delta / wall if wall > 0 else 0.0
+        self.samples.append((round(now - self.started_at, 3), round(cpu_percent, 1), round(self._cpu_total, 3),
+                             rss, alive))
+
+    def save(self, path: str):
+        """保存采样序列，没有任何采样时也写出表头"""
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_COLUMNS)
+            writer.writerows(self.samples)
+
+
+def create_profiler(pid: int, interval: Optional[float]) -> Optional[ResourceProfiler]:
+    """interval 为 None 或 0、或者没有安装 psutil 时返回 None"""
+    if not interval or psutil is None:
+        return None
+    return ResourceProfiler(pid, interval)
+
+
+def profile_summary(path: str) -> Optional[dict]:
+    """
+    从 resource_profile.csv 计算峰值和平均值
+
+    返回:
+        {"duration", "samples", "cpu_time", "peak_cpu_percent", "mean_cpu_percent",
+         "peak_rss", "mean_rss", "peak_processes"}，文件不存在或没有采样时返回 None
+    """
+    try:
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+    except OSError:
+        return None
+    if not rows:
+        return None
+    cpu = [float(row["cpu_percent"]) for row in rows]
+    rss = [int(row["rss"]) for row in rows]
+    return {
+        "duration": float(rows[-1]["elapsed"]),
+        "samples": len(rows),
+        "cpu_time": float(rows[-1]["cpu_time"]),
+        "peak_cpu_percent": max(cpu),
+        "mean_cpu_percent": sum(cpu) / len(cpu),
+        "peak_rss": max(rss),
+        "mean_rss": sum(rss) / len(rss),
+        "peak_processes": max(int(row["processes"]) for row in rows),
+    }
+
+
+def format_summary(summary: dict) -> List[tuple]:
+    """(指标, 值) 列表，用于界面和命令行输出"""
+    mb = 2 ** 20
+    return [
+        ("峰值 CPU", f"{summary['peak_cpu_percent']:.0f}%"),
+        ("平均 CPU", f"{summary['mean_cpu_percent']:.0f}%"),
+        ("CPU 时间", f"{summary['cpu_time']:.1f}s"),
+        ("峰值内存", f"{summary['peak_rss'] / mb:.1f}MB"),
+        ("平均内存", f"{summary['mean_rss'] / mb:.1f}MB"),
+        ("进程数", str(summary["peak_processes"])),
+    ]
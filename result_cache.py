@@ -0,0 +1,222 @@
+"""
+仿真结果缓存
+
+一次运行的键是以下内容的 sha256：
+1. 项目目录中全部生成产物（NED、INI、XML、任务文件、网络拓扑）的哈希，取自 ArtifactManifest，
+   NED 的包名和 INI 的 network 中含有项目名，计算前替换为占位符，因此不同目录中的相同配置得到相同的键；
+   INI 中的运行方式（实时调度器或 express 模式）不影响仿真结果，计算前去掉；
+2. 仿真程序的标识：可执行文件和 INET 库的真实路径、大小和修改时间（重新编译后键随之变化）；
+3. 命令行参数（配置名、随机种子等）。
+
+运行成功后把 results.json、调度事件日志和状态文件按键存入本地缓存目录，
+之后键相同的运行直接从缓存复制输出，不再启动仿真程序。
+缓存目录默认为 ~/.cache/cpn_results，可用环境变量 CPN_RESULT_CACHE 指定。
+"""
+import os
+import json
+import glob
+import time
+import shutil
+import hashlib
+import tempfile
+from typing import List, Optional
+
+from artifacts import ArtifactManifest, atomic_write
+
+CACHE_ENV = "CPN_RESULT_CACHE"
+DEFAULT_CACHE_DIR = os.path.join("~", ".cache", "cpn_results")
+
+# 缓存的仿真输出（进度曲线描述的是某一次执行的性能，不缓存）
+CACHED_OUTPUTS = ("results.json", "dispatch_events.csv", "compute_node_status.json", "network_status.json")
+META_FILE = "meta.json"
+
+# 内容中含有项目名的产物
+_NAMED_ARTIFACTS = ("network.ned", "omnetpp.ini")
+_PROJECT_NAME_PREFIX = "computing_power_network."
+# 只影响运行速度、不影响结果的 INI 配置
+_RUN_MODE_SETTINGS = (b"scheduler-class", b"realtimescheduler-scaling", b"cmdenv-express-mode")
+
+
+def _file_identity(path: str) -> Optional[list]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [os.path.realpath(path), stat.st_size, stat.st_mtime_ns]
+
+
+def simulator_identity(command: List[str], cwd: str) -> list:
+    """
+    仿真程序的标识：第一个选项之前的文件（可执行文件，或 CPN_SIMULATOR 中的解释器和脚本）
+    以及 -l 指定的库文件的路径、大小和修改时间
+
+    只比较文件属性不计算内容哈希，INET 库有几百 MB。
+    """
+    identity = []
+    for argument in command:
+        if argument.startswith("-"):
+            break
+        path = shutil.which(argument) if os.sep not in argument else os.path.join(cwd, argument)
+        if path and os.path.isfile(path):
+            identity.append(_file_identity(path))
+    for option, library in zip(command, command[1:]):
+        if option != "-l":
+            continue
+        directory, name = os.path.split(os.path.join(cwd, library))
+        # -l ../../../src/INET 对应 libINET.so / INET.dll / libINET.dylib 等
+        for path in sorted(glob.glob(os.path.join(directory, f"*{name}*"))):
+            if os.path.isfile(path):
+                identity.append(_file_identity(path))
+    return identity
+
+
+def run_key(project_dir: str, command: List[str]) -> Optional[str]:
+    """
+    计算一次运行的键
+
+    返回:
+        项目目录没有产物哈希清单（未经 generate_project 生成）时返回 None
+    """
+    manifest = ArtifactManifest(project_dir)
+    if not manifest.entries:
+        return None
+    project_name = os.path.basename(os.path.normpath(project_dir))
+    artifacts = {}
+    for relpath in sorted(manifest.entries):
+        path = os.path.join(project_dir, relpath)
+        if relpath in _NAMED_ARTIFACTS:
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+            except OSError:
+                continue
+            data = data.replace((_PROJECT_NAME_PREFIX + project_name).encode("utf-8"),
+                                (_PROJECT_NAME_PREFIX + "*").encode("utf-8"))
+            if relpath == "omnetpp.ini":
+                data = b"".join(line for line in data.splitlines(keepends=True)
+                                if not line.startswith(_RUN_MODE_SETTINGS))
+            artifacts[relpath] = hashlib.sha256(data).hexdigest()
+        else:
+            digest = manifest.disk_hash(path)
+            if digest is not None:
+                artifacts[relpath] = digest
+    payload = {
+        "artifacts": artifacts,
+        "simulator": simulator_identity(command, project_dir),
+        "command": list(command),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _last_event_time(path: str) -> float:
+    """调度事件日志中最后一个事件的仿真时间"""
+    last = 0.0
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                head = line.split(",", 1)[0]
+                try:
+                    last = max(last, float(head))
+                except ValueError:
+                    continue
+    except OSError:
+        pass
+    return last
+
+
+class ResultCache:
+    """
+    按内容寻址的仿真结果缓存
+
+    用法：
+        cache = ResultCache()
+        key = run_key(project_dir, command)
+        if not cache.restore(key, project_dir):
+            ...  # 运行仿真
+            cache.store(key, project_dir)
+    """
+
+    def __init__(self, directory: str = None):
+        directory = directory or os.environ.get(CACHE_ENV) or DEFAULT_CACHE_DIR
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def lookup(self, key: Optional[str]) -> Optional[dict]:
+        """缓存命中时返回记录的元数据，否则返回 None"""
+        if not key:
+            return None
+        try:
+            with open(os.path.join(self.path(key), META_FILE), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def restore(self, key: Optional[str], project_dir: str) -> Optional[dict]:
+        """
+        把缓存的输出复制到项目目录
+
+        返回:
+            命中时返回元数据，否则返回 None
+        """
+        meta = self.lookup(key)
+        if meta is None:
+            return None
+        entry = self.path(key)
+        for name in meta.get("outputs", ()):
+            source = os.path.join(entry, name)
+            if not os.path.exists(source):
+                # 缓存不完整（被手动删除了部分文件），视为未命中
+                return None
+        for name in meta.get("outputs", ()):
+            shutil.copyfile(os.path.join(entry, name), os.path.join(project_dir, name))
+        # 更新访问时间，prune 按最近使用时间淘汰
+        os.utime(os.path.join(entry, META_FILE))
+        return meta
+
+    def store(self, key: Optional[str], project_dir: str, **extra) -> bool:
+        """
+        保存一次成功运行的输出，results.json 不存在时不保存
+
+        先写入临时目录再重命名，并发的运行同时保存同一个键时只保留先完成的一份。
+        """
+        if not key or not os.path.exists(os.path.join(project_dir, "results.json")):
+            return False
+        entry = self.path(key)
+        if os.path.exists(os.path.join(entry, META_FILE)):
+            return True
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        staging = tempfile.mkdtemp(dir=os.path.dirname(entry), prefix=".tmp_")
+        try:
+            outputs = []
+            for name in CACHED_OUTPUTS:
+                source = os.path.join(project_dir, name)
+                if os.path.exists(source):
+                    shutil.copyfile(source, os.path.join(staging, name))
+                    outputs.append(name)
+            meta = dict(extra, key=key, outputs=outputs, created=time.time(),
+                        sim_time=_last_event_time(os.path.join(project_dir, "dispatch_events.csv")))
+            atomic_write(os.path.join(staging, META_FILE),
+                         json.dumps(meta, indent=1, ensure_ascii=False).encode("utf-8"))
+            try:
+                os.rename(staging, entry)
+            except OSError:
+                # 其他进程已保存同一个键
+                return os.path.exists(os.path.join(entry, META_FILE))
+            staging = None
+            return True
+        finally:
+            if staging is not None:
+                shutil.rmtree(staging, ignore_errors=True)
+
+    def entries(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.directory, "??", "*", META_FILE)))
+
+    def prune(self, max_entries: int) -> int:
+        """只保留最近使用的 max_entries 条记录，返回删除的数量"""
+        metas = sorted(self.entries(), key=lambda path: os.stat(path).st_mtime, reverse=True)
+        for meta in metas[max_entries:]:
+            shutil.rmtree(os.path.dirname(meta), ignore_errors=True)
+        return max(0, len(metas) - max_entries)
+
@@ -5,6 +5,26 @@ from typing import Dict, List, Union, Optional
 import openpyxl
 
 
+# 导出全部指标的配置 (匹配SimulationExportDialog的输出格式)，命令行导出时使用
+FULL_EXPORT_CONFIG = {
+    "globalInfo": True,
+    "computeNodeInfo": {
+        "enabled": True,
+        "metrics": {
+            "loadBalancingMetrics": ["averageUtilization", "totalAssignedTasks", "totalProcessedLoad"],
+            "energyConsumption": True
+        }
+    },
+    "taskInfo": {
+        "enabled": True,
+        "metrics": {
+            "delayDistribution": ["endToEndDelay", "computationTime"],
+            "cost": True
+        }
+    }
+}
+
+
 def export_simulation_results(
         json_path: str,
         export_config: Dict[str, Union[bool, Dict]],
@@ -170,24 +190,8 @@ def export_simulation_results(
 
 # 示例使用
 if __name__ == "__main__":
-    # 示例导出配置 (匹配SimulationExportDialog的输出格式)
-    example_export_config = {
-        "globalInfo": True,
-        "computeNodeInfo": {
-            "enabled": True,
-            "metrics": {
-                "loadBalancingMetrics": ["averageUtilization", "totalAssignedTasks", "totalProcessedLoad"],
-                "energyConsumption": True
-            }
-        },
-        "taskInfo": {
-            "enabled": True,
-            "metrics": {
-                "delayDistribution": ["endToEndDelay", "computationTime"],
-                "cost": True
-            }
-        }
-    }
+    # 示例导出配置
+    example_export_config = FULL_EXPORT_CONFIG
 
     # 示例JSON文件路径 (假设当前目录下有results.json)
     example_json_path = "results.json"
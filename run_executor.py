@@ -0,0 +1,304 @@
+"""
+多次仿真的并行执行器
+
+每次运行生成到自己的项目目录（与主项目目录同级，名为 <项目名>_<运行名>，保证 NED 路径等相对位置不变），
+最多同时启动 max_parallel 个仿真进程（默认等于 CPU 核数），按排队、运行、完成、失败、取消
+跟踪每次运行的状态。运行结束后收集该目录中的 results.json、调度事件日志和状态文件，
+仿真程序的 stdout / stderr 写入 simulator.log，Cmdenv 的进度曲线写入 progress.csv，
+进程树的 CPU 和内存采样写入 resource_profile.csv。
+给定 RunLimits 时每次运行都受同样的墙钟时间、CPU 时间和内存限制，超出的运行记为失败，
+end_reason 记录每次运行结束的原因（见 sim_process 的 END_*）。
+
+给定结果缓存（见 result_cache）时，配置和仿真程序都相同的运行直接从缓存取得输出，不启动仿真程序；
+同一批中配置相同的运行只实际运行一次，其余的等它结束后从缓存取得。
+缓存键在排队时计算并查找一次，之后只在同一键的运行成功结束时再查找，poll() 不重复读文件。
+
+执行器不依赖 Qt：由界面的定时器或命令行循环周期调用 poll()，也可以直接调用 run_all() 阻塞运行。
+"""
+import os
+import re
+import time
+from typing import Callable, Dict, List, Optional
+
+import file_utils
+from sim_process import (SimulationProcess, RunLimits, opp_run_command, check_runnable, STDOUT, STDERR,
+                         END_COMPLETED, END_FAILED, END_CANCELLED, END_REASON_TEXT)
+from sim_progress import CmdenvProgress, PROGRESS_FILE
+from resource_profile import PROFILE_FILE, DEFAULT_INTERVAL
+from result_cache import ResultCache, run_key
+
+QUEUED = "queued"
+RUNNING = "running"
+FINISHED = "finished"
+FAILED = "failed"
+CANCELLED = "cancelled"
+DONE_STATES = (FINISHED, FAILED, CANCELLED)
+
+# 每次运行收集的输出文件
+RUN_OUTPUTS = ("results.json", "dispatch_events.csv", "compute_node_status.json", "network_status.json",
+               PROGRESS_FILE, PROFILE_FILE)
+LOG_FILE = "simulator.log"
+
+_NAME_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class Run:
+    """一次仿真运行"""
+
+    def __init__(self, name: str, directory: str, extra_args: List[str]):
+        self.name = name
+        self.directory = directory
+        # 追加到 opp_run 的参数，例如 --seed-set=3 或 --**.param=value
+        self.extra_args = list(extra_args)
+        self.state = QUEUED
+        self.returncode: Optional[int] = None
+        self.process: Optional[SimulationProcess] = None
+        # Cmdenv 进度，运行结束后保存为 progress.csv
+        self.progress: Optional[CmdenvProgress] = None
+        # 结果缓存的键，以及输出是否取自缓存
+        self.cache_key: Optional[str] = None
+        self.cached = False
+        # 结束原因（sim_process 的 END_*）
+        self.end_reason: Optional[str] = None
+        self.started_at = None
+        self.finished_at = None
+        # 输出文件名 -> 路径（只包含实际存在的文件）
+        self.outputs: Dict[str, str] = {}
+        self.error = None
+        self._log = None
+        # 同一缓存键的运行刚成功结束，下次 poll() 时再查找一次缓存
+        self._recheck_cache = False
+
+    @property
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def results_path(self) -> Optional[str]:
+        return self.outputs.get("results.json")
+
+    def __repr__(self):
+        return f"Run({self.name}, {self.state})"
+
+
+class RunExecutor:
+    """
+    并行执行多次仿真
+
+    用法：
+        executor = RunExecutor(omnetpp_dir, project_dir)
+        for seed in range(50):
+            executor.add(f"seed{seed}", nodes, channels, extra_args=[f"--seed-set={seed}"])
+        executor.run_all()
+    """
+
+    def __init__(self, omnetpp_dir: str, project_dir: str, max_parallel: int = None,
+                 config: str = "static", on_state_changed: Callable[[Run], None] = None,
+                 cache: ResultCache = None, limits: RunLimits = None,
+                 profile_interval: Optional[float] = DEFAULT_INTERVAL):
+        """
+        :param omnetpp_dir: OMNeT++ 根目录
+        :param project_dir: 主项目目录，运行目录建在它的旁边，主项目目录本身不会被修改
+        :param max_parallel: 同时运行的仿真进程数，默认等于 CPU 核数
+        :param on_state_changed: 运行状态变化时调用
+        :param cache: 结果缓存，为 None 时每次都运行仿真
+        :param limits: 每次运行的资源限制
+        :param profile_interval: CPU 和内存的采样间隔（s），为 None 或 0 时不采样
+        """
+        self.omnetpp_dir = omnetpp_dir
+        self.project_dir = os.path.normpath(project_dir)
+        self.max_parallel = max(1, max_parallel or os.cpu_count() or 1)
+        self.config = config
+        self.on_state_changed = on_state_changed
+        self.cache = cache
+        self.limits = limits
+        self.profile_interval = profile_interval
+        self.runs: List[Run] = []
+
+    def run_directory(self, name: str) -> str:
+        parent, project_name = os.path.split(self.project_dir)
+        return os.path.join(parent, f"{project_name}_{name}")
+
+    def add(self, name: str, nodes: list, channels: list, extra_args: List[str] = (),
+            **generate_options) -> Run:
+        """
+        生成一次运行的项目目录并排队
+
+        :param name: 运行名，只能包含字母、数字和下划线（用作 NED 包名的一部分）
+        :param generate_options: 传给 file_utils.generate_project 的其他参数（路由方式等），
+            并行仿真配置不能在这里运行
+        """
+        if not _NAME_PATTERN.match(name):
+            raise ValueError(f"运行名只能包含字母、数字和下划线: {name}")
+        if any(run.name == name for run in self.runs):
+            raise ValueError(f"运行名重复: {name}")
+        directory = self.run_directory(name)
+        os.makedirs(directory, exist_ok=True)
+        file_utils.generate_project(directory, os.path.basename(directory), nodes, channels,
+                                    **generate_options)
+        error = check_runnable(directory)
+        if error:
+            raise ValueError(error)
+        run = Run(name, directory, extra_args)
+        self.runs.append(run)
+        self._changed(run)
+        if self.cache is not None:
+            self._restore(run)
+        return run
+
+    # ---------- 状态 ----------
+    def runs_in(self, *states) -> List[Run]:
+        return [run for run in self.runs if run.state in states]
+
+    @property
+    def finished(self) -> bool:
+        return all(run.state in DONE_STATES for run in self.runs)
+
+    def counts(self) -> Dict[str, int]:
+        counts = {state: 0 for state in (QUEUED, RUNNING, FINISHED, FAILED, CANCELLED)}
+        for run in self.runs:
+            counts[run.state] += 1
+        return counts
+
+    def summary(self) -> str:
+        counts = self.counts()
+        return (f"排队 {counts[QUEUED]}，运行 {counts[RUNNING]}，完成 {counts[FINISHED]}，"
+                f"失败 {counts[FAILED]}，取消 {counts[CANCELLED]}")
+
+    # ---------- 调度 ----------
+    def poll(self) -> List[Run]:
+        """
+        读取运行中进程的输出，收集已结束的运行，并启动排队的运行补足并行数
+
+        返回:
+            本次状态发生变化的运行
+        """
+        changed = []
+        for run in self.runs_in(RUNNING):
+            if run.process.poll() is not None:
+                self._complete(run)
+                changed.append(run)
+        free = max(0, self.max_parallel - len(self.runs_in(RUNNING)))
+        for run in self.runs_in(QUEUED):
+            if self.cache is not None:
+                if run._recheck_cache:
+                    run._recheck_cache = False
+                    if self._restore(run):
+                        changed.append(run)
+                        continue
+                # 配置相同的运行正在进行，等它结束后从缓存取得
+                if any(other.cache_key == run.cache_key for other in self.runs_in(RUNNING)):
+                    continue
+            if free == 0:
+                continue
+            self._launch(run)
+            free -= 1
+            changed.append(run)
+        return changed
+
+    def run_all(self, interval: float = 0.2) -> List[Run]:
+        """阻塞运行全部排队的运行"""
+        while True:
+            self.poll()
+            if self.finished:
+                return self.runs
+            # 在第一个运行中的进程上等待输出或退出，避免空转
+            running = self.runs_in(RUNNING)
+            if running:
+                running[0].process.poll(interval)
+            else:
+                time.sleep(interval)
+
+    def cancel(self, run: Run = None):
+        """取消一次运行（默认全部）：排队的不再启动，运行中的结束整个进程组"""
+        targets = [run] if run is not None else list(self.runs)
+        for target in targets:
+            if target.state == QUEUED:
+                target.state = CANCELLED
+                target.end_reason = END_CANCELLED
+                self._changed(target)
+            elif target.state == RUNNING:
+                # 先向全部进程发出 SIGTERM，再逐个等待，宽限时间不会累加
+                target.process.stop(END_CANCELLED)
+        for target in targets:
+            if target.state == RUNNING:
+                target.process.terminate()
+                self._complete(target, CANCELLED)
+
+    def _restore(self, run: Run) -> bool:
+        """从缓存取得输出，命中时运行直接完成（排队时调用一次，同一键的运行成功结束后再调用）"""
+        if run.cache_key is None:
+            command, _ = opp_run_command(self.omnetpp_dir, run.directory, self.config, run.extra_args)
+            run.cache_key = run_key(run.directory, command)
+        file_utils.clean_simulator_outputs(run.directory)
+        if self.cache.restore(run.cache_key, run.directory) is None:
+            return False
+        run.cached = True
+        run.returncode = 0
+        with open(os.path.join(run.directory, LOG_FILE), "w", encoding="utf-8") as log:
+            log.write(f"输出取自结果缓存 {run.cache_key}\n")
+        self._complete(run, FINISHED)
+        return True
+
+    def _launch(self, run: Run):
+        # 只清理这次运行目录中上一次的仿真输出
+        file_utils.clean_simulator_outputs(run.directory)
+        command, env = opp_run_command(self.omnetpp_dir, run.directory, self.config, run.extra_args)
+        run._log = open(os.path.join(run.directory, LOG_FILE), "w", encoding="utf-8")
+        run.progress = CmdenvProgress()
+
+        def write_log(stream, line, log=run._log, progress=run.progress):
+            if stream == STDOUT:
+                progress.feed(line)
+            log.write(f"[stderr] {line}\n" if stream == STDERR else f"{line}\n")
+
+        run.process = SimulationProcess(command, run.directory, env, on_output=write_log, limits=self.limits,
+                                        profile_interval=self.profile_interval)
+        try:
+            run.process.start()
+        except OSError as e:
+            run.error = str(e)
+            self._complete(run, FAILED)
+            return
+        run.started_at = time.monotonic()
+        run.state = RUNNING
+        self._changed(run)
+
+    def _complete(self, run: Run, state: str = None):
+        run.finished_at = time.monotonic()
+        if run.process is not None and run.process.process is not None:
+            run.returncode = run.process.returncode
+        if run.process is not None and run.process.end_reason is not None:
+            run.end_reason = run.process.end_reason
+        if state is None:
+            state = FINISHED if run.end_reason == END_COMPLETED else FAILED
+        if run.end_reason is None:
+            run.end_reason = {FINISHED: END_COMPLETED, FAILED: END_FAILED, CANCELLED: END_CANCELLED}[state]
+        if state == FAILED and run.error is None and run.process is not None:
+            # 优先给出 stderr 中的最后几行
+            tail = list(run.process.tail)
+            lines = [line for stream, line in tail if stream == STDERR] or [line for _, line in tail]
+            run.error = "\n".join([END_REASON_TEXT[run.end_reason]] + lines[-5:])
+        if run._log is not None:
+            run._log.write(f"结束原因: {END_REASON_TEXT[run.end_reason]}，退出码 {run.returncode}\n")
+            run._log.close()
+            run._log = None
+        if run.progress is not None:
+            run.progress.save(os.path.join(run.directory, PROGRESS_FILE))
+        if run.process is not None:
+            run.process.save_profile(os.path.join(run.directory, PROFILE_FILE))
+        if state == FINISHED and not run.cached and self.cache is not None:
+            if self.cache.store(run.cache_key, run.directory, run=run.name, elapsed=run.elapsed):
+                for other in self.runs_in(QUEUED):
+                    if other.cache_key == run.cache_key:
+                        other._recheck_cache = True
+        run.outputs = {name: os.path.join(run.directory, name) for name in RUN_OUTPUTS + (LOG_FILE,)
+                       if os.path.exists(os.path.join(run.directory, name))}
+        run.state = state
+        self._changed(run)
+
+    def _changed(self, run: Run):
+        if self.on_state_changed is not None:
+            self.on_state_changed(run)
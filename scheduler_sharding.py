@@ -0,0 +1,179 @@
+"""
+调度决策网关分片
+
+原先所有算力网关和用户网关的 schedulerAddress 都指向第一个调度决策网关，
+其余调度决策网关虽然在画布上但不参与调度。这里把网关分配给全部调度决策网关：
+
+SHARD_NEAREST:  每个网关分配给跳数最近的调度决策网关（距离相同时取画布上靠前的）；
+SHARD_BALANCED: 在跳数尽量近的前提下使各调度决策网关的网关数相差不超过 1，
+                算力网关和用户网关分别均衡，使每个调度决策网关都同时管理两类网关。
+
+调度决策网关只知道向它上报状态的算力网关，因此一个分片内用户网关的任务只会调度到同一分片的算力节点。
+没有算力网关的分片不分配用户网关：两种方式都只把用户网关分给至少有一个算力网关的调度决策网关
+（调度决策网关多于算力网关时，多出的调度决策网关不管理用户网关）。
+全网没有算力网关时无法满足，orphaned() 列出这样的分片，由拓扑检查报告。
+与所有调度决策网关都不连通的网关仍分配给第一个（有算力网关的）调度决策网关。
+"""
+from collections import deque
+from typing import Dict, List, Optional
+
+from topology import TopologySnapshot, ROUTERTYPE
+
+
+SHARD_NEAREST = "nearest"
+SHARD_BALANCED = "balanced"
+
+# 参与分片的网关类型
+GATEWAY_TYPES = ("ComputingGateway", "UserGateway")
+
+
+def hop_distances(topology: TopologySnapshot, source) -> Dict[object, int]:
+    """从 source 出发的 BFS 跳数，只经路由类节点转发（边缘节点不转发）"""
+    neighbours = topology.neighbours
+    distances = {source: 0}
+    queue = deque([source])
+    while queue:
+        node = queue.popleft()
+        if node is not source and node.nodetype not in ROUTERTYPE:
+            continue
+        distance = distances[node] + 1
+        for _, _, another in neighbours[node]:
+            if another not in distances:
+                distances[another] = distance
+                queue.append(another)
+    return distances
+
+
+class SchedulerAssignment:
+    """网关 -> 调度决策网关的分配结果"""
+
+    def __init__(self, mode: str, schedulers: tuple, scheduler_of: Dict[object, object],
+                 distances: Dict[object, int]):
+        self.mode = mode
+        self.schedulers = schedulers
+        # 网关 -> 调度决策网关
+        self.scheduler_of = scheduler_of
+        # 网关 -> 到所分配调度决策网关的跳数（不连通时不在其中）
+        self.distances = distances
+
+    def scheduler(self, gateway):
+        """网关所属的调度决策网关，没有调度决策网关时返回 None"""
+        return self.scheduler_of.get(gateway)
+
+    def members(self, scheduler) -> List[object]:
+        return [gateway for gateway, owner in self.scheduler_of.items() if owner is scheduler]
+
+    def orphaned(self) -> List[object]:
+        """管理用户网关但没有算力网关的调度决策网关，这些用户的任务无法调度"""
+        result = []
+        for scheduler in self.schedulers:
+            types = {gateway.nodetype for gateway in self.members(scheduler)}
+            if "UserGateway" in types and "ComputingGateway" not in types:
+                result.append(scheduler)
+        return result
+
+    def report(self) -> List[str]:
+        """每个调度决策网关管理的网关数和平均跳数"""
+        lines = []
+        orphaned = self.orphaned()
+        for scheduler in self.schedulers:
+            members = self.members(scheduler)
+            counts = {nodetype: sum(1 for gateway in members if gateway.nodetype == nodetype)
+                      for nodetype in GATEWAY_TYPES}
+            hops = [self.distances[gateway] for gateway in members if gateway in self.distances]
+            average = sum(hops) / len(hops) if hops else 0.0
+            line = (f"{scheduler.nodetype}{scheduler.index}: 算力网关 {counts['ComputingGateway']} 个，"
+                    f"用户网关 {counts['UserGateway']} 个，平均 {average:.1f} 跳")
+            if scheduler in orphaned:
+                line += "（没有算力网关，用户任务无法调度）"
+            lines.append(line)
+        return lines
+
+
+def _serving(schedulers: tuple, scheduler_of: dict) -> List[int]:
+    """已分到算力网关的调度节点顺序号，没有时为全部调度节点"""
+    owners = {owner for gateway, owner in scheduler_of.items() if gateway.nodetype == "ComputingGateway"}
+    orders = [order for order, scheduler in enumerate(schedulers) if scheduler in owners]
+    return orders or list(range(len(schedulers)))
+
+
+def _nearest(schedulers: tuple, gateways: list, distances: list):
+    """
+    每个网关取 (跳数, 调度节点顺序) 最小的调度决策网关
+    先分算力网关，用户网关只在分到算力网关的调度决策网关中选择
+    """
+    scheduler_of = {}
+    for nodetype in GATEWAY_TYPES:
+        orders = _serving(schedulers, scheduler_of) if nodetype == "UserGateway" else range(len(schedulers))
+        for gateway in gateways:
+            if gateway.nodetype != nodetype:
+                continue
+            candidates = [(distances[order][gateway], order) for order in orders if gateway in distances[order]]
+            scheduler_of[gateway] = schedulers[min(candidates)[1] if candidates else orders[0]]
+    return scheduler_of
+
+
+def _balanced(schedulers: tuple, gateways: list, distances: list):
+    """
+    按 (跳数, 调度节点顺序, 网关顺序) 从小到大贪心分配，调度节点满额后跳过
+    每类网关中每个调度节点分到 n // k 个，其中 n % k 个调度节点多分一个，因此总能分完；
+    用户网关只在分到算力网关的 k 个调度节点之间均衡
+    """
+    scheduler_of = {}
+    for nodetype in GATEWAY_TYPES:
+        members = [gateway for gateway in gateways if gateway.nodetype == nodetype]
+        if not members:
+            continue
+        orders = _serving(schedulers, scheduler_of) if nodetype == "UserGateway" else list(range(len(schedulers)))
+        base, extra = divmod(len(members), len(orders))
+        load = [0] * len(schedulers)
+        candidates = []
+        for position, gateway in enumerate(members):
+            for order in orders:
+                hops = distances[order].get(gateway)
+                if hops is not None:
+                    candidates.append((hops, order, position))
+        candidates.sort()
+        for hops, order, position in candidates:
+            gateway = members[position]
+            if gateway in scheduler_of or load[order] > base:
+                continue
+            if load[order] == base:
+                if not extra:
+                    continue
+                extra -= 1
+            scheduler_of[gateway] = schedulers[order]
+            load[order] += 1
+        # 不连通的网关
+        for gateway in members:
+            scheduler_of.setdefault(gateway, schedulers[orders[0]])
+    return scheduler_of
+
+
+def assign_schedulers(topology: TopologySnapshot, mode: str = SHARD_NEAREST) -> SchedulerAssignment:
+    """把全部算力网关和用户网关分配给调度决策网关"""
+    if mode not in (SHARD_NEAREST, SHARD_BALANCED):
+        raise ValueError(f"未知的调度分片方式: {mode}")
+    schedulers = topology.compute_schedule_nodes
+    gateways = [node for nodetype in GATEWAY_TYPES for node in topology.of_type(nodetype)]
+    if not schedulers:
+        return SchedulerAssignment(mode, schedulers, {}, {})
+
+    distances = [hop_distances(topology, scheduler) for scheduler in schedulers]
+    if mode == SHARD_BALANCED:
+        scheduler_of = _balanced(schedulers, gateways, distances)
+    else:
+        scheduler_of = _nearest(schedulers, gateways, distances)
+    order = {scheduler: position for position, scheduler in enumerate(schedulers)}
+    gateway_distances = {}
+    for gateway, scheduler in scheduler_of.items():
+        hops = distances[order[scheduler]].get(gateway)
+        if hops is not None:
+            gateway_distances[gateway] = hops
+    return SchedulerAssignment(mode, schedulers, scheduler_of, gateway_distances)
+
+
+def scheduler_address(assignment: Optional[SchedulerAssignment], gateway) -> Optional[str]:
+    """网关应写入的 schedulerAddress"""
+    scheduler = assignment.scheduler(gateway) if assignment is not None else None
+    return scheduler.ip if scheduler is not None else None
@@ -0,0 +1,92 @@
+from PySide6.QtWidgets import QGraphicsItem
+from PySide6.QtCore import Qt, QRectF
+from PySide6.QtGui import QColor, QPen, QBrush, QFont
+
+
+class ShardBadgeItem(QGraphicsItem):
+    """
+    调度分片角标
+
+    作为网关和调度决策网关的子图元显示在图标左上角，内容为所属调度决策网关的编号，
+    同一分片使用相同的背景色。
+    """
+
+    WIDTH = 28
+    HEIGHT = 16
+
+    BORDER_PEN = QPen(QColor(60, 60, 60), 1)
+    TEXT_PEN = QPen(QColor(255, 255, 255))
+    # QFont 需要在 QApplication 创建之后构造，首次使用时再初始化
+    FONT = None
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.text = ""
+        self.brush = QBrush()
+        self.setZValue(5)
+        self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+        # 角标不参与选择和拖动，点击交给节点本身
+        self.setAcceptedMouseButtons(Qt.NoButton)
+        if ShardBadgeItem.FONT is None:
+            ShardBadgeItem.FONT = QFont("Arial", 7, QFont.Bold)
+
+    @staticmethod
+    def color_of(order: int) -> QColor:
+        """第 order 个调度决策网关的颜色，按黄金角取色相使相邻编号颜色差别明显"""
+        return QColor.fromHsv(int(order * 137.5) % 360, 200, 200, 230)
+
+    def set_shard(self, text: str, order: int, tooltip: str):
+        self.text = text
+        self.brush = QBrush(self.color_of(order))
+        self.setToolTip(tooltip)
+        self.update()
+
+    def boundingRect(self):
+        return QRectF(0, 0, self.WIDTH, self.HEIGHT)
+
+    def paint(self, painter, option, widget=None):
+        rect = self.boundingRect().adjusted(0.5, 0.5, -0.5, -0.5)
+        painter.setPen(self.BORDER_PEN)
+        painter.setBrush(self.brush)
+        painter.drawRoundedRect(rect, 4, 4)
+        painter.setPen(self.TEXT_PEN)
+        painter.setFont(self.FONT)
+        painter.drawText(rect, Qt.AlignCenter, self.text)
+
+
+class ShardBadgeController:
+    """按调度分片结果更新网关和调度决策网关上的角标"""
+
+    def __init__(self):
+        # 当前显示角标的节点
+        self.nodes = []
+
+    def apply(self, assignment) -> int:
+        """
+        显示分配结果，先隐藏上一次的角标
+
+        返回:
+            int: 显示角标的节点数量
+        """
+        self.reset()
+        for order, scheduler in enumerate(assignment.schedulers):
+            text = f"S{scheduler.index}"
+            members = assignment.members(scheduler)
+            scheduler.show_shard(text, order, f"调度决策网关 {scheduler.name}\n管理 {len(members)} 个网关")
+            self.nodes.append(scheduler)
+            for gateway in members:
+                hops = assignment.distances.get(gateway)
+                distance = f"{hops} 跳" if hops is not None else "不连通"
+                gateway.show_shard(text, order, f"调度决策网关: {scheduler.name}（{distance}）")
+                self.nodes.append(gateway)
+        return len(self.nodes)
+
+    def reset(self):
+        """隐藏所有角标"""
+        for node in self.nodes:
+            node.hide_shard()
+        self.nodes = []
+
+    def clear(self):
+        """画布已清空时只丢弃记录（节点和角标已随场景删除）"""
+        self.nodes = []
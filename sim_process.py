@@ -0,0 +1,517 @@
+"""
+直接启动仿真程序的子进程（不依赖 Qt 和 MSYS2）
+
+SimulationProcess 以给定的工作目录、环境变量和参数列表启动 opp_run（或任何配置的仿真命令），
+stdout / stderr 设为非阻塞管道，poll() 每次只读取已到达的数据并按行回调，不会阻塞调用方的事件循环，
+进程退出且管道读完后返回退出码。
+
+子进程在新的会话（进程组）中启动，结束时向整个进程组发信号，仿真程序派生的子孙进程也会一并结束。
+进程退出用 pidfd（Linux 5.3+）加入 selector 等待，不支持时用 waitpid(WNOHANG)，不扫描系统进程表。
+
+RunLimits 给出一次运行的墙钟时间、CPU 时间和内存限制，超出时结束整个进程组。
+结束总是先发 SIGTERM，宽限时间内未退出再发 SIGKILL；end_reason 记录运行结束的原因。
+运行期间 poll() 同时按 profile_interval 采样进程树的 CPU 和内存（见 resource_profile）。
+
+opp_run_command 按 INET 示例目录的布局组装 opp_run 的参数。设置了环境变量 CPN_SIMULATOR 时
+用它替换 opp_run 可执行文件（例如 "python3 fake_simulator.py"），其余参数不变。
+
+运行方式写入 omnetpp.ini（见 scheduler_ini_lines）：RUN_BATCH 使用默认的顺序调度器和 express 模式，
+尽可能快地运行，界面在仿真结束后按任意速度回放日志；RUN_REALTIME 使用实时调度器，只用于现场演示。
+
+目前只支持 POSIX 系统（Windows 的非阻塞管道需要另外的实现，仍使用 MSYS2 方式）。
+"""
+import codecs
+import os
+import selectors
+import shlex
+import signal
+import subprocess
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sim_progress import STATUS_FREQUENCY
+from partitioning import PARSIM_ENABLED_LINE
+from resource_profile import ResourceProfiler, create_profiler, DEFAULT_INTERVAL as PROFILE_INTERVAL
+
+try:
+    import resource
+except ImportError:
+    # Windows 仍使用 MSYS2 方式，只会用到本模块中的常量
+    resource = None
+
+# 仿真程序替换命令的环境变量
+SIMULATOR_ENV = "CPN_SIMULATOR"
+# 项目目录相对于 INET 根目录的位置：inet/examples/computing_power_network/<项目名>
+NED_PATH = "../../../src:../..:../../../tutorials:../../../showcases"
+INET_LIBRARY = "../../../src/INET"
+
+# 运行方式
+RUN_BATCH = "batch"
+RUN_REALTIME = "realtime"
+
+# 运行结束的原因
+END_COMPLETED = "completed"
+END_FAILED = "failed"
+END_TIMEOUT = "timeout"
+END_CPU_LIMIT = "cpu_limit"
+END_MEMORY_LIMIT = "memory_limit"
+END_CANCELLED = "cancelled"
+END_REASON_TEXT = {
+    END_COMPLETED: "正常结束",
+    END_FAILED: "仿真程序出错",
+    END_TIMEOUT: "超过墙钟时间限制",
+    END_CPU_LIMIT: "超过 CPU 时间限制",
+    END_MEMORY_LIMIT: "超过内存限制",
+    END_CANCELLED: "已取消",
+}
+
+# 发送 SIGTERM 后等待进程自行退出的默认秒数
+DEFAULT_GRACE = 5.0
+# 检查内存占用的间隔（s）
+MEMORY_CHECK_INTERVAL = 0.5
+# 判断是否达到 CPU 时间限制时允许的误差（s），内核按时钟节拍统计 CPU 时间
+CPU_TIME_TOLERANCE = 0.1
+
+STDOUT = "stdout"
+STDERR = "stderr"
+
+# 保留的最后若干行输出，用于出错时的提示
+TAIL_LINES = 200
+_READ_SIZE = 65536
+# 进程退出后最多再读取的输出量，避免残留的子孙进程持续写入时无法结束
+_DRAIN_LIMIT = 4 * 1024 * 1024
+# selector 中标识 pidfd 的数据
+_EXIT = "exit"
+
+
+def scheduler_ini_lines(run_mode: str) -> str:
+    """[General] 中与运行方式相关的配置"""
+    if run_mode == RUN_REALTIME:
+        # 仿真时间与真实时间同步，1 小时的场景需要运行 1 小时
+        return "scheduler-class = \"cRealTimeScheduler\"\nrealtimescheduler-scaling = 1\n"
+    if run_mode == RUN_BATCH:
+        return "cmdenv-express-mode = true\n"
+    raise ValueError(f"未知的运行方式: {run_mode}")
+
+
+def opp_run_command(omnetpp_dir: str, project_dir: str, config: str = "static",
+                    extra_args: List[str] = ()) -> Tuple[List[str], Dict[str, str]]:
+    """
+    组装 opp_run 命令
+
+    返回:
+        (参数列表, 环境变量)，工作目录为 project_dir
+    """
+    omnetpp_bin = os.path.join(omnetpp_dir, "bin")
+    simulator = os.environ.get(SIMULATOR_ENV)
+    executable = shlex.split(simulator) if simulator else [os.path.join(omnetpp_bin, "opp_run")]
+    # 按固定间隔输出进度（事件编号、仿真时间、速度），见 sim_progress
+    command = executable + ["-u", "Cmdenv", "-c", config, "-n", NED_PATH, "-l", INET_LIBRARY,
+                            f"--cmdenv-status-frequency={STATUS_FREQUENCY}",
+                            "omnetpp.ini"] + list(extra_args)
+
+    env = dict(os.environ)
+    env["PATH"] = os.pathsep.join(filter(None, [omnetpp_bin, env.get("PATH")]))
+    library_dirs = [os.path.join(omnetpp_dir, "lib"),
+                    os.path.normpath(os.path.join(project_dir, "../../../src"))]
+    env["LD_LIBRARY_PATH"] = os.pathsep.join(filter(None, library_dirs + [env.get("LD_LIBRARY_PATH")]))
+    return command, env
+
+
+def check_simulator(omnetpp_dir: str) -> Optional[str]:
+    """检查能否启动仿真程序，返回错误信息，没有问题时返回 None"""
+    if os.environ.get(SIMULATOR_ENV):
+        return None
+    opp_run = Path(omnetpp_dir) / "bin" / "opp_run"
+    if not opp_run.exists():
+        return f"未找到 {opp_run}，请检查 OMNeT++ 路径或设置环境变量 {SIMULATOR_ENV}"
+    return None
+
+
+def check_runnable(project_dir: str) -> Optional[str]:
+    """
+    检查项目能否由单个仿真进程运行，返回错误信息，没有问题时返回 None
+
+    并行仿真配置需要每个分区各启动一个进程，这里不支持，只能生成
+    """
+    try:
+        with open(os.path.join(project_dir, "omnetpp.ini"), encoding="utf-8") as f:
+            parallel = any(line.strip() == PARSIM_ENABLED_LINE for line in f)
+    except OSError:
+        return None
+    if parallel:
+        return ("omnetpp.ini 是并行仿真配置，只能生成，不能在这里运行；"
+                "请把分区数设为 1，或在项目目录中为每个分区分别启动 opp_run")
+    return None
+
+
+class RunLimits:
+    """
+    一次运行的资源限制，值为 None 表示不限制
+
+    wall_time 由 SimulationProcess.poll() 检查；
+    cpu_time 用 prlimit 交给内核：到达后仿真程序收到 SIGXCPU，再过 grace 秒收到 SIGKILL；
+    memory 为仿真进程树（包括 CPN_SIMULATOR 等包装命令启动的子孙进程）的常驻内存之和，
+    poll() 每 MEMORY_CHECK_INTERVAL 秒检查一次（见 tree_resident_memory）。
+    cpu_time 和 memory 只在 Linux 上有效。
+    """
+
+    def __init__(self, wall_time: float = None, cpu_time: float = None, memory: int = None,
+                 grace: float = DEFAULT_GRACE):
+        """
+        :param wall_time: 墙钟时间（s）
+        :param cpu_time: CPU 时间（s）
+        :param memory: 常驻内存（字节）
+        :param grace: 结束时发送 SIGTERM 后等待的秒数
+        """
+        self.wall_time = wall_time or None
+        self.cpu_time = cpu_time or None
+        self.memory = memory or None
+        self.grace = grace
+
+    def __bool__(self):
+        return any(limit is not None for limit in (self.wall_time, self.cpu_time, self.memory))
+
+    def describe(self) -> str:
+        parts = []
+        if self.wall_time is not None:
+            parts.append(f"墙钟时间 {self.wall_time:g}s")
+        if self.cpu_time is not None:
+            parts.append(f"CPU 时间 {self.cpu_time:g}s")
+        if self.memory is not None:
+            parts.append(f"内存 {self.memory / 2 ** 20:.0f}MB")
+        return "，".join(parts) or "不限制"
+
+    @property
+    def cpu_soft_limit(self) -> Optional[int]:
+        """交给内核的 CPU 时间软限制（整秒）"""
+        if self.cpu_time is None:
+            return None
+        return max(1, int(self.cpu_time + 0.5))
+
+    def apply_cpu_limit(self, pid: int):
+        """设置已启动进程的 CPU 时间限制，子孙进程继承同样的限制"""
+        if self.cpu_time is None or not hasattr(resource, "prlimit"):
+            return
+        soft = self.cpu_soft_limit
+        try:
+            resource.prlimit(pid, resource.RLIMIT_CPU, (soft, soft + max(1, int(self.grace + 0.5))))
+        except (OSError, ValueError) as e:
+            print(f"无法设置 CPU 时间限制: {e}")
+
+    def cpu_limit_reached(self, cpu_time: Optional[float]) -> bool:
+        """记录的 CPU 时间是否已达到软限制（内核按时钟节拍计时，留 CPU_TIME_TOLERANCE 的余量）"""
+        return cpu_time is not None and self.cpu_time is not None \
+            and cpu_time >= self.cpu_soft_limit - CPU_TIME_TOLERANCE
+
+
+def resident_memory(pid: int) -> Optional[int]:
+    """进程的常驻内存（字节），无法读取时返回 None"""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def process_tree(pid: int) -> List[int]:
+    """进程及其全部子孙进程的进程号，读取 /proc/<pid>/task/<tid>/children，不扫描系统进程表"""
+    pids = [pid]
+    for parent in pids:
+        try:
+            tasks = os.listdir(f"/proc/{parent}/task")
+        except OSError:
+            continue
+        for tid in tasks:
+            try:
+                with open(f"/proc/{parent}/task/{tid}/children") as f:
+                    pids.extend(int(child) for child in f.read().split())
+            except (OSError, ValueError):
+                continue
+    return pids
+
+
+def tree_resident_memory(pid: int, profiler: ResourceProfiler = None) -> Optional[int]:
+    """
+    进程树的常驻内存之和（字节），仿真进程已退出时返回 None
+
+    有采样器时沿用它遍历进程树的方式（psutil），否则读取 /proc
+    """
+    if profiler is not None:
+        return profiler.resident_memory()
+    root = resident_memory(pid)
+    if root is None:
+        return None
+    return root + sum(resident_memory(child) or 0 for child in process_tree(pid)[1:])
+
+
+def process_cpu_time(pid: int) -> Optional[float]:
+    """进程的 CPU 时间（用户态 + 内核态，s）；进程退出后、被回收前仍可读取，无法读取时返回 None"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # 第 2 个字段是括号中的进程名，可能含空格，从右括号之后开始数
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class SimulationProcess:
+    """
+    仿真子进程
+
+    用法：
+        process = SimulationProcess(command, cwd, env, on_output=print_line)
+        process.start()
+        while process.poll() is None:   # 或由定时器周期调用
+            ...
+    """
+
+    def __init__(self, command: List[str], cwd: str, env: Dict[str, str] = None,
+                 on_output: Callable[[str, str], None] = None, limits: RunLimits = None,
+                 profile_interval: Optional[float] = PROFILE_INTERVAL):
+        """
+        :param command: 参数列表，不经过 shell
+        :param cwd: 工作目录
+        :param env: 环境变量，默认继承当前进程
+        :param on_output: 每收到一行输出时调用 on_output(STDOUT 或 STDERR, 行内容)
+        :param limits: 资源限制，默认不限制
+        :param profile_interval: 资源占用的采样间隔（s），为 None 或 0 时不采样（见 resource_profile）
+        """
+        self.command = list(command)
+        self.cwd = cwd
+        self.env = env
+        self.on_output = on_output
+        self.limits = limits or RunLimits()
+        self.profile_interval = profile_interval
+        # 进程树的 CPU 和内存采样，没有安装 psutil 时为 None
+        self.profiler: Optional[ResourceProfiler] = None
+        self.process: Optional[subprocess.Popen] = None
+        self.returncode: Optional[int] = None
+        # 结束原因（END_*），进程退出后确定；主动结束时在发出 SIGTERM 时记录
+        self.end_reason: Optional[str] = None
+        # 检查内存时观察到的进程树最大常驻内存（字节）
+        self.peak_memory: Optional[int] = None
+        # 设置了 CPU 时间限制时记录的仿真进程 CPU 时间（s），用于判断被 SIGKILL 结束的原因
+        self.cpu_time: Optional[float] = None
+        self.tail = deque(maxlen=TAIL_LINES)
+        self.started_at = None
+        self.finished_at = None
+        self._selector = None
+        # 文件描述符 -> (流名称, 增量解码器, 未完成的半行)
+        self._streams = {}
+        # 进程退出时可读的 pidfd，不支持时为 None
+        self._pidfd = None
+        # 已发出 SIGTERM 时，到该时刻仍未退出则发送 SIGKILL
+        self._kill_at = None
+        self._next_memory_check = 0.0
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.process.pid if self.process is not None else None
+
+    @property
+    def running(self) -> bool:
+        return self.process is not None and self.returncode is None
+
+    @property
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    def start(self):
+        if self.process is not None:
+            raise RuntimeError("仿真进程已启动")
+        self.process = subprocess.Popen(
+            self.command, cwd=self.cwd, env=self.env,
+            stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            bufsize=0,
+            # 新会话：进程组号等于子进程号，子孙进程默认在同一进程组中
+            start_new_session=True,
+        )
+        self.started_at = time.monotonic()
+        self.limits.apply_cpu_limit(self.process.pid)
+        self.profiler = create_profiler(self.process.pid, self.profile_interval)
+        self._selector = selectors.DefaultSelector()
+        for stream, name in ((self.process.stdout, STDOUT), (self.process.stderr, STDERR)):
+            fd = stream.fileno()
+            os.set_blocking(fd, False)
+            self._selector.register(fd, selectors.EVENT_READ)
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            self._streams[fd] = [name, decoder, ""]
+        if hasattr(os, "pidfd_open"):
+            try:
+                self._pidfd = os.pidfd_open(self.process.pid)
+            except OSError:
+                self._pidfd = None
+            else:
+                self._selector.register(self._pidfd, selectors.EVENT_READ, _EXIT)
+
+    def poll(self, timeout: float = 0) -> Optional[int]:
+        """
+        读取已到达的输出，检查资源限制
+
+        :param timeout: 没有数据时最多等待的秒数，0 表示立即返回
+        返回:
+            进程已退出且输出读完时返回退出码，否则返回 None
+        """
+        if self.process is None:
+            raise RuntimeError("仿真进程未启动")
+        if self.returncode is not None:
+            return self.returncode
+        if self._pidfd is not None or self._streams:
+            for key, _ in self._selector.select(timeout):
+                if key.data != _EXIT:
+                    self._read(key.fd)
+        elif timeout:
+            # 不支持 pidfd 且管道已关闭，等待进程退出
+            try:
+                self.process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                return None
+        if self.limits.cpu_time is not None:
+            # 在 waitpid 回收之前读取，已退出的进程也能读到最终的 CPU 时间
+            cpu_time = process_cpu_time(self.process.pid)
+            if cpu_time is not None:
+                self.cpu_time = cpu_time
+        # waitpid(WNOHANG)，只查询自己的子进程
+        if self.process.poll() is not None:
+            self._drain()
+            self._finish()
+        else:
+            if self.profiler is not None:
+                self.profiler.poll()
+            self._check_limits()
+        return self.returncode
+
+    def wait(self, timeout: float = None) -> Optional[int]:
+        """阻塞读取输出直到进程退出，超时返回 None"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.returncode is None:
+            remaining = 0.1 if deadline is None else min(0.1, deadline - time.monotonic())
+            if remaining <= 0:
+                return None
+            self.poll(remaining)
+        return self.returncode
+
+    def save_profile(self, path: str):
+        """保存资源占用采样，没有采样器时不写文件"""
+        if self.profiler is not None:
+            self.profiler.save(path)
+
+    def stop(self, reason: str = END_CANCELLED):
+        """
+        请求结束（不阻塞）：向整个进程组发送 SIGTERM，
+        宽限时间内未退出时由之后的 poll() 发送 SIGKILL
+        """
+        if not self.running or self._kill_at is not None:
+            return
+        self.end_reason = reason
+        self._signal_group(signal.SIGTERM)
+        self._kill_at = time.monotonic() + self.limits.grace
+
+    def terminate(self, reason: str = END_CANCELLED) -> Optional[int]:
+        """结束整个进程组并等待退出：先发送 SIGTERM，宽限时间内未退出则 SIGKILL"""
+        if not self.running:
+            return self.returncode
+        self.stop(reason)
+        if self.wait(max(0.0, self._kill_at - time.monotonic())) is None:
+            self._signal_group(signal.SIGKILL)
+            self.wait()
+        return self.returncode
+
+    def _check_limits(self):
+        now = time.monotonic()
+        if self._kill_at is not None:
+            if now >= self._kill_at:
+                self._signal_group(signal.SIGKILL)
+            return
+        limits = self.limits
+        if limits.wall_time is not None and now - self.started_at > limits.wall_time:
+            self.stop(END_TIMEOUT)
+        elif limits.memory is not None and now >= self._next_memory_check:
+            self._next_memory_check = now + MEMORY_CHECK_INTERVAL
+            memory = tree_resident_memory(self.process.pid, self.profiler)
+            if memory is None:
+                return
+            self.peak_memory = max(self.peak_memory or 0, memory)
+            if memory > limits.memory:
+                self.stop(END_MEMORY_LIMIT)
+
+    def _signal_group(self, signum) -> bool:
+        """向子进程所在的进程组发信号，进程组已不存在时返回 False"""
+        try:
+            os.killpg(self.process.pid, signum)
+        except (ProcessLookupError, PermissionError):
+            return False
+        return True
+
+    def _drain(self):
+        """进程已退出：读完管道中剩余的输出（管道可能仍被子孙进程持有，读到没有数据为止）"""
+        budget = _DRAIN_LIMIT
+        for fd in list(self._streams):
+            while fd in self._streams and budget > 0:
+                try:
+                    data = os.read(fd, _READ_SIZE)
+                except BlockingIOError:
+                    break
+                budget -= len(data)
+                self._feed(fd, data)
+                if not data:
+                    break
+        # 仍未关闭的管道说明有残留的子孙进程
+        for fd in list(self._streams):
+            self._feed(fd, b"")
+
+    def _read(self, fd: int):
+        try:
+            data = os.read(fd, _READ_SIZE)
+        except BlockingIOError:
+            return
+        self._feed(fd, data)
+
+    def _feed(self, fd: int, data: bytes):
+        """处理读到的数据，data 为空表示管道关闭"""
+        name, decoder, partial = self._streams[fd]
+        if data:
+            text = partial + decoder.decode(data)
+            lines = text.split("\n")
+            self._streams[fd][2] = lines.pop()
+            for line in lines:
+                self._emit(name, line.rstrip("\r"))
+            return
+        # 管道关闭
+        text = partial + decoder.decode(b"", final=True)
+        if text:
+            self._emit(name, text.rstrip("\r"))
+        self._selector.unregister(fd)
+        del self._streams[fd]
+
+    def _emit(self, name: str, line: str):
+        self.tail.append((name, line))
+        if self.on_output is not None:
+            self.on_output(name, line)
+
+    def _finish(self):
+        self.returncode = self.process.returncode
+        self.finished_at = time.monotonic()
+        if self.end_reason is None:
+            if self.returncode == 0:
+                self.end_reason = END_COMPLETED
+            elif self.returncode in (-signal.SIGXCPU, -signal.SIGKILL) \
+                    and self.limits.cpu_limit_reached(self.cpu_time):
+                # 内核按 RLIMIT_CPU 发出的信号；OOM 或手动 kill 等其他 SIGKILL 记为出错
+                self.end_reason = END_CPU_LIMIT
+            else:
+                self.end_reason = END_FAILED
+        # 仿真程序退出后结束留在进程组中的子孙进程
+        self._signal_group(signal.SIGTERM)
+        self._selector.close()
+        if self._pidfd is not None:
+            os.close(self._pidfd)
+            self._pidfd = None
+        self.process.stdout.close()
+        self.process.stderr.close()
@@ -0,0 +1,160 @@
+"""
+仿真进度
+
+从 Cmdenv（express 模式）的 stdout 中逐行解析状态输出：
+
+    ** Event #2176896   t=1.36221476336   Elapsed: 2.000s (0m 02s)  27% completed  (27% total)
+         Speed:     ev/sec=1088448   simsec/sec=0.681107   ev/simsec=1.59803e+06
+         Messages:  created: 1063432   present: 3052   in FES: 1012
+
+得到事件编号、仿真时间、每秒事件数和每秒推进的仿真秒数，估算剩余时间，
+并把整条吞吐曲线保存为运行目录中的 progress.csv，用于比较仿真模型的性能变化。
+
+Cmdenv 只有设置了 sim-time-limit 时才输出完成百分比；没有时用预计的仿真时长
+（例如最后一个任务的产生时刻）估算进度。
+"""
+import csv
+import re
+import time
+from typing import List, Optional
+
+PROGRESS_FILE = "progress.csv"
+# 传给 opp_run 的状态输出间隔
+STATUS_FREQUENCY = "1s"
+
+_NUMBER = r"([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?|inf|nan)"
+_EVENT_PATTERN = re.compile(r"\*\* Event #(\d+)\s+t=" + _NUMBER + r"s?\s+Elapsed:\s*" + _NUMBER + r"s"
+                            r"(?:.*?(\d+)% completed)?")
+_SPEED_PATTERN = re.compile(r"Speed:\s+ev/sec=" + _NUMBER + r"\s+simsec/sec=" + _NUMBER)
+
+CSV_COLUMNS = ("wall_time", "elapsed", "event", "sim_time", "events_per_sec", "simsec_per_sec", "percent")
+
+
+class ProgressSample:
+    """一次状态输出"""
+
+    __slots__ = CSV_COLUMNS
+
+    def __init__(self, wall_time: float, elapsed: float, event: int, sim_time: float,
+                 percent: Optional[int] = None):
+        # 收到该行时本机的单调时钟（s）
+        self.wall_time = wall_time
+        # 仿真程序报告的运行时长（s）
+        self.elapsed = elapsed
+        self.event = event
+        self.sim_time = sim_time
+        self.events_per_sec: Optional[float] = None
+        self.simsec_per_sec: Optional[float] = None
+        self.percent = percent
+
+    def row(self) -> list:
+        return [getattr(self, column) for column in CSV_COLUMNS]
+
+
+def _float(text: str) -> Optional[float]:
+    value = float(text)
+    return value if value == value else None
+
+
+class CmdenvProgress:
+    """
+    解析 Cmdenv 的状态输出
+
+    用法：
+        progress = CmdenvProgress(expected_sim_time=10.0)
+        for line in stdout_lines:
+            if progress.feed(line):
+                status_bar.showMessage(progress.status_text())
+        progress.save(os.path.join(project_dir, PROGRESS_FILE))
+    """
+
+    def __init__(self, expected_sim_time: float = None):
+        """
+        :param expected_sim_time: 预计的仿真时长（s），Cmdenv 不输出完成百分比时用于估算进度
+        """
+        self.expected_sim_time = expected_sim_time if expected_sim_time and expected_sim_time > 0 else None
+        self.samples: List[ProgressSample] = []
+        self.started_at = time.monotonic()
+
+    @property
+    def latest(self) -> Optional[ProgressSample]:
+        return self.samples[-1] if self.samples else None
+
+    def feed(self, line: str) -> bool:
+        """处理一行 stdout，进度有更新时返回 True"""
+        match = _EVENT_PATTERN.search(line)
+        if match:
+            event, sim_time, elapsed, percent = match.groups()
+            sample = ProgressSample(round(time.monotonic() - self.started_at, 3), _float(elapsed), int(event),
+                                    _float(sim_time), int(percent) if percent is not None else None)
+            previous = self.latest
+            self.samples.append(sample)
+            # 先用相邻两次输出估算速度，随后的 Speed 行会给出 Cmdenv 自己的统计
+            if previous is not None and sample.elapsed is not None and previous.elapsed is not None:
+                interval = sample.elapsed - previous.elapsed
+                if interval > 0:
+                    sample.events_per_sec = (sample.event - previous.event) / interval
+                    if sample.sim_time is not None and previous.sim_time is not None:
+                        sample.simsec_per_sec = (sample.sim_time - previous.sim_time) / interval
+            return True
+        match = _SPEED_PATTERN.search(line)
+        if match and self.samples:
+            events_per_sec, simsec_per_sec = match.groups()
+            self.latest.events_per_sec = _float(events_per_sec)
+            self.latest.simsec_per_sec = _float(simsec_per_sec)
+            return True
+        return False
+
+    @property
+    def percent(self) -> Optional[float]:
+        """完成百分比，无法估算时为 None"""
+        sample = self.latest
+        if sample is None:
+            return None
+        if sample.percent is not None:
+            return float(sample.percent)
+        if self.expected_sim_time is not None and sample.sim_time is not None:
+            # 预计时长只是估计，结束前不显示 100%
+            return min(99.0, 100.0 * sample.sim_time / self.expected_sim_time)
+        return None
+
+    @property
+    def eta(self) -> Optional[float]:
+        """预计剩余的真实时间（s），无法估算时为 None"""
+        sample = self.latest
+        if sample is None:
+            return None
+        if sample.percent is None and self.expected_sim_time is not None \
+                and sample.simsec_per_sec and sample.sim_time is not None:
+            return max(0.0, (self.expected_sim_time - sample.sim_time) / sample.simsec_per_sec)
+        percent = self.percent
+        if percent and sample.elapsed is not None:
+            return sample.elapsed * (100.0 - percent) / percent
+        return None
+
+    def status_text(self) -> str:
+        sample = self.latest
+        if sample is None:
+            return "仿真启动中"
+        parts = [f"事件 #{sample.event}"]
+        if sample.sim_time is not None:
+            parts.append(f"t={sample.sim_time:g}s")
+        if self.percent is not None:
+            parts.append(f"{self.percent:.0f}%")
+        if sample.simsec_per_sec is not None:
+            parts.append(f"{sample.simsec_per_sec:.3g} 仿真秒/秒")
+        if sample.events_per_sec is not None:
+            parts.append(f"{sample.events_per_sec:.0f} 事件/秒")
+        eta = self.eta
+        if eta is not None:
+            minutes, seconds = divmod(int(eta + 0.5), 60)
+            parts.append(f"剩余约 {minutes}:{seconds:02d}")
+        return "  ".join(parts)
+
+    def save(self, path: str):
+        """保存吞吐曲线，没有任何状态输出时也写出表头"""
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_COLUMNS)
+            for sample in self.samples:
+                writer.writerow(sample.row())
@@ -8,6 +8,7 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt
 from PySide6.QtUiTools import QUiLoader
 from result_output import export_simulation_results
+from resource_profile import PROFILE_FILE, profile_summary, format_summary
 
 class SimulationExportDialog(QDialog):
     def __init__(self, json_path: str, parent=None):
@@ -39,6 +40,9 @@ class SimulationExportDialog(QDialog):
         # Setup global info
         self.setup_global_info()
 
+        # 仿真程序的资源占用（与 results.json 同目录的 resource_profile.csv）
+        self.setup_resource_info()
+
         # Setup compute node info
         self.setup_compute_node_info()
 
@@ -83,6 +87,24 @@ class SimulationExportDialog(QDialog):
 
         table.resizeColumnsToContents()
 
+    def setup_resource_info(self):
+        summary = profile_summary(str(Path(self.json_path).parent / PROFILE_FILE))
+        if summary is None:
+            return
+
+        table = self.ui.globalTable
+        table.setColumnCount(3)
+        table.setHorizontalHeaderLabels(["指标", "值", "描述"])
+        description = f"仿真程序资源占用，{summary['samples']} 次采样，历时 {summary['duration']:.1f}s"
+        for name, value in format_summary(summary):
+            row = table.rowCount()
+            table.insertRow(row)
+            table.setItem(row, 0, QTableWidgetItem(name))
+            table.setItem(row, 1, QTableWidgetItem(value))
+            table.setItem(row, 2, QTableWidgetItem(description))
+
+        table.resizeColumnsToContents()
+
     def setup_compute_node_info(self):
         if "computeNodeInfo" not in self.json_data:
             return
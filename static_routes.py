@@ -0,0 +1,202 @@
+"""
+离线计算静态路由
+
+在 Python 中对路由类节点（Router / UserGateway / ComputingGateway）之间的链路做最短路，
+为每个路由器生成到全部子网的完整静态路由表，写入 Ipv4NetworkConfigurator 的配置，
+仿真开始时路由即已收敛，不再运行 OSPF。
+
+边缘节点（用户节点、算力节点、调度决策网关）仍使用指向所接网关的默认路由。
+同一路由器经同一下一跳到达的相邻子网合并为更短的前缀（只做精确合并，不扩大覆盖范围），
+只有一个出口的路由器只写一条默认路由。
+"""
+import heapq
+from typing import Dict, List, Tuple
+
+from topology import TopologySnapshot, ROUTERTYPE
+from ip_allocator import parse_ip, mask_prefix, _format
+
+
+ROUTING_OSPF = "ospf"
+ROUTING_STATIC = "static"
+
+METRIC_DELAY = "delay"
+METRIC_HOPS = "hops"
+
+
+class StaticRoute:
+    """一条静态路由"""
+
+    __slots__ = ("router", "network", "prefix", "gateway", "interface")
+
+    def __init__(self, router, network: int, prefix: int, gateway: str, interface: str):
+        self.router = router
+        self.network = network
+        self.prefix = prefix
+        # 下一跳地址（下一跳路由器在该链路上的接口地址）
+        self.gateway = gateway
+        # 出接口名，与 config.xml 中的 ifName 一致
+        self.interface = interface
+
+    @property
+    def destination(self) -> str:
+        return _format(self.network)
+
+    @property
+    def netmask(self) -> str:
+        return _format((0xFFFFFFFF << (32 - self.prefix)) & 0xFFFFFFFF)
+
+    def __str__(self):
+        return f"{self.router}: {self.destination}/{self.prefix} via {self.gateway} ({self.interface})"
+
+    def __repr__(self):
+        return str(self)
+
+
+def collapse_prefixes(networks) -> List[Tuple[int, int]]:
+    """
+    精确合并 (网络地址, 前缀长度) 列表：去掉被包含的子网，合并相邻且对齐的两个子网
+    等价于 ipaddress.collapse_addresses，但只用整数运算
+    """
+    merged: List[Tuple[int, int]] = []
+    for network, prefix in sorted(set(networks)):
+        if merged:
+            last_network, last_prefix = merged[-1]
+            last_size = 1 << (32 - last_prefix)
+            if last_network <= network < last_network + last_size:
+                continue  # 已被前一个子网包含
+        merged.append((network, prefix))
+        # 与前一个子网是同一父网的两半时合并，合并后可能继续与更前面的合并
+        while len(merged) >= 2:
+            (a, a_prefix), (b, b_prefix) = merged[-2], merged[-1]
+            if a_prefix != b_prefix or a_prefix == 0:
+                break
+            size = 1 << (32 - a_prefix)
+            if a % (size * 2) != 0 or b != a + size:
+                break
+            merged[-2:] = [(a, a_prefix - 1)]
+    return merged
+
+
+class StaticRouteCalculator:
+    """
+    以链路时延（METRIC_DELAY）或跳数（METRIC_HOPS）为权重，
+    从每个路由类节点出发做一次 Dijkstra，得到到其他路由类节点的第一跳
+    """
+
+    def __init__(self, topology: TopologySnapshot, metric: str = METRIC_DELAY):
+        if metric not in (METRIC_DELAY, METRIC_HOPS):
+            raise ValueError(f"未知的路由度量: {metric}")
+        self.topology = topology
+        self.metric = metric
+        self.routers = [node for node in topology.nodes if node.nodetype in ROUTERTYPE]
+        # 路由器 -> {相邻路由器: (权重, 接口编号)}，平行链路取权重最小的一条
+        self.adjacency: Dict[object, Dict[object, Tuple[float, int]]] = {}
+        for router in self.routers:
+            links = {}
+            for gate_index, channel, another in topology.neighbours[router]:
+                if another.nodetype not in ROUTERTYPE or another is router:
+                    continue
+                weight = channel.banddelay if metric == METRIC_DELAY else 1
+                if another not in links or weight < links[another][0]:
+                    links[another] = (weight, gate_index)
+            self.adjacency[router] = links
+
+    def first_hops(self, source) -> Tuple[Dict[object, object], Dict[object, float]]:
+        """Dijkstra，返回 (目的路由器 -> 从 source 出发的第一跳路由器, 目的路由器 -> 最短距离)"""
+        adjacency = self.adjacency
+        distances = {source: 0}
+        first_hop = {}
+        # (距离, 序号, 节点, 第一跳)，序号保证相同距离时按入队顺序，结果稳定
+        heap = [(0, 0, source, None)]
+        counter = 1
+        visited = set()
+        while heap:
+            distance, _, node, hop = heapq.heappop(heap)
+            if node in visited:
+                continue
+            visited.add(node)
+            if hop is not None:
+                first_hop[node] = hop
+            for another, (weight, _) in adjacency[node].items():
+                candidate = distance + weight
+                if another not in visited and candidate < distances.get(another, float("inf")):
+                    distances[another] = candidate
+                    heapq.heappush(heap, (candidate, counter, another, hop if hop is not None else another))
+                    counter += 1
+        return first_hop, distances
+
+    def connected_prefixes(self) -> Dict[Tuple[int, int], list]:
+        """
+        子网 -> 直连该子网的路由器
+        来自路由器各接口的 ip_dict / mask_dict，以及边缘节点自身的地址（挂在其默认网关上）
+        """
+        topology = self.topology
+        owners: Dict[Tuple[int, int], list] = {}
+
+        def add(ip, mask, router):
+            address = parse_ip(ip)
+            prefix = mask_prefix(mask)
+            if address is None or prefix is None:
+                return
+            host_bits = (1 << (32 - prefix)) - 1
+            key = (address & ~host_bits & 0xFFFFFFFF, prefix)
+            routers = owners.setdefault(key, [])
+            if router not in routers:
+                routers.append(router)
+
+        for router in self.routers:
+            for another in router.ip_dict:
+                add(router.ip_dict.get(another), router.mask_dict.get(another), router)
+        for node in topology.nodes:
+            if node.nodetype in ROUTERTYPE:
+                continue
+            gateway = topology.route_gateway(node)
+            if gateway is not None and gateway.nodetype in ROUTERTYPE:
+                add(node.ip, node.mask, gateway)
+        return owners
+
+    def compute(self, collapse: bool = True) -> List[StaticRoute]:
+        owners = self.connected_prefixes()
+        # 只有一个直连路由器的子网按路由器分组，到同一路由器的子网走同一个第一跳
+        prefixes_by_owner: Dict[object, list] = {}
+        shared = []
+        for key, routers in owners.items():
+            if len(routers) == 1:
+                prefixes_by_owner.setdefault(routers[0], []).append(key)
+            else:
+                shared.append((key, routers))
+
+        routes = []
+        for source in self.routers:
+            first_hop, distances = self.first_hops(source)
+            # 第一跳 -> 经由它的子网
+            buckets: Dict[object, list] = {}
+            for owner, keys in prefixes_by_owner.items():
+                hop = first_hop.get(owner)
+                if hop is not None:
+                    buckets.setdefault(hop, []).extend(keys)
+            for key, routers in shared:
+                if source in routers:
+                    continue  # 直连子网由路由表自动生成
+                reachable = [router for router in routers if router in first_hop]
+                if reachable:
+                    nearest = min(reachable, key=distances.__getitem__)
+                    buckets.setdefault(first_hop[nearest], []).append(key)
+
+            for hop, keys in buckets.items():
+                gateway = hop.ip_dict.get(source)
+                interface = f"eth{self.adjacency[source][hop][1]}"
+                if collapse and len(buckets) == 1:
+                    # 只有一个出口（如只接一条上行链路的网关），一条默认路由即可
+                    routes.append(StaticRoute(source, 0, 0, gateway, interface))
+                    continue
+                for network, prefix in (collapse_prefixes(keys) if collapse else sorted(set(keys))):
+                    routes.append(StaticRoute(source, network, prefix, gateway, interface))
+        return routes
+
+
+def compute_static_routes(nodes: list, channels: list, topology: TopologySnapshot = None,
+                          metric: str = METRIC_DELAY, collapse: bool = True) -> List[StaticRoute]:
+    """计算全部路由类节点的静态路由表"""
+    topology = TopologySnapshot.ensure(topology, nodes, channels)
+    return StaticRouteCalculator(topology, metric).compute(collapse)
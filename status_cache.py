@@ -0,0 +1,124 @@
+import os
+import json
+import threading
+from typing import Optional
+
+from PySide6.QtCore import QThread, Signal
+
+from status_history import StatusSnapshotHistory
+
+
+class StatusSnapshotCache(QThread):
+    """
+    后台状态快照缓存
+
+    在后台线程中轮询 compute_node_status.json / network_status.json，
+    文件变化时解析并按时间戳存入快照历史，与监控面板是否可见无关。
+    GUI 线程只负责按播放时钟取出快照并显示。
+    """
+
+    COMPUTE_NODE = "compute_node"
+    NETWORK = "network"
+
+    # 新快照入库时发射，参数为快照类型
+    snapshot_added = Signal(str)
+
+    def __init__(self, interval: float = 0.1, parent=None):
+        super().__init__(parent)
+        self.interval = interval
+        self.histories = {
+            self.COMPUTE_NODE: StatusSnapshotHistory(),
+            self.NETWORK: StatusSnapshotHistory(),
+        }
+        self._paths = {}
+        # 上次成功解析时文件的 (mtime_ns, size)
+        self._signatures = {}
+        # 保护 _paths / _signatures：轮询在后台线程，set_paths / reset 在 GUI 线程
+        self._lock = threading.Lock()
+        # 每次 set_paths / reset 加一，用于丢弃清空之前开始解析的结果
+        self._generation = 0
+        self._stop_event = threading.Event()
+
+    def set_paths(self, compute_node_status_json: str, network_status_json: str):
+        """设置要监控的状态文件路径"""
+        with self._lock:
+            self._paths = {
+                self.COMPUTE_NODE: compute_node_status_json,
+                self.NETWORK: network_status_json,
+            }
+            self._signatures.clear()
+            self._generation += 1
+
+    def history(self, kind: str) -> StatusSnapshotHistory:
+        return self.histories[kind]
+
+    def reset(self):
+        """清空已缓存的快照"""
+        # 持锁清空，正在进行的一轮轮询不会在清空后再存入旧快照或记录旧签名
+        with self._lock:
+            for history in self.histories.values():
+                history.clear()
+            self._signatures.clear()
+            self._generation += 1
+
+    def start(self, *args, **kwargs):
+        # 在启动前清除停止标志：若在 run() 中清除，线程调度前到达的 stop() 会丢失
+        self._stop_event.clear()
+        super().start(*args, **kwargs)
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.poll_once()
+
+    def stop(self):
+        """停止后台轮询并等待线程退出"""
+        self._stop_event.set()
+        if self.isRunning():
+            self.wait()
+
+    def poll_once(self):
+        """检查一次所有状态文件"""
+        with self._lock:
+            paths = list(self._paths.items())
+        for kind, path in paths:
+            # 信号在释放锁之后发射：在 GUI 线程中调用时槽函数直接执行，可能再调用 reset
+            if self._poll_file(kind, path) is not None:
+                self.snapshot_added.emit(kind)
+
+    def _poll_file(self, kind: str, path: str) -> Optional[dict]:
+        """
+        文件有变化时解析并存入快照历史，返回存入的快照
+
+        只在读取签名和提交结果时持锁，读文件和解析 JSON 不持锁，
+        GUI 线程中的 reset / set_paths 不必等待一次完整的解析
+        """
+        with self._lock:
+            previous = self._signatures.get(kind)
+            generation = self._generation
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        # 空文件说明仿真程序正在重写，下一轮再读
+        if stat.st_size == 0:
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == previous:
+            return None
+
+        try:
+            with open(path, 'rb') as f:
+                snapshot = json.loads(f.read())
+        except (OSError, ValueError):
+            # 文件可能只写了一半，不记录签名，下一轮重试
+            return None
+
+        with self._lock:
+            # 解析期间被 reset / set_paths 清空过时丢弃这次结果，不存入旧快照
+            if generation != self._generation:
+                return None
+            self._signatures[kind] = signature
+            if not isinstance(snapshot, dict) or "timestamp" not in snapshot:
+                return None
+            self.histories[kind].add(snapshot)
+        return snapshot
@@ -0,0 +1,96 @@
+import bisect
+import threading
+from typing import Optional, List
+
+
+class StatusSnapshotHistory:
+    """
+    状态快照历史
+
+    仿真程序会不断覆盖 compute_node_status.json / network_status.json，
+    这里把每次读到的快照按其仿真时间戳保存下来，
+    回放时可按播放时钟二分查找对应时刻的快照。
+    写入可能来自后台线程，所有操作都加锁。
+    """
+
+    def __init__(self):
+        # 两个列表一一对应，时间戳保持升序
+        self._timestamps: List[float] = []
+        self._snapshots: List[dict] = []
+        self._lock = threading.Lock()
+
+    def add(self, snapshot: dict) -> bool:
+        """
+        添加一个快照
+
+        参数:
+            snapshot (dict): 含 "timestamp" 字段的状态快照
+
+        返回:
+            bool: 是新时刻的快照返回 True；同一时刻已存在时覆盖并返回 False；
+                  时间戳缺失或不是数值（文件只写了一半）时跳过并返回 False
+        """
+        try:
+            timestamp = float(snapshot["timestamp"])
+        except (KeyError, TypeError, ValueError):
+            return False
+        with self._lock:
+            # 仿真输出基本是按时间递增的，先走追加的快速路径
+            if not self._timestamps or timestamp > self._timestamps[-1]:
+                self._timestamps.append(timestamp)
+                self._snapshots.append(snapshot)
+                return True
+
+            index = bisect.bisect_left(self._timestamps, timestamp)
+            if index < len(self._timestamps) and self._timestamps[index] == timestamp:
+                self._snapshots[index] = snapshot
+                return False
+            self._timestamps.insert(index, timestamp)
+            self._snapshots.insert(index, snapshot)
+            return True
+
+    def nearest_index(self, sim_time: float) -> int:
+        """
+        二分查找距离 sim_time 最近的快照下标
+
+        返回:
+            int: 快照下标，历史为空时返回 -1
+        """
+        with self._lock:
+            return self._nearest_index(sim_time)
+
+    def _nearest_index(self, sim_time: float) -> int:
+        if not self._timestamps:
+            return -1
+        index = bisect.bisect_left(self._timestamps, sim_time)
+        if index == 0:
+            return 0
+        if index == len(self._timestamps):
+            return index - 1
+        before = self._timestamps[index - 1]
+        after = self._timestamps[index]
+        return index - 1 if sim_time - before <= after - sim_time else index
+
+    def nearest(self, sim_time: float) -> Optional[dict]:
+        """返回距离 sim_time 最近的快照，历史为空时返回 None"""
+        with self._lock:
+            index = self._nearest_index(sim_time)
+            return self._snapshots[index] if index >= 0 else None
+
+    def latest(self) -> Optional[dict]:
+        """返回时间戳最大的快照"""
+        with self._lock:
+            return self._snapshots[-1] if self._snapshots else None
+
+    def __getitem__(self, index: int) -> dict:
+        with self._lock:
+            return self._snapshots[index]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._snapshots)
+
+    def clear(self):
+        with self._lock:
+            self._timestamps.clear()
+            self._snapshots.clear()
@@ -0,0 +1,165 @@
+from typing import Optional
+
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PySide6.QtGui import QColor
+
+
+class ComputeNodeStatusTableModel(QAbstractTableModel):
+    """
+    算力节点状态表格模型
+
+    只保存快照引用，单元格文本在视图请求时才生成，
+    因此切换快照的开销只与可见行数有关。
+    """
+
+    HEADERS = [
+        "节点ID", "存储空间(GB)", "算力类型", "计算能力(FLOPS)",
+        "开关电容(fF)", "静态功耗(nW)", "价格(元/s)", "能源混合参数",
+        "可用存储(GB)", "任务队列"
+    ]
+    TASK_QUEUE_COLUMN = 9
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._node_states = []
+        # 算力节点编号 -> 画布上的算力节点对象
+        self._node_dict = {}
+
+    def set_nodes(self, node_dict: dict):
+        """设置算力节点编号到节点对象的映射（拓扑不变时只需设置一次）"""
+        self.beginResetModel()
+        self._node_dict = node_dict
+        self.endResetModel()
+
+    def set_snapshot(self, snapshot: Optional[dict]):
+        """切换显示的快照"""
+        self.beginResetModel()
+        self._node_states = snapshot.get("nodeStates", []) if snapshot else []
+        self.endResetModel()
+
+    def clear(self):
+        self.set_snapshot(None)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._node_states)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        node_state = self._node_states[index.row()]
+        column = index.column()
+
+        if column == self.TASK_QUEUE_COLUMN:
+            task_queue = node_state.get("taskQueue", [])
+            if role == Qt.DisplayRole:
+                return f"{len(task_queue)}个任务"
+            elif role == Qt.UserRole:
+                return task_queue
+            elif role == Qt.ToolTipRole and task_queue:
+                # 悬停显示任务详情
+                tooltip_text = "任务队列:\n"
+                for task in task_queue:
+                    tooltip_text += f"任务ID: {task['taskId']}, 排队时间: {task['queuingTime']}s\n"
+                return tooltip_text.strip()
+            return None
+
+        if role != Qt.DisplayRole:
+            return None
+
+        node_id = node_state["nodeId"]
+        if column == 0:
+            return str(node_id)
+        if column == 8:
+            return str(node_state["availableStorage"])
+
+        node = self._node_dict.get(node_id)
+        if node is None:
+            return None
+        if column == 1:
+            return str(node.storage_space)
+        elif column == 2:
+            return "CPU" if node.computing_type == 0 else "GPU"
+        elif column == 3:
+            return f"{node.computing_power:.2e}"
+        elif column == 4:
+            return f"{node.switching_capacitance:.2e}"
+        elif column == 5:
+            return f"{node.static_power:.2e}"
+        elif column == 6:
+            return str(node.price)
+        elif column == 7:
+            return str(node.power_mix)
+        return None
+
+
+class DelayMatrixTableModel(QAbstractTableModel):
+    """
+    用户节点与算力节点时延矩阵模型
+
+    第 0 行/第 0 列为标题，与原先的表格布局保持一致。
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._user_ids = []
+        self._compute_node_ids = []
+        self._delays = []
+
+    def set_snapshot(self, network_status: Optional[dict]):
+        """切换显示的网络状态快照"""
+        self.beginResetModel()
+        if network_status:
+            delay_matrix = network_status["delayMatrix"]
+            self._user_ids = delay_matrix["userIds"]
+            self._compute_node_ids = delay_matrix["computeNodeIds"]
+            self._delays = delay_matrix["delays"]
+        else:
+            self._user_ids = []
+            self._compute_node_ids = []
+            self._delays = []
+        self.endResetModel()
+
+    def clear(self):
+        self.set_snapshot(None)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or not self._compute_node_ids:
+            return 0
+        return len(self._user_ids) + 1
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid() or not self._compute_node_ids:
+            return 0
+        return len(self._compute_node_ids) + 1
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+
+        if role == Qt.TextAlignmentRole:
+            return int(Qt.AlignCenter)
+        if role == Qt.BackgroundRole:
+            if row == 0 and column == 0:
+                return QColor(220, 220, 220)
+            if row == 0 or column == 0:
+                return QColor(240, 240, 240)
+            return None
+        if role != Qt.DisplayRole:
+            return None
+
+        if row == 0 and column == 0:
+            return "用户节点\\算力节点"
+        if row == 0:
+            return f"算力节点 {self._compute_node_ids[column - 1]}"
+        if column == 0:
+            return f"用户节点 {self._user_ids[row - 1]}"
+        return f"{self._delays[row - 1][column - 1]:.1f}"
@@ -0,0 +1,341 @@
+"""
+参数扫描
+
+扫描定义由若干参数组成，每个参数指定一组目标（节点或链路选择器）上的一个属性，
+例如全部链路的 banddelay 或某类算力节点的 computing_power。按网格、随机或拉丁超立方采样
+生成参数点，每个参数点（及每个重复的随机种子）把属性值写到画布对象上，经 file_utils 的写入器
+生成独立的运行目录并提交给 RunExecutor，生成后立即恢复原值，画布本身不被修改。
+执行器带有结果缓存时，生成的配置相同的参数点（例如离散取值重复的随机采样）只运行一次。
+全部运行结束后从各自的 results.json 提取指标，汇总为一张表（每次运行一行）。
+
+扫描定义可以写成 JSON 文件：
+
+    {
+        "name": "delay",
+        "mode": "grid",
+        "repeats": 2,
+        "parameters": [
+            {"name": "delay", "target": "Channel", "attribute": "banddelay", "values": [1, 10, 100]},
+            {"name": "power", "target": "ComputingNode", "attribute": "computing_power",
+             "values": [1e9, 5e9]}
+        ]
+    }
+
+    {
+        "name": "price", "mode": "lhs", "samples": 20, "seed": 1,
+        "parameters": [
+            {"name": "price", "target": ["ComputingNode1", "ComputingNode2"], "attribute": "price",
+             "low": 0.005, "high": 0.05, "log": true},
+            {"name": "bw", "target": "Channel:ComputingGateway", "attribute": "bandwidth",
+             "low": 0.5, "high": 2, "scale": true}
+        ]
+    }
+
+目标选择器：
+    "Channel"                   全部链路
+    "Channel:<节点类型>"         一端为该类型节点的链路，如 Channel:ComputingGateway
+    "Channel:<节点名>"           一端为该节点的链路，如 Channel:Router3
+    "<节点类型>"                 该类型的全部节点，如 ComputingNode
+    "<节点名>"                   单个节点，如 ComputingNode3（节点类型 + 编号）
+scale 为 true 时取值作为原值的倍数。
+"""
+import csv
+import itertools
+import json
+import math
+import random
+import statistics
+from typing import Dict, List, Optional, Sequence
+
+from topology import NODETYPES
+from run_executor import RunExecutor, Run, FINISHED
+from resource_profile import PROFILE_FILE, profile_summary
+
+GRID = "grid"
+RANDOM = "random"
+LHS = "lhs"
+SWEEP_MODES = (GRID, RANDOM, LHS)
+
+CHANNEL_SELECTOR = "Channel"
+
+# 汇总表中每次运行的指标列
+METRIC_COLUMNS = ("tasks", "completed", "success_rate", "mean_end_to_end_delay", "p95_end_to_end_delay",
+                  "mean_computation_time", "total_cost", "throughput", "mean_utilization", "total_energy")
+# 仿真程序的资源占用列（见 resource_profile），取自缓存的运行没有这些值
+RESOURCE_COLUMNS = ("cpu_time", "peak_cpu_percent", "mean_cpu_percent", "peak_rss", "mean_rss")
+
+
+class Parameter:
+    """扫描的一个参数：一组目标上的一个属性"""
+
+    def __init__(self, name: str, target, attribute: str, values: Sequence = None,
+                 low: float = None, high: float = None, log: bool = False,
+                 integer: bool = False, scale: bool = False):
+        """
+        :param name: 参数名，作为汇总表的列名
+        :param target: 目标选择器或选择器列表
+        :param attribute: 节点或链路的属性名
+        :param values: 离散取值，网格扫描必须提供
+        :param low/high: 连续取值范围，随机和拉丁超立方采样使用
+        :param log: 在对数尺度上均匀采样
+        :param integer: 取值四舍五入为整数
+        :param scale: 取值作为原值的倍数
+        """
+        self.name = name
+        self.targets = [target] if isinstance(target, str) else list(target)
+        self.attribute = attribute
+        self.values = list(values) if values is not None else None
+        self.low = low
+        self.high = high
+        self.log = log
+        self.integer = integer
+        self.scale = scale
+        if not self.targets:
+            raise ValueError(f"参数 {name} 没有指定目标")
+        if self.values is None and (low is None or high is None):
+            raise ValueError(f"参数 {name} 需要指定 values 或 low/high")
+        if self.values is not None and not self.values:
+            raise ValueError(f"参数 {name} 的 values 为空")
+        if self.values is None:
+            if low > high:
+                raise ValueError(f"参数 {name} 的取值范围无效: {low} > {high}")
+            if log and low <= 0:
+                raise ValueError(f"参数 {name} 使用对数尺度时下限必须大于 0")
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Parameter":
+        return cls(data["name"], data["target"], data["attribute"], values=data.get("values"),
+                   low=data.get("low"), high=data.get("high"), log=data.get("log", False),
+                   integer=data.get("integer", False), scale=data.get("scale", False))
+
+    def at(self, fraction: float):
+        """[0, 1) 上的位置对应的取值：离散取值按位置取下标，连续范围按线性或对数尺度插值"""
+        if self.values is not None:
+            return self.values[min(int(fraction * len(self.values)), len(self.values) - 1)]
+        if self.log:
+            value = math.exp(math.log(self.low) + fraction * (math.log(self.high) - math.log(self.low)))
+        else:
+            value = self.low + fraction * (self.high - self.low)
+        return round(value) if self.integer else value
+
+    def select(self, nodes: list, channels: list) -> list:
+        """按选择器找出目标对象，保持画布顺序，不重复"""
+        selected = []
+        for target in self.targets:
+            matched = _select(target, nodes, channels)
+            if not matched:
+                raise ValueError(f"参数 {self.name} 的目标 {target} 没有匹配任何节点或链路")
+            for item in matched:
+                if not any(item is other for other in selected):
+                    selected.append(item)
+        missing = [item for item in selected if not hasattr(item, self.attribute)]
+        if missing:
+            raise ValueError(f"参数 {self.name} 的目标没有属性 {self.attribute}")
+        return selected
+
+
+def _node_name(node) -> str:
+    return f"{node.nodetype}{node.index}"
+
+
+def _select(target: str, nodes: list, channels: list) -> list:
+    if target == CHANNEL_SELECTOR:
+        return list(channels)
+    if target.startswith(CHANNEL_SELECTOR + ":"):
+        end = target[len(CHANNEL_SELECTOR) + 1:]
+        key = (lambda node: node.nodetype) if end in NODETYPES else _node_name
+        return [channel for channel in channels
+                if key(channel.start_item) == end or key(channel.end_item) == end]
+    if target in NODETYPES:
+        return [node for node in nodes if node.nodetype == target]
+    return [node for node in nodes if _node_name(node) == target]
+
+
+class SweepDefinition:
+    """扫描定义"""
+
+    def __init__(self, name: str, parameters: List[Parameter], mode: str = GRID,
+                 samples: int = None, seed: int = None, repeats: int = 1):
+        """
+        :param name: 扫描名，用作运行目录名的前缀（字母、数字和下划线）
+        :param mode: grid / random / lhs
+        :param samples: 随机和拉丁超立方采样的参数点数
+        :param seed: 采样的随机种子
+        :param repeats: 每个参数点用不同的仿真随机种子（--seed-set）重复运行的次数
+        """
+        if mode not in SWEEP_MODES:
+            raise ValueError(f"未知的扫描方式: {mode}")
+        if not parameters:
+            raise ValueError("扫描定义没有参数")
+        names = [parameter.name for parameter in parameters]
+        if len(set(names)) != len(names):
+            raise ValueError("参数名重复")
+        if mode == GRID and any(parameter.values is None for parameter in parameters):
+            raise ValueError("网格扫描的每个参数都需要指定 values")
+        if mode != GRID and not samples:
+            raise ValueError("随机和拉丁超立方采样需要指定 samples")
+        if repeats < 1:
+            raise ValueError(f"重复次数必须大于 0: {repeats}")
+        self.name = name
+        self.parameters = parameters
+        self.mode = mode
+        self.samples = samples
+        self.seed = seed
+        self.repeats = repeats
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SweepDefinition":
+        return cls(data["name"], [Parameter.from_dict(item) for item in data["parameters"]],
+                   mode=data.get("mode", GRID), samples=data.get("samples"),
+                   seed=data.get("seed"), repeats=data.get("repeats", 1))
+
+    @classmethod
+    def load(cls, path: str) -> "SweepDefinition":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def points(self) -> List[Dict[str, object]]:
+        """全部参数点，每个参数点为 {参数名: 取值}"""
+        parameters = self.parameters
+        if self.mode == GRID:
+            return [dict(zip((p.name for p in parameters), combination))
+                    for combination in itertools.product(*(p.values for p in parameters))]
+        rng = random.Random(self.seed)
+        if self.mode == RANDOM:
+            return [{p.name: p.at(rng.random()) for p in parameters} for _ in range(self.samples)]
+        # 拉丁超立方：每个参数的取值范围分为 samples 层，每层恰好采样一次，各参数的层顺序独立打乱
+        strata = {}
+        for parameter in parameters:
+            order = list(range(self.samples))
+            rng.shuffle(order)
+            strata[parameter.name] = order
+        return [{p.name: p.at((strata[p.name][i] + rng.random()) / self.samples) for p in parameters}
+                for i in range(self.samples)]
+
+
+class ParameterSweep:
+    """把扫描定义的各参数点生成为运行并提交给执行器"""
+
+    def __init__(self, definition: SweepDefinition, executor: RunExecutor):
+        self.definition = definition
+        self.executor = executor
+        # 运行名 -> (参数点编号, 重复编号, 参数点)
+        self.points: Dict[str, tuple] = {}
+        self.runs: List[Run] = []
+
+    def submit(self, nodes: list, channels: list, extra_args: List[str] = (), **generate_options) -> List[Run]:
+        """
+        生成全部运行目录并排队，返回提交的运行
+
+        :param generate_options: 传给 file_utils.generate_project 的其他参数
+        """
+        definition = self.definition
+        targets = {p.name: p.select(nodes, channels) for p in definition.parameters}
+        points = definition.points()
+        width = len(str(len(points) - 1))
+        for number, point in enumerate(points):
+            for repeat in range(definition.repeats):
+                name = f"{definition.name}_{number:0{width}d}"
+                args = list(extra_args)
+                if definition.repeats > 1:
+                    name += f"_r{repeat}"
+                    args.append(f"--seed-set={repeat}")
+                saved = self._apply(targets, point)
+                try:
+                    run = self.executor.add(name, nodes, channels, args, **generate_options)
+                finally:
+                    # 多个参数可能作用于同一属性，逆序恢复才能回到最初的值
+                    for item, attribute, value in reversed(saved):
+                        setattr(item, attribute, value)
+                self.points[name] = (number, repeat, point)
+                self.runs.append(run)
+        return self.runs
+
+    def _apply(self, targets: Dict[str, list], point: Dict[str, object]) -> list:
+        """把参数点写到目标对象上，返回用于恢复的原值"""
+        saved = []
+        for parameter in self.definition.parameters:
+            value = point[parameter.name]
+            for item in targets[parameter.name]:
+                original = getattr(item, parameter.attribute)
+                saved.append((item, parameter.attribute, original))
+                setattr(item, parameter.attribute, original * value if parameter.scale else value)
+        return saved
+
+    def table(self) -> List[dict]:
+        """汇总表：每次运行一行，包含参数取值、运行状态、指标和仿真程序的资源占用"""
+        rows = []
+        for run in self.runs:
+            number, repeat, point = self.points[run.name]
+            row = {"run": run.name, "point": number, "repeat": repeat}
+            row.update(point)
+            row["state"] = run.state
+            row["end_reason"] = run.end_reason
+            row["cached"] = run.cached
+            row["elapsed"] = round(run.elapsed, 3)
+            metrics = result_metrics(run.results_path) if run.state == FINISHED and run.results_path else {}
+            for column in METRIC_COLUMNS:
+                row[column] = metrics.get(column)
+            profile = profile_summary(run.outputs[PROFILE_FILE]) if PROFILE_FILE in run.outputs else None
+            for column in RESOURCE_COLUMNS:
+                row[column] = profile.get(column) if profile else None
+            rows.append(row)
+        return rows
+
+    def write_table(self, path: str) -> List[dict]:
+        rows = self.table()
+        columns = ["run", "point", "repeat"] + [p.name for p in self.definition.parameters] \
+            + ["state", "end_reason", "cached", "elapsed"] + list(METRIC_COLUMNS) + list(RESOURCE_COLUMNS)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(rows)
+        return rows
+
+
+def _value(metric) -> Optional[float]:
+    if isinstance(metric, dict):
+        metric = metric.get("value")
+    return float(metric) if isinstance(metric, (int, float)) else None
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    position = fraction * (len(ordered) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def result_metrics(path: str) -> Dict[str, Optional[float]]:
+    """从 results.json 提取一次运行的汇总指标"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    tasks = data.get("taskInfo") or []
+    completed = [task for task in tasks if task.get("status") == 1]
+    delays, computation = [], []
+    for task in completed:
+        distribution = task.get("delayDistribution") or {}
+        delay = _value(distribution.get("endToEndDelay"))
+        if delay is not None:
+            delays.append(delay)
+        time = _value(distribution.get("computationTime"))
+        if time is not None:
+            computation.append(time)
+    costs = [_value(task.get("cost")) for task in tasks]
+    nodes = data.get("computeNodeInfo") or []
+    utilization = [_value((node.get("loadBalancingMetrics") or {}).get("averageUtilization")) for node in nodes]
+    utilization = [value for value in utilization if value is not None]
+    energy = [_value(node.get("energyConsumption")) for node in nodes]
+    return {
+        "tasks": len(tasks),
+        "completed": len(completed),
+        "success_rate": len(completed) / len(tasks) if tasks else None,
+        "mean_end_to_end_delay": statistics.fmean(delays) if delays else None,
+        "p95_end_to_end_delay": _percentile(delays, 0.95) if delays else None,
+        "mean_computation_time": statistics.fmean(computation) if computation else None,
+        "total_cost": sum(cost for cost in costs if cost is not None),
+        "throughput": _value((data.get("globalInfo") or {}).get("taskThroughput")),
+        "mean_utilization": statistics.fmean(utilization) if utilization else None,
+        "total_energy": sum(value for value in energy if value is not None),
+    }
@@ -0,0 +1,138 @@
+from types import MappingProxyType
+from typing import Dict, Optional, Tuple
+
+
+ROUTERTYPE = ("Router", "ComputingGateway", "UserGateway")
+EDGETYPE = ("ComputingNode", "ComputeScheduleNode", "UserNode")
+NODETYPES = ("UserNode", "ComputingNode", "UserGateway", "ComputingGateway",
+             "ComputeScheduleNode", "Router")
+
+
+class TopologySnapshot:
+    """
+    编译后的拓扑快照
+
+    生成配置文件前对画布上的节点和链路做一次 O(N+E) 的遍历，
+    预先算好按类型分组的节点、每条链路两端的接口编号、按类型分组的邻居等，
+    供 NED / INI / XML 等写入器共享，写入器不再各自过滤节点列表或调用 channelList.index()。
+
+    只依赖节点的 nodetype / index / channelList 和链路的 start_item / end_item，
+    因此画布节点和普通数据对象都可以使用。快照构建后不可修改，拓扑变化时需重新构建。
+    """
+
+    __slots__ = ("nodes", "channels", "nodes_by_type", "en_names",
+                 "gate_indices", "neighbours", "neighbours_by_type", "_frozen")
+
+    def __init__(self, nodes, channels):
+        """
+        :param nodes: 节点列表（保持画布上的顺序）
+        :param channels: 链路列表
+        """
+        nodes = tuple(nodes)
+        channels = tuple(channels)
+        nodes_by_type = {nodetype: [] for nodetype in NODETYPES}
+        en_names = {}
+        # (链路, 节点) -> 该链路在节点上的接口编号
+        gate_indices = {}
+        # 节点 -> ((接口编号, 链路, 对端节点), ...)
+        neighbours = {}
+        # 节点 -> {对端类型: (对端节点, ...)}
+        neighbours_by_type = {}
+
+        for node in nodes:
+            nodes_by_type.setdefault(node.nodetype, []).append(node)
+            en_names[node] = f"{node.nodetype}{node.index}"
+            node_neighbours = []
+            node_neighbours_by_type = {}
+            for gate_index, channel in enumerate(node.channelList):
+                # 与 channelList.index() 一致，重复出现时取第一次的位置
+                gate_indices.setdefault((channel, node), gate_index)
+                another = channel.end_item if channel.start_item is node else channel.start_item
+                node_neighbours.append((gate_index, channel, another))
+                node_neighbours_by_type.setdefault(another.nodetype, []).append(another)
+            neighbours[node] = tuple(node_neighbours)
+            neighbours_by_type[node] = MappingProxyType(
+                {nodetype: tuple(items) for nodetype, items in node_neighbours_by_type.items()}
+            )
+
+        self.nodes = nodes
+        self.channels = channels
+        self.nodes_by_type = MappingProxyType(
+            {nodetype: tuple(items) for nodetype, items in nodes_by_type.items()}
+        )
+        self.en_names = MappingProxyType(en_names)
+        self.gate_indices = MappingProxyType(gate_indices)
+        self.neighbours = MappingProxyType(neighbours)
+        self.neighbours_by_type = MappingProxyType(neighbours_by_type)
+        self._frozen = True
+
+    def __setattr__(self, key, value):
+        if getattr(self, "_frozen", False):
+            raise AttributeError("TopologySnapshot 构建后不可修改")
+        object.__setattr__(self, key, value)
+
+    @classmethod
+    def ensure(cls, topology: Optional["TopologySnapshot"], nodes, channels) -> "TopologySnapshot":
+        """已有快照则直接使用，否则根据节点和链路列表构建"""
+        return topology if topology is not None else cls(nodes, channels)
+
+    # ---------- 按类型分组的节点 ----------
+    def of_type(self, nodetype: str) -> Tuple:
+        return self.nodes_by_type.get(nodetype, ())
+
+    @property
+    def user_nodes(self):
+        return self.of_type("UserNode")
+
+    @property
+    def compute_nodes(self):
+        return self.of_type("ComputingNode")
+
+    @property
+    def user_gateways(self):
+        return self.of_type("UserGateway")
+
+    @property
+    def computing_gateways(self):
+        return self.of_type("ComputingGateway")
+
+    @property
+    def compute_schedule_nodes(self):
+        return self.of_type("ComputeScheduleNode")
+
+    @property
+    def routers(self):
+        return self.of_type("Router")
+
+    # ---------- 查询 ----------
+    def en_name(self, node) -> str:
+        return self.en_names[node]
+
+    def gate_index(self, channel, node) -> int:
+        """链路在节点一侧的接口编号，等价于 node.channelList.index(channel)"""
+        return self.gate_indices[(channel, node)]
+
+    def neighbours_of_type(self, node, nodetype: str) -> Tuple:
+        """按链路顺序返回指定类型的邻居"""
+        return self.neighbours_by_type[node].get(nodetype, ())
+
+    def first_neighbour_of_type(self, node, nodetype: str):
+        items = self.neighbours_of_type(node, nodetype)
+        return items[0] if items else None
+
+    def route_gateway(self, node):
+        """
+        边缘节点的默认路由网关：第一个路由类邻居，
+        没有路由类邻居时为最后一个邻居，没有链路时为 None
+        """
+        another = None
+        for _, _, another in self.neighbours[node]:
+            if another.nodetype in ROUTERTYPE:
+                break
+        return another
+
+    def type_counts(self) -> Dict[str, int]:
+        return {nodetype: len(items) for nodetype, items in self.nodes_by_type.items()}
+
+    def __repr__(self):
+        return f"TopologySnapshot(nodes={len(self.nodes)}, channels={len(self.channels)})"
@@ -0,0 +1,304 @@
+"""
+参数化的合成拓扑生成器
+
+用于大规模测试：生成由路由器组成的核心网（fat-tree 或随机几何图），
+在接入路由器上挂接算力网关（每个网关下若干算力节点）、用户网关（每个网关下若干用户节点）
+和调度决策网关。生成结果是 topology_model 中的数据对象，不依赖 Qt，
+可直接交给写入器生成配置，也可由 GenerateTopologyCommand 一次性放到画布上。
+
+用法:
+    python topology_generator.py --core fat_tree --k 4 --compute-gateways 8 --computes 16
+"""
+import math
+import random
+import argparse
+from typing import Dict, List, Optional
+
+from topology_model import TopologyModel, NodeRecord
+
+
+FAT_TREE = "fat_tree"
+RANDOM_GEOMETRIC = "random_geometric"
+
+
+class TopologyParams:
+    """生成参数"""
+
+    def __init__(self, core: str = FAT_TREE, fat_tree_k: int = 4,
+                 router_count: int = 20, radius: float = 0.35,
+                 compute_gateways: int = 4, computes_per_gateway: int = 4,
+                 user_gateways: int = 4, users_per_gateway: int = 8,
+                 schedulers: int = 1, seed: Optional[int] = None,
+                 core_bandwidth: float = 1000.0, core_delay: float = 5.0,
+                 access_bandwidth: float = 100.0, access_delay: float = 10.0,
+                 spacing: float = 150.0):
+        """
+        :param core: 核心网类型，FAT_TREE 或 RANDOM_GEOMETRIC
+        :param fat_tree_k: fat-tree 的端口数 k（偶数），共 5k²/4 个路由器
+        :param router_count: 随机几何图的路由器数量
+        :param radius: 随机几何图的连接半径（单位正方形内）
+        :param compute_gateways: 算力网关数量
+        :param computes_per_gateway: 每个算力网关下的算力节点数量
+        :param user_gateways: 用户网关数量
+        :param users_per_gateway: 每个用户网关下的用户节点数量
+        :param schedulers: 调度决策网关数量
+        :param seed: 随机种子
+        :param core_bandwidth: 核心链路带宽（Mbps）
+        :param core_delay: 核心链路时延（us），随机几何图中按距离缩放
+        :param access_bandwidth: 接入链路带宽（Mbps）
+        :param access_delay: 接入链路时延（us）
+        :param spacing: 画布上相邻节点的间距
+        """
+        self.core = core
+        self.fat_tree_k = fat_tree_k
+        self.router_count = router_count
+        self.radius = radius
+        self.compute_gateways = compute_gateways
+        self.computes_per_gateway = computes_per_gateway
+        self.user_gateways = user_gateways
+        self.users_per_gateway = users_per_gateway
+        self.schedulers = schedulers
+        self.seed = seed
+        self.core_bandwidth = core_bandwidth
+        self.core_delay = core_delay
+        self.access_bandwidth = access_bandwidth
+        self.access_delay = access_delay
+        self.spacing = spacing
+
+    def node_count(self) -> int:
+        """预计生成的节点数量"""
+        if self.core == FAT_TREE:
+            routers = 5 * self.fat_tree_k * self.fat_tree_k // 4
+        else:
+            routers = self.router_count
+        return (routers + self.schedulers
+                + self.compute_gateways * (1 + self.computes_per_gateway)
+                + self.user_gateways * (1 + self.users_per_gateway))
+
+
+
+def _ring_cells(cx: int, cy: int, ring: int):
+    """与格子 (cx, cy) 的切比雪夫距离恰好为 ring 的格子"""
+    if ring == 0:
+        yield cx, cy
+        return
+    for dx in range(-ring, ring + 1):
+        yield cx + dx, cy - ring
+        yield cx + dx, cy + ring
+    for dy in range(-ring + 1, ring):
+        yield cx - ring, cy + dy
+        yield cx + ring, cy + dy
+
+
+class TopologyGenerator:
+    def __init__(self, params: TopologyParams, start_indices: Optional[Dict[str, int]] = None):
+        """
+        :param start_indices: 画布上各类型已使用的最大编号，生成的节点从其后编号
+        """
+        if params.core == FAT_TREE and (params.fat_tree_k < 2 or params.fat_tree_k % 2):
+            raise ValueError("fat-tree 的 k 必须是不小于2的偶数")
+        self.params = params
+        self.random = random.Random(params.seed)
+        self.model = TopologyModel(start_indices)
+
+    def generate(self) -> TopologyModel:
+        params = self.params
+        if params.core == FAT_TREE:
+            core_routers, access_routers = self.build_fat_tree()
+        elif params.core == RANDOM_GEOMETRIC:
+            core_routers, access_routers = self.build_random_geometric()
+        else:
+            raise ValueError(f"未知的核心网类型: {params.core}")
+        self.attach_edges(core_routers, access_routers)
+        self.model.update_dicts()
+        return self.model
+
+    # ---------- 核心网 ----------
+    def build_fat_tree(self):
+        """
+        k 端口 fat-tree：(k/2)² 个核心路由器，k 个 pod，每个 pod 含 k/2 个汇聚路由器和 k/2 个边缘路由器
+        返回 (全部路由器, 边缘路由器)
+        """
+        params = self.params
+        model = self.model
+        k = params.fat_tree_k
+        half = k // 2
+        spacing = params.spacing
+        pod_width = half * spacing
+
+        core = []
+        core_width = half * half * spacing
+        total_width = k * pod_width
+        for i in range(half * half):
+            core.append(model.add_node("Router", (total_width - core_width) / 2 + i * spacing, 0.0))
+
+        aggregation, edge = [], []
+        for pod in range(k):
+            pod_aggregation = [model.add_node("Router", pod * pod_width + i * spacing, 1.5 * spacing)
+                               for i in range(half)]
+            pod_edge = [model.add_node("Router", pod * pod_width + i * spacing, 3.0 * spacing)
+                        for i in range(half)]
+            for i, agg in enumerate(pod_aggregation):
+                # 第 i 个汇聚路由器连接第 i 组 k/2 个核心路由器
+                for j in range(half):
+                    model.connect(core[i * half + j], agg, params.core_bandwidth, params.core_delay)
+                for edge_router in pod_edge:
+                    model.connect(agg, edge_router, params.core_bandwidth, params.core_delay)
+            aggregation.extend(pod_aggregation)
+            edge.extend(pod_edge)
+        return core + aggregation + edge, edge
+
+    def build_random_geometric(self):
+        """
+        单位正方形内随机撒点，距离小于半径的路由器相连；
+        各连通分量再与主分量中最近的路由器相连，保证连通
+        返回 (全部路由器, 全部路由器)
+        """
+        params = self.params
+        model = self.model
+        rng = self.random
+        count = max(1, params.router_count)
+        radius = params.radius
+        scale = math.sqrt(count) * params.spacing * 1.5
+
+        points = [(rng.random(), rng.random()) for _ in range(count)]
+        routers = [model.add_node("Router", x * scale, y * scale) for x, y in points]
+
+        def link(a, b):
+            distance = math.dist(points[a], points[b])
+            delay = max(1.0, round(params.core_delay * distance / radius, 2))
+            model.connect(routers[a], routers[b], params.core_bandwidth, delay)
+
+        # 按半径划分网格，只比较相邻格子中的点
+        cell_size = radius
+        grid = {}
+        for i, (x, y) in enumerate(points):
+            grid.setdefault((int(x / cell_size), int(y / cell_size)), []).append(i)
+
+        parent = list(range(count))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for (cx, cy), members in grid.items():
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    others = grid.get((cx + dx, cy + dy))
+                    if not others:
+                        continue
+                    for a in members:
+                        for b in others:
+                            if a < b and math.dist(points[a], points[b]) <= radius:
+                                link(a, b)
+                                parent[find(a)] = find(b)
+
+        components = {}
+        for i in range(count):
+            components.setdefault(find(i), []).append(i)
+        groups = sorted(components.values(), key=len, reverse=True)
+        in_main = [False] * count
+        for i in groups[0]:
+            in_main[i] = True
+        # 其余分量按大小依次并入主分量：从分量中的每个点出发，在网格中逐圈向外找主分量中最近的路由器，
+        # 第 ring 圈中的点距离至少为 (ring - 1) * cell_size，已找到更近的点时停止，不必比较所有点对
+        max_ring = int(1 / cell_size) + 1
+        for group in groups[1:]:
+            best = None
+            for a in group:
+                cx, cy = int(points[a][0] / cell_size), int(points[a][1] / cell_size)
+                for ring in range(max_ring + 1):
+                    if best is not None and best[0] <= (ring - 1) * cell_size:
+                        break
+                    for cell in _ring_cells(cx, cy, ring):
+                        for b in grid.get(cell, ()):
+                            if in_main[b]:
+                                distance = math.dist(points[a], points[b])
+                                if best is None or distance < best[0]:
+                                    best = (distance, a, b)
+            link(best[1], best[2])
+            for i in group:
+                in_main[i] = True
+        return routers, routers
+
+    # ---------- 接入 ----------
+    def attach_edges(self, core_routers: List[NodeRecord], access_routers: List[NodeRecord]):
+        """把网关和主机围绕核心网排布，网关轮流挂接到接入路由器"""
+        params = self.params
+        model = self.model
+        spacing = params.spacing
+
+        xs = [router.x for router in core_routers]
+        ys = [router.y for router in core_routers]
+        center_x = (min(xs) + max(xs)) / 2
+        center_y = (min(ys) + max(ys)) / 2
+        core_radius = max(max(xs) - min(xs), max(ys) - min(ys)) / 2
+
+        for i in range(params.schedulers):
+            router = core_routers[i % len(core_routers)]
+            scheduler = model.add_node("ComputeScheduleNode", router.x + spacing / 2, router.y - spacing)
+            model.connect(scheduler, router, params.core_bandwidth, params.core_delay)
+
+        # 算力网关排在下半圈，用户网关排在上半圈
+        groups = [
+            ("ComputingGateway", "ComputingNode", params.compute_gateways,
+             params.computes_per_gateway, 0.0),
+            ("UserGateway", "UserNode", params.user_gateways,
+             params.users_per_gateway, math.pi),
+        ]
+        router_cursor = 0
+        for gateway_type, host_type, gateway_count, host_count, start_angle in groups:
+            if gateway_count <= 0:
+                continue
+            host_ring = spacing * max(1.0, host_count / (2 * math.pi) * 0.8)
+            # 网关之间留出主机环的空间
+            ring = max(core_radius + 2 * spacing + host_ring,
+                       gateway_count * (2 * host_ring + spacing) / math.pi)
+            for g in range(gateway_count):
+                angle = start_angle + math.pi * (g + 0.5) / gateway_count
+                gx = center_x + ring * math.cos(angle)
+                gy = center_y + ring * math.sin(angle)
+                gateway = model.add_node(gateway_type, gx, gy)
+                router = access_routers[router_cursor % len(access_routers)]
+                router_cursor += 1
+                model.connect(gateway, router, params.core_bandwidth, params.access_delay)
+                for h in range(host_count):
+                    host_angle = 2 * math.pi * h / max(1, host_count)
+                    host = model.add_node(host_type,
+                                          gx + host_ring * math.cos(host_angle),
+                                          gy + host_ring * math.sin(host_angle))
+                    model.connect(gateway, host, params.access_bandwidth, params.access_delay)
+
+
+def generate_topology(params: TopologyParams, start_indices: Optional[Dict[str, int]] = None) -> TopologyModel:
+    """按参数生成拓扑"""
+    return TopologyGenerator(params, start_indices).generate()
+
+
+if __name__ == '__main__':
+    import time
+
+    parser = argparse.ArgumentParser(description="生成合成拓扑并统计规模")
+    parser.add_argument("--core", choices=[FAT_TREE, RANDOM_GEOMETRIC], default=FAT_TREE)
+    parser.add_argument("--k", type=int, default=4, help="fat-tree 端口数")
+    parser.add_argument("--routers", type=int, default=20, help="随机几何图路由器数量")
+    parser.add_argument("--radius", type=float, default=0.35, help="随机几何图连接半径")
+    parser.add_argument("--compute-gateways", type=int, default=4)
+    parser.add_argument("--computes", type=int, default=4, help="每个算力网关下的算力节点数量")
+    parser.add_argument("--user-gateways", type=int, default=4)
+    parser.add_argument("--users", type=int, default=8, help="每个用户网关下的用户节点数量")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    params = TopologyParams(core=args.core, fat_tree_k=args.k, router_count=args.routers,
+                            radius=args.radius, compute_gateways=args.compute_gateways,
+                            computes_per_gateway=args.computes, user_gateways=args.user_gateways,
+                            users_per_gateway=args.users, seed=args.seed)
+    start = time.perf_counter()
+    model = generate_topology(params)
+    elapsed = time.perf_counter() - start
+    print(f"节点 {len(model.nodes)} 个，链路 {len(model.channels)} 条，用时 {elapsed:.3f}s")
+    for nodetype, count in model.type_counts().items():
+        print(f"  {nodetype}: {count}")
@@ -0,0 +1,115 @@
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel, QComboBox,
+    QSpinBox, QDoubleSpinBox, QCheckBox, QPushButton
+)
+
+from topology_generator import TopologyParams, FAT_TREE, RANDOM_GEOMETRIC
+
+
+class TopologyGeneratorDialog(QDialog):
+    """合成拓扑参数设置窗口"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("生成拓扑")
+        self.setup_ui()
+        self.setMinimumSize(400, 300)
+        self.update_core_fields()
+        self.update_estimate()
+
+    def setup_ui(self):
+        main_layout = QVBoxLayout()
+        form = QFormLayout()
+
+        self.core_combo = QComboBox()
+        self.core_combo.addItem("Fat-tree", FAT_TREE)
+        self.core_combo.addItem("随机几何图", RANDOM_GEOMETRIC)
+        form.addRow("核心网类型:", self.core_combo)
+
+        self.k_spin = self._spin_box(2, 64, 4)
+        self.k_spin.setSingleStep(2)
+        form.addRow("Fat-tree 端口数 k:", self.k_spin)
+
+        self.router_spin = self._spin_box(1, 5000, 20)
+        form.addRow("路由器数量:", self.router_spin)
+
+        self.radius_spin = QDoubleSpinBox()
+        self.radius_spin.setRange(0.01, 1.5)
+        self.radius_spin.setSingleStep(0.05)
+        self.radius_spin.setValue(0.35)
+        form.addRow("连接半径:", self.radius_spin)
+
+        self.compute_gateway_spin = self._spin_box(0, 10000, 4)
+        form.addRow("算力网关数量:", self.compute_gateway_spin)
+        self.compute_spin = self._spin_box(0, 10000, 4)
+        form.addRow("每个算力网关的算力节点数:", self.compute_spin)
+        self.user_gateway_spin = self._spin_box(0, 10000, 4)
+        form.addRow("用户网关数量:", self.user_gateway_spin)
+        self.user_spin = self._spin_box(0, 10000, 8)
+        form.addRow("每个用户网关的用户节点数:", self.user_spin)
+        self.scheduler_spin = self._spin_box(1, 100, 1)
+        form.addRow("调度决策网关数量:", self.scheduler_spin)
+
+        self.seed_spin = self._spin_box(0, 2 ** 31 - 1, 0)
+        self.seed_spin.setSpecialValueText("随机")
+        form.addRow("随机种子:", self.seed_spin)
+
+        self.allocate_ip_check = QCheckBox("生成后自动分配IP地址")
+        self.allocate_ip_check.setChecked(True)
+        form.addRow(self.allocate_ip_check)
+
+        self.estimate_label = QLabel()
+        form.addRow("预计节点数:", self.estimate_label)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        self.confirm_btn = QPushButton("确认")
+        self.cancel_btn = QPushButton("取消")
+        button_layout.addWidget(self.confirm_btn)
+        button_layout.addWidget(self.cancel_btn)
+
+        main_layout.addLayout(form)
+        main_layout.addLayout(button_layout)
+        self.setLayout(main_layout)
+
+        self.core_combo.currentIndexChanged.connect(self.update_core_fields)
+        for spin in (self.k_spin, self.router_spin, self.compute_gateway_spin, self.compute_spin,
+                     self.user_gateway_spin, self.user_spin, self.scheduler_spin):
+            spin.valueChanged.connect(self.update_estimate)
+        self.core_combo.currentIndexChanged.connect(self.update_estimate)
+        self.cancel_btn.clicked.connect(self.reject)
+        self.confirm_btn.clicked.connect(self.accept)
+
+    @staticmethod
+    def _spin_box(minimum, maximum, value):
+        spin = QSpinBox()
+        spin.setRange(minimum, maximum)
+        spin.setValue(value)
+        return spin
+
+    def update_core_fields(self):
+        fat_tree = self.core_combo.currentData() == FAT_TREE
+        self.k_spin.setEnabled(fat_tree)
+        self.router_spin.setEnabled(not fat_tree)
+        self.radius_spin.setEnabled(not fat_tree)
+
+    def update_estimate(self):
+        self.estimate_label.setText(str(self.params().node_count()))
+
+    def params(self) -> TopologyParams:
+        k = self.k_spin.value()
+        return TopologyParams(
+            core=self.core_combo.currentData(),
+            fat_tree_k=k + k % 2,
+            router_count=self.router_spin.value(),
+            radius=self.radius_spin.value(),
+            compute_gateways=self.compute_gateway_spin.value(),
+            computes_per_gateway=self.compute_spin.value(),
+            user_gateways=self.user_gateway_spin.value(),
+            users_per_gateway=self.user_spin.value(),
+            schedulers=self.scheduler_spin.value(),
+            seed=self.seed_spin.value() or None,
+        )
+
+    def allocate_ip(self) -> bool:
+        return self.allocate_ip_check.isChecked()
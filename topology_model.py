@@ -0,0 +1,238 @@
+"""
+不依赖 Qt 的拓扑数据对象
+
+字段与画布上的节点类（allTypeItem）和链路类（channel.Channel）同名，
+因此 TopologySnapshot 以及 NED / INI / XML 等写入器可以直接使用。
+用于批量生成拓扑，以及在没有图形界面的环境中处理拓扑。
+
+load_project 读取界面保存的 .pickle 文件：文件中引用的画布类被映射为这里的数据对象，
+不导入 PySide6，不创建任何图元。
+"""
+import pickle
+from typing import Dict, List, Optional
+
+
+DEFAULT_IP = '111.111.111.111'
+DEFAULT_MASK = '255.255.255.0'
+
+# 节点类型 -> 画布上的显示名称（与 UserWindow.type_to_name 和图标文件名一致）
+DISPLAY_NAMES = {
+    "UserNode": "用户节点",
+    "ComputingNode": "算力节点",
+    "UserGateway": "用户网关",
+    "ComputingGateway": "算力网关",
+    "ComputeScheduleNode": "算力调度节点",
+    "Router": "路由节点",
+}
+
+
+class NodeRecord:
+    """节点数据，对应 NodeItem"""
+    nodetype = None
+
+    def __init__(self, index: int, x: float = 0.0, y: float = 0.0):
+        self.index = index
+        self.name = DISPLAY_NAMES.get(self.nodetype, "") + str(index)
+        self.x = x
+        self.y = y
+        self.ip = DEFAULT_IP
+        self.mask = DEFAULT_MASK
+        self.channelList = []
+
+    def another_neighbours(self):
+        return [channel.another_point_of_channel(self) for channel in self.channelList]
+
+    def item_changed(self, change, value):
+        """保存文件中记录了画布节点的 itemChange = item_changed，读取时需要这个属性"""
+        return value
+
+    def __setstate__(self, state):
+        """读取界面保存的节点：先按类型设好默认值，再覆盖为文件中的字段"""
+        self.__init__(state["index"], state.get("x", 0.0), state.get("y", 0.0))
+        for key, value in state.items():
+            if key in _SKIPPED_STATE:
+                continue
+            self.__dict__[key] = value
+        self.channelList = []
+
+    def __str__(self):
+        return f"{self.nodetype}{self.index}"
+
+    def __repr__(self):
+        return str(self)
+
+
+class UserNodeRecord(NodeRecord):
+    nodetype = "UserNode"
+
+    def __init__(self, index: int, x: float = 0.0, y: float = 0.0):
+        super().__init__(index, x, y)
+        self.task_queue = []
+
+
+class ComputingNodeRecord(NodeRecord):
+    nodetype = "ComputingNode"
+
+    def __init__(self, index: int, x: float = 0.0, y: float = 0.0):
+        super().__init__(index, x, y)
+        self.storage_space = 1024  # 单位：GB
+        self.computing_type = 0  # 0表示CPU、1表示GPU
+        self.computing_power = 1e9  # 单位：FLOPS
+        self.switching_capacitance = 1e-15  # 单位：fF
+        self.static_power = 1e-9  # 单位：nW
+        self.price = 0.01  # 单位：元/s
+        self.power_mix = 100  # 混合能源参数
+
+
+class ComputeScheduleNodeRecord(NodeRecord):
+    nodetype = "ComputeScheduleNode"
+
+
+class RouterRecord(NodeRecord):
+    nodetype = "Router"
+
+    def __init__(self, index: int, x: float = 0.0, y: float = 0.0):
+        super().__init__(index, x, y)
+        self.ip_dict = dict()
+        self.mask_dict = dict()
+
+    def update_dicts(self):
+        """与 Router.update_dicts 相同：按当前链路增删 ip_dict / mask_dict 的键"""
+        connected_items = set(self.another_neighbours())
+        for item in list(self.ip_dict.keys()):
+            if item not in connected_items:
+                del self.ip_dict[item]
+                del self.mask_dict[item]
+        for item in connected_items:
+            if item not in self.ip_dict:
+                self.ip_dict[item] = None
+                self.mask_dict[item] = None
+
+
+class UserGatewayRecord(RouterRecord):
+    nodetype = "UserGateway"
+
+
+class ComputingGatewayRecord(RouterRecord):
+    nodetype = "ComputingGateway"
+
+
+# 画布节点状态中与数据无关的字段
+_SKIPPED_STATE = ("itemChange", "widget", "task_widget", "icon_path", "mainwindow", "channelList")
+
+
+RECORD_CLASSES = {
+    cls.nodetype: cls
+    for cls in (UserNodeRecord, ComputingNodeRecord, ComputeScheduleNodeRecord,
+                RouterRecord, UserGatewayRecord, ComputingGatewayRecord)
+}
+
+
+class ChannelRecord:
+    """链路数据，对应 Channel"""
+
+    def __init__(self, start_item: NodeRecord, end_item: NodeRecord,
+                 bandwidth: float = 100.0, banddelay: float = 10.0):
+        self.start_item = start_item
+        self.end_item = end_item
+        self.bandwidth = bandwidth  # 单位：Mbps
+        self.banddelay = banddelay  # 单位：us
+
+    def another_point_of_channel(self, item):
+        if item is self.start_item:
+            return self.end_item
+        elif item is self.end_item:
+            return self.start_item
+        else:
+            return None
+
+    def __str__(self):
+        return f"{self.start_item}<-d={self.banddelay},w={self.bandwidth}->{self.end_item}"
+
+    def __repr__(self):
+        return str(self)
+
+
+class TopologyModel:
+    """节点和链路的集合，节点编号按类型自增"""
+
+    def __init__(self, start_indices: Optional[Dict[str, int]] = None):
+        """
+        :param start_indices: 各类型已使用的最大编号，新节点从其后开始编号
+        """
+        self.nodes: List[NodeRecord] = []
+        self.channels: List[ChannelRecord] = []
+        self.indexDict = {nodetype: 0 for nodetype in RECORD_CLASSES}
+        if start_indices:
+            self.indexDict.update(start_indices)
+
+    def add_node(self, nodetype: str, x: float = 0.0, y: float = 0.0) -> NodeRecord:
+        self.indexDict[nodetype] += 1
+        node = RECORD_CLASSES[nodetype](self.indexDict[nodetype], x, y)
+        self.nodes.append(node)
+        return node
+
+    def connect(self, start_item: NodeRecord, end_item: NodeRecord,
+                bandwidth: float = 100.0, banddelay: float = 10.0) -> ChannelRecord:
+        channel = ChannelRecord(start_item, end_item, bandwidth, banddelay)
+        self.channels.append(channel)
+        start_item.channelList.append(channel)
+        end_item.channelList.append(channel)
+        return channel
+
+    def update_dicts(self):
+        """批量连线结束后统一刷新路由类节点的 ip_dict / mask_dict"""
+        for node in self.nodes:
+            if isinstance(node, RouterRecord):
+                node.update_dicts()
+
+    def type_counts(self) -> Dict[str, int]:
+        counts = {nodetype: 0 for nodetype in RECORD_CLASSES}
+        for node in self.nodes:
+            counts[node.nodetype] += 1
+        return counts
+
+
+class _ChannelInfoState:
+    """对应 channel.ChannelInfo，只保存字段"""
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+
+class _ProjectUnpickler(pickle.Unpickler):
+    """把保存文件中的画布类映射为数据对象，其他类一律拒绝"""
+
+    def find_class(self, module, name):
+        if module == "allTypeItem" and name in RECORD_CLASSES:
+            return RECORD_CLASSES[name]
+        if module == "channel" and name == "ChannelInfo":
+            return _ChannelInfoState
+        # 节点状态中的 itemChange 保存为 getattr(节点, "item_changed")
+        if module == "builtins" and name == "getattr":
+            return getattr
+        raise pickle.UnpicklingError(f"保存文件中包含不支持的对象: {module}.{name}")
+
+
+def load_project(filename: str) -> TopologyModel:
+    """
+    读取界面保存的算网环境（UserWindow.save_to_file 写出的文件），不依赖 Qt
+
+    链路按保存的顺序重新连接，与 UserWindow.load_from_file 相同，节点的接口编号保持不变。
+    """
+    with open(filename, "rb") as f:
+        data = _ProjectUnpickler(f).load()
+    model = TopologyModel(data.get("indexDict"))
+    node_map = {}
+    for node in data["nodes"]:
+        model.nodes.append(node)
+        node_map[(node.nodetype, node.index)] = node
+        if node.index > model.indexDict.get(node.nodetype, 0):
+            model.indexDict[node.nodetype] = node.index
+    for info in data["channels"]:
+        start = node_map.get((info.start_type, info.start_index))
+        end = node_map.get((info.end_type, info.end_index))
+        if start is None or end is None:
+            continue
+        model.connect(start, end, info.bandwidth, info.banddelay)
+    return model
@@ -0,0 +1,214 @@
+from typing import Dict, List
+
+from topology import TopologySnapshot, ROUTERTYPE, EDGETYPE
+from ip_allocator import parse_ip, mask_prefix
+from scheduler_sharding import assign_schedulers
+
+
+ERROR = "错误"
+WARNING = "警告"
+
+# 时延超过该值（us）时给出警告
+MAX_REASONABLE_DELAY = 1e6
+
+
+class ValidationIssue:
+    """一条拓扑检查结果"""
+
+    __slots__ = ("level", "category", "message")
+
+    def __init__(self, level: str, category: str, message: str):
+        self.level = level
+        self.category = category
+        self.message = message
+
+    def __str__(self):
+        return f"[{self.level}][{self.category}] {self.message}"
+
+    def __repr__(self):
+        return str(self)
+
+
+class TopologyValidator:
+    """
+    仿真前的拓扑检查
+
+    一次遍历收集全部问题，而不是遇到第一个问题就停止：
+        - 连通性（并查集）
+        - 调度决策网关是否存在、是否接入路由器，用户网关所在的分片是否有算力网关
+        - 用户节点/算力节点是否接入对应类型的网关
+        - IP 地址和子网掩码是否完整、合法、重复
+        - 链路带宽和时延是否合理
+    """
+
+    def __init__(self, nodes: list, channels: list, topology: TopologySnapshot = None):
+        self.topology = TopologySnapshot.ensure(topology, nodes, channels)
+        self.issues: List[ValidationIssue] = []
+
+    def error(self, category: str, message: str):
+        self.issues.append(ValidationIssue(ERROR, category, message))
+
+    def warning(self, category: str, message: str):
+        self.issues.append(ValidationIssue(WARNING, category, message))
+
+    def validate(self) -> List[ValidationIssue]:
+        self.issues = []
+        if not self.topology.nodes:
+            self.error("拓扑", "网络拓扑为空")
+            return self.issues
+        self.check_names()
+        self.check_connectivity()
+        self.check_scheduler()
+        self.check_gateway_attachment()
+        self.check_addresses()
+        self.check_channels()
+        return self.issues
+
+    def check_names(self):
+        """节点类型和编号相同会导致 NED 中模块重名"""
+        seen = set()
+        for node, name in self.topology.en_names.items():
+            if name in seen:
+                self.error("节点", f"存在多个名为 {name} 的节点")
+            seen.add(name)
+
+    def check_connectivity(self):
+        """并查集检查全网是否连通"""
+        topology = self.topology
+        parent = {node: node for node in topology.nodes}
+
+        def find(node):
+            while parent[node] is not node:
+                # 路径减半
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+
+        for channel in topology.channels:
+            if channel.start_item not in parent or channel.end_item not in parent:
+                self.error("链路", f"链路 {channel} 的端点不在节点列表中")
+                continue
+            root_a, root_b = find(channel.start_item), find(channel.end_item)
+            if root_a is not root_b:
+                parent[root_a] = root_b
+
+        components: Dict[object, list] = {}
+        for node in topology.nodes:
+            components.setdefault(find(node), []).append(node)
+        if len(components) > 1:
+            groups = sorted(components.values(), key=len, reverse=True)
+            details = []
+            for group in groups[1:6]:
+                names = ", ".join(topology.en_names[node] for node in group[:5])
+                if len(group) > 5:
+                    names += f" 等{len(group)}个节点"
+                details.append(names)
+            more = f"；另有{len(groups) - 6}个连通分量" if len(groups) > 6 else ""
+            self.error("连通性", f"网络不连通，共{len(groups)}个连通分量，"
+                              f"与主网络断开的节点：{' | '.join(details)}{more}")
+
+    def check_scheduler(self):
+        topology = self.topology
+        schedulers = topology.compute_schedule_nodes
+        if not schedulers:
+            self.error("调度", "缺少调度决策网关")
+            return
+        for node in schedulers:
+            if not any(another.nodetype in ROUTERTYPE for _, _, another in topology.neighbours[node]):
+                self.error("调度", f"{topology.en_names[node]} 未连接任何路由器或网关")
+        # 分片只在没有任何算力网关时才会出现这种情况，与分片方式无关
+        for node in assign_schedulers(topology).orphaned():
+            self.error("调度", f"{topology.en_names[node]} 管理的用户网关没有可用的算力网关，用户任务无法调度")
+
+    def check_gateway_attachment(self):
+        topology = self.topology
+        en_names = topology.en_names
+        for node in topology.user_nodes:
+            if not topology.neighbours_of_type(node, "UserGateway"):
+                self.error("接入", f"{en_names[node]} 未连接用户网关")
+        for node in topology.compute_nodes:
+            if not topology.neighbours_of_type(node, "ComputingGateway"):
+                self.error("接入", f"{en_names[node]} 未连接算力网关")
+        for node in topology.user_gateways:
+            if not topology.neighbours_of_type(node, "UserNode"):
+                self.warning("接入", f"{en_names[node]} 没有连接用户节点")
+        for node in topology.computing_gateways:
+            if not topology.neighbours_of_type(node, "ComputingNode"):
+                self.warning("接入", f"{en_names[node]} 没有连接算力节点")
+        for node in topology.nodes:
+            if not topology.neighbours[node]:
+                self.error("接入", f"{en_names[node]} 没有任何链路")
+
+    def check_addresses(self):
+        """检查地址完整性和重复，每个接口地址只能出现一次"""
+        topology = self.topology
+        en_names = topology.en_names
+        # 地址整数 -> 第一次出现的接口 (节点, 对端节点)，描述文本只在出错时生成
+        owners = {}
+
+        def describe(node, another):
+            return en_names[node] if another is None else f"{en_names[node]}->{en_names[another]}"
+
+        for node in topology.nodes:
+            if node.nodetype in EDGETYPE:
+                interfaces = ((None, node.ip, node.mask),)
+            elif node.nodetype in ROUTERTYPE:
+                # 同一对节点之间的多条链路共用 ip_dict 中的一个地址，只检查一次
+                ip_dict, mask_dict = node.ip_dict, node.mask_dict
+                interfaces = [
+                    (another, ip_dict.get(another), mask_dict.get(another))
+                    for another in dict.fromkeys(another for _, _, another in topology.neighbours[node])
+                ]
+            else:
+                continue
+            for another, ip, mask in interfaces:
+                address = parse_ip(ip)
+                if address is None:
+                    self.error("地址", f"{describe(node, another)} 未设置IP地址或格式错误（{ip}）")
+                else:
+                    owner = owners.setdefault(address, (node, another))
+                    if owner[0] is not node or owner[1] is not another:
+                        self.error("地址", f"{describe(node, another)} 与 {describe(*owner)} 的IP地址重复")
+                if mask_prefix(mask) is None:
+                    self.error("地址", f"{describe(node, another)} 的子网掩码非法（{mask}）")
+
+    def check_channels(self):
+        topology = self.topology
+        en_names = topology.en_names
+
+        def describe(channel):
+            start, end = channel.start_item, channel.end_item
+            return f"{en_names.get(start, start)}<->{en_names.get(end, end)}"
+
+        seen_pairs = set()
+        for channel in topology.channels:
+            start, end = channel.start_item, channel.end_item
+            if start is end:
+                self.error("链路", f"{describe(channel)} 两端是同一个节点")
+            pair = (start, end) if id(start) < id(end) else (end, start)
+            if pair in seen_pairs:
+                self.warning("链路", f"{describe(channel)} 之间存在多条链路")
+            seen_pairs.add(pair)
+
+            bandwidth, delay = channel.bandwidth, channel.banddelay
+            if not isinstance(bandwidth, (int, float)) or bandwidth <= 0:
+                self.error("链路", f"{describe(channel)} 的带宽必须大于0（当前为 {bandwidth}）")
+            if not isinstance(delay, (int, float)) or delay < 0:
+                self.error("链路", f"{describe(channel)} 的时延不能为负（当前为 {delay}）")
+            elif delay > MAX_REASONABLE_DELAY:
+                self.warning("链路", f"{describe(channel)} 的时延 {delay}us 过大")
+
+
+def validate_topology(nodes: list, channels: list, topology: TopologySnapshot = None) -> List[ValidationIssue]:
+    """检查拓扑，返回全部问题（错误和警告）"""
+    return TopologyValidator(nodes, channels, topology).validate()
+
+
+def format_issues(issues: List[ValidationIssue], limit: int = 30) -> str:
+    """把检查结果整理成适合在对话框中显示的文本，错误排在前面"""
+    ordered = [issue for issue in issues if issue.level == ERROR] + \
+              [issue for issue in issues if issue.level != ERROR]
+    lines = [str(issue) for issue in ordered[:limit]]
+    if len(ordered) > limit:
+        lines.append(f"……其余 {len(ordered) - limit} 条未显示")
+    return "\n".join(lines)
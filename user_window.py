@@ -5,13 +5,15 @@ import pickle
 import sys
 import json
 import csv
+import time
 import typing
 from sys import stderr
 
 from PySide6.QtWidgets import (QApplication, QMainWindow, QDockWidget, QWidget, QTableWidgetItem, QAbstractItemView, QHeaderView, QListWidget, QListWidgetItem,
                               QGraphicsScene, QVBoxLayout, QTableWidget, QLabel, QMenuBar, QPushButton, QStackedWidget, QGridLayout, QScrollArea, QSizeGrip,
-                              QMenu, QMessageBox, QFileDialog, QHBoxLayout, QDialog, QToolButton, QFrame, QToolTip, QDialogButtonBox, QRadioButton
-                               , QGraphicsLineItem, QGraphicsItem)
+                              QMenu, QMessageBox, QFileDialog, QHBoxLayout, QDialog, QToolButton, QFrame, QToolTip, QDialogButtonBox, QRadioButton,
+                              QInputDialog, QFormLayout, QDoubleSpinBox, QSpinBox
+                               , QGraphicsLineItem, QGraphicsItem, QTableView)
 from PySide6.QtUiTools import QUiLoader
 from PySide6.QtCore import Qt, QEvent, QTimer, QDateTime, QPointF, QPoint, QMimeData, QSize, QLineF, QSignalBlocker
 from PySide6.QtGui import  (QAction, QKeySequence, QShortcut, QUndoStack, QPen, QColor, QIcon, QDrag,
@@ -27,9 +29,13 @@ from integrated_scheduler_trace import EventFlowAnimation, EventTraceItem, Event
 
 # 四种快捷键
 from commands import (DeleteNodeCommand, CutCommand, DeleteChannelCommand, AddChannelCommand,
-                       PasteCommand, AddNodeCommand)
+                       PasteCommand, AddNodeCommand, GenerateTopologyCommand, AllocateAddressesCommand)
 
 from compute_node_monitors import ComputeNodeStatusReader
+from status_cache import StatusSnapshotCache
+from status_models import ComputeNodeStatusTableModel, DelayMatrixTableModel
+from load_badge import LoadBadgeController
+from shard_badge import ShardBadgeController
 from collections import defaultdict
 from filelock import FileLock
 
@@ -146,11 +152,37 @@ class UserWindow(QMainWindow):
         self.compute_node_status_json_mtime = 0.0
         self.last_highlighted_row = -1 
 
+        # 后台状态快照缓存（按仿真时间戳索引，回放时按播放时钟查找）
+        self.status_cache = StatusSnapshotCache(parent=self)
+        self.status_cache.snapshot_added.connect(self.on_status_snapshot_added)
+        self.compute_node_status_history = self.status_cache.history(StatusSnapshotCache.COMPUTE_NODE)
+        self.network_status_history = self.status_cache.history(StatusSnapshotCache.NETWORK)
+        self.displayed_compute_snapshot = None
+        self.displayed_network_snapshot = None
+        # 画布上算力节点的负载角标
+        self.load_badges = LoadBadgeController()
+        self.shard_badges = ShardBadgeController()
+        # 并行仿真分区数，1 表示顺序仿真
+        self.parsim_partitions = 1
+        # 每次运行的墙钟时间、CPU 时间和内存限制，默认不限制
+        from sim_process import RunLimits
+        self.run_limits = RunLimits()
+        # 正在运行的参数扫描
+        self.sweep = None
+        # 仿真程序已成功结束，播放完日志中的全部事件后结束运行状态
+        self.simulation_done = False
+        QApplication.instance().aboutToQuit.connect(self.status_cache.stop)
+        QApplication.instance().aboutToQuit.connect(self.cancel_sweep)
+
         # 2. 初始化UI组件
         self.ui = QUiLoader().load('design_window.ui')
         self.ui.setWindowTitle("算力网络仿真平台——算域天枢")
         self.scene = QGraphicsScene()
         self.ui.graphicsView.setScene(self.scene)
+        # 状态栏右侧的仿真进度（事件数、速度、剩余时间）
+        self.progress_label = QLabel()
+        self.ui.statusBar().addPermanentWidget(self.progress_label)
+        self.progress_label.hide()
         
         # 设置右键菜单
         self.ui.listWidget.setContextMenuPolicy(Qt.CustomContextMenu)
@@ -194,9 +226,7 @@ class UserWindow(QMainWindow):
 
         # 13. 初始化文件监控计时器
         self.files_check_timer = QTimer(self)
-        self.files_check_timer.timeout.connect(self.check_network_status_changes)
         self.files_check_timer.timeout.connect(self.check_csv_update)
-        self.files_check_timer.timeout.connect(self.check_compute_node_status_changes)
         # self.files_check_timer.start(100)
 
         # 14. 初始化撤销栈
@@ -276,6 +306,17 @@ class UserWindow(QMainWindow):
         self.run_action.setEnabled(False)
         self.config_action.setEnabled(False)
         self.export_action.setEnabled(False)
+        self.allocate_ip_action.setEnabled(False)
+        self.generate_topology_action.setEnabled(False)
+        self.static_routing_action.setEnabled(False)
+        self.global_arp_action.setEnabled(False)
+        self.parsim_action.setEnabled(False)
+        self.balanced_sharding_action.setEnabled(False)
+        self.sweep_action.setEnabled(False)
+        self.result_cache_action.setEnabled(False)
+        self.realtime_action.setEnabled(False)
+        self.consolidated_tasks_action.setEnabled(False)
+        self.run_limits_action.setEnabled(False)
 
     def set_non_running_state(self):
         """
@@ -309,6 +350,17 @@ class UserWindow(QMainWindow):
         self.run_action.setEnabled(True)
         self.config_action.setEnabled(True)
         self.export_action.setEnabled(True)
+        self.allocate_ip_action.setEnabled(True)
+        self.generate_topology_action.setEnabled(True)
+        self.static_routing_action.setEnabled(True)
+        self.global_arp_action.setEnabled(True)
+        self.parsim_action.setEnabled(True)
+        self.balanced_sharding_action.setEnabled(True)
+        self.sweep_action.setEnabled(True)
+        self.result_cache_action.setEnabled(True)
+        self.realtime_action.setEnabled(True)
+        self.consolidated_tasks_action.setEnabled(True)
+        self.run_limits_action.setEnabled(True)
 
     def setup_menu_actions(self):
         # 获取菜单项
@@ -318,6 +370,24 @@ class UserWindow(QMainWindow):
         self.run_action = self.ui.findChild(QAction, 'actionrun')
         self.config_action = self.ui.findChild(QAction, 'actionconfig')
         self.export_action = self.ui.findChild(QAction, 'actionexport')
+        self.allocate_ip_action = self.ui.findChild(QAction, 'actionallocateip')
+        self.generate_topology_action = self.ui.findChild(QAction, 'actiongeneratetopology')
+        # 勾选后生成配置时离线计算静态路由，仿真中不再运行 OSPF
+        self.static_routing_action = self.ui.findChild(QAction, 'actionstaticrouting')
+        # 勾选后使用 GlobalArp，仿真中不发送 ARP 报文
+        self.global_arp_action = self.ui.findChild(QAction, 'actionglobalarp')
+        # 勾选后各调度决策网关管理的网关数均衡，否则每个网关分给跳数最近的调度决策网关
+        self.balanced_sharding_action = self.ui.findChild(QAction, 'actionbalancedsharding')
+        self.parsim_action = self.ui.findChild(QAction, 'actionparsim')
+        self.sweep_action = self.ui.findChild(QAction, 'actionsweep')
+        # 勾选后配置和仿真程序都未变化的运行直接从结果缓存取得输出
+        self.result_cache_action = self.ui.findChild(QAction, 'actionresultcache')
+        # 勾选（默认）时使用实时调度器，状态面板随仿真变化；否则仿真尽可能快地运行，
+        # 结束后按播放速度回放调度日志，状态面板只显示仿真结束时的状态
+        self.realtime_action = self.ui.findChild(QAction, 'actionrealtime')
+        # 勾选后所有用户节点的任务写入一个 tasks.jsonl，否则每个用户节点一个 JSON 文件
+        self.consolidated_tasks_action = self.ui.findChild(QAction, 'actionconsolidatedtasks')
+        self.run_limits_action = self.ui.findChild(QAction, 'actionrunlimits')
 
         # 连接菜单项的事件
         self.clear_action.triggered.connect(self.on_clear)
@@ -326,6 +396,12 @@ class UserWindow(QMainWindow):
         self.run_action.triggered.connect(self.on_run)
         self.config_action.triggered.connect(self.on_config)
         self.export_action.triggered.connect(self.on_export)
+        self.allocate_ip_action.triggered.connect(self.on_allocate_ip)
+        self.generate_topology_action.triggered.connect(self.on_generate_topology)
+        self.parsim_action.triggered.connect(self.on_parsim_settings)
+        self.sweep_action.triggered.connect(self.on_sweep)
+        self.run_limits_action.triggered.connect(self.on_run_limits_settings)
+        self.realtime_action.triggered.connect(self.on_realtime_toggled)
 
     def show_startup_dialog(self):
         """显示启动对话框，强制用户选择新建或加载网络环境"""
@@ -370,23 +446,6 @@ class UserWindow(QMainWindow):
                         msg.critical(None, "加载失败", f"加载文件时出错: {str(e)}")
                         self.on_clear()
 
-    def check_compute_node_status_changes(self):
-        """检查算力节点状态文件是否有更新"""
-        # 如果文件不存在或未运行，不检查
-        if not os.path.exists(self.compute_node_status_json) or not self.run_clicked:
-            return
-            
-        try:
-            current_mtime = os.path.getmtime(self.compute_node_status_json)
-            # 如果文件有更新且当前显示的是算力节点页面
-            if (current_mtime > self.compute_node_status_json_mtime and
-                hasattr(self, 'stackedWidget') and 
-                self.stackedWidget.currentIndex() == 2):  # 2是算力节点页面索引
-                print("检测到算力节点状态文件更新，刷新表格...")
-                self.load_compute_node_status()
-        except Exception as e:
-            print(f"算力节点文件监控错误: {e}")
-
     def update_node_widget(self):
         old_list = self.ui.listWidget
         if old_list:
@@ -567,8 +626,7 @@ class UserWindow(QMainWindow):
 
         # 3. 重置算力节点状态表格
         if hasattr(self, 'compute_node_table'):
-            self.compute_node_table.clearContents()
-            self.compute_node_table.setRowCount(0)
+            self.compute_node_table_model.clear()
         else:
             raise RuntimeError("算力节点信息表不存在！")
 
@@ -578,11 +636,16 @@ class UserWindow(QMainWindow):
                 item = self.scroll_layout.takeAt(0)
                 if item.widget():
                     item.widget().deleteLater()
+            self.delay_matrix_view = None
 
         # 5. 重置相关状态变量
         self.network_status_json_mtime = 0.0
         self.dispatch_events_csv_mtime = 0.0
         self.compute_node_status_json_mtime = 0.0
+        self.status_cache.reset()
+        self.load_badges.reset()
+        self.displayed_compute_snapshot = None
+        self.displayed_network_snapshot = None
         self.events.clear()
         self.all_node_data = []
         self.latest_node_data = []
@@ -804,6 +867,9 @@ class UserWindow(QMainWindow):
         # 计算当前仿真时间
         current_real_time = QDateTime.currentDateTime().toMSecsSinceEpoch() / 1000.0
         current_sim_time = (current_real_time - self.simulation_start_time) * self.play_speed + self.time_offset
+
+        # 监控面板显示与播放时钟对应的状态快照
+        self.sync_monitor_panels(current_sim_time)
         
         # 处理所有已到达播放时间的事件
         while self.current_event_index < len(self.events):
@@ -864,6 +930,12 @@ class UserWindow(QMainWindow):
                 self.animations.remove(animation)
                 animation.remove_animation()
         
+        # 仿真已结束且日志中的事件全部播放完
+        if self.simulation_done and self.current_event_index >= len(self.events) and not self.animations:
+            self.end_running()
+            self.ui.statusBar().showMessage("调度轨迹回放完毕", 3000)
+            return
+
         # 更新状态栏
         total_events = len(self.events)
         self.ui.statusBar().showMessage(
@@ -1155,80 +1227,126 @@ class UserWindow(QMainWindow):
         if not os.path.exists(self.PROJECT_DIR):
             QMessageBox.critical(self, "错误", "项目路径不存在！请检查路径设置！")
             return
-        # 检查mintty是否打开
-        import psutil
-        for proc in psutil.process_iter(['name', 'exe', 'cmdline']):
-            try:
-                # 检查进程名是否为 mintty.exe
-                if proc.info['name'] == 'mintty.exe':
-                    exe_path = proc.info['exe'] or ""
-                    target_dir = os.path.normcase(self.OMNETPP_DIR)  # 统一路径格式（Windows 下转小写+反斜杠）
-                    exe_dir = os.path.normcase(os.path.dirname(exe_path))
-                    if target_dir in exe_dir:  # 严格匹配目录
-                        QMessageBox.critical(self, "错误", "MSYS2窗口已打开，请关闭后重试！")
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
-        # 检查网络是否正确
-        pass
-        # 清空当前文件夹
-        def clear_folder(folder_path):
-            """
-            清空指定文件夹内的所有内容，但保留文件夹本身
-
-            参数:
-                folder_path: 要清空的文件夹路径
-            """
-            import shutil
-            # 检查文件夹是否存在
-            if not os.path.exists(folder_path):
-                raise FileNotFoundError(f"文件夹不存在: {folder_path}")
-
-            # 检查是否是一个文件夹
-            if not os.path.isdir(folder_path):
-                raise NotADirectoryError(f"不是一个文件夹: {folder_path}")
-
-            # 遍历文件夹内的所有内容
-            for item in os.listdir(folder_path):
-                item_path = os.path.join(folder_path, item)
-
-                try:
-                    # 如果是文件或符号链接，直接删除
-                    if os.path.isfile(item_path) or os.path.islink(item_path):
-                        os.unlink(item_path)
-                    # 如果是文件夹，递归删除
-                    elif os.path.isdir(item_path):
-                        shutil.rmtree(item_path)
-                except Exception as e:
-                    raise RuntimeError(f"清空 {item_path} 时出错: {e}")
+        # 检查上一次启动的仿真是否仍在运行（运行器只跟踪自己启动的进程）
+        if hasattr(self, 'runner'):
+            QMessageBox.critical(self, "错误", "仿真正在运行，请结束后重试！")
+            return
+        # 检查网络是否正确（一次列出全部问题）
+        from topology_validator import validate_topology, format_issues, ERROR
+        issues = validate_topology(self.nodes, self.channels)
+        if any(issue.level == ERROR for issue in issues):
+            QMessageBox.critical(self, "拓扑检查未通过", format_issues(issues))
+            return
+        if issues:
+            reply = QMessageBox.question(self, "拓扑检查",
+                                         format_issues(issues) + "\n\n是否继续仿真？",
+                                         QMessageBox.Yes | QMessageBox.No)
+            if reply != QMessageBox.Yes:
+                return
+        # 并行仿真中 GlobalArp 只能看到本分区的接口
+        if self.parsim_partitions > 1 and self.global_arp_action.isChecked():
+            QMessageBox.critical(self, "错误", "并行仿真不能使用全局地址解析，请改用动态 ARP 或把分区数设为 1！")
+            return
+        # 只清理上一次仿真的输出，配置文件由哈希比较决定是否重写
         try:
-            clear_folder(self.PROJECT_DIR)
+            import file_utils
+            file_utils.clean_simulator_outputs(self.PROJECT_DIR)
         except Exception as e:
             QMessageBox.critical(self, "错误", str(e))
             return
 
         # 生成配置文件
         self.generate_config_files()
+        # 并行仿真需要每个分区一个仿真进程，这里只生成配置
+        if self.parsim_partitions > 1:
+            QMessageBox.information(self, "并行仿真",
+                                    f"已生成 {self.parsim_partitions} 个分区的并行仿真配置。\n"
+                                    "界面只运行顺序仿真，请在项目目录中为每个分区分别启动 opp_run，"
+                                    "或把分区数设为 1 后重新运行。")
+            return
         # 启动仿真程序
-        from omnetpp_runner import OmnetppRunner
+        from omnetpp_runner import create_runner
+        from address_resolution import task_duration
+        from topology import TopologySnapshot
         try:
-            run_command = [f"cd ./samples/inet/examples/computing_power_network/{self.PROJECT_NAME}",
-                           r"opp_run -u Cmdenv -c static -n ../../../src:../..:../../../tutorials:../../../showcases -l ../../../src/INET omnetpp.ini"
-                           ]
-            self.runner = OmnetppRunner(self.OMNETPP_DIR,self.PROJECT_DIR,run_command)
-            self.runner.simulation_finished.connect(self.end_running)
-            self.runner.encountering_errors.connect(lambda: QMessageBox.critical(self, "错误", "仿真未能完成！"))
+            # 最后一个任务的产生时刻作为预计的仿真时长
+            expected_sim_time = task_duration(TopologySnapshot(self.nodes, self.channels))
+            self.runner = create_runner(self.OMNETPP_DIR, self.PROJECT_DIR, self.PROJECT_NAME,
+                                        expected_sim_time=expected_sim_time, cache=self.result_cache(),
+                                        limits=self.run_limits)
+            self.runner.simulation_finished.connect(self.on_simulation_finished)
+            self.runner.encountering_errors.connect(self.on_simulation_error)
+            if hasattr(self.runner, "output_received"):
+                self.runner.output_received.connect(self.on_simulation_output)
+            if hasattr(self.runner, "progress_changed"):
+                self.runner.progress_changed.connect(self.on_simulation_progress)
+                self.progress_label.setText("仿真启动中")
+                self.progress_label.show()
             self.runner.run()
         except Exception as e:
             QMessageBox.critical(self,"错误",f"启动仿真出现错误！{e}")
-            del self.runner
+            if hasattr(self, 'runner'):
+                del self.runner
             return
 
         self.start_running()
 
+    def on_simulation_output(self, stream, line):
+        """仿真程序的输出转到控制台"""
+        print(line, file=sys.stderr if stream == "stderr" else sys.stdout)
+
+    def on_simulation_progress(self, progress):
+        """在状态栏显示仿真进度、仿真秒/秒和预计剩余时间"""
+        self.progress_label.setText(progress.status_text())
+
+    def on_simulation_finished(self):
+        """
+        仿真程序已退出：失败时直接结束；成功时读入完整的调度事件日志，
+        由播放时钟继续回放，全部事件播放完后再结束（见 update_animations）
+        """
+        from sim_process import END_COMPLETED
+        if getattr(self.runner, "end_reason", END_COMPLETED) != END_COMPLETED:
+            self.end_running()
+            return
+        self.release_runner()
+        self.progress_label.hide()
+        if hasattr(self, 'files_check_timer') and self.files_check_timer.isActive():
+            self.files_check_timer.stop()
+        self.check_csv_update()
+        self.status_cache.stop()
+        self.status_cache.poll_once()
+        if not self.events:
+            self.end_running()
+            return
+        self.simulation_done = True
+        if self.realtime_action.isChecked():
+            self.ui.statusBar().showMessage("仿真已完成，正在回放调度轨迹")
+        else:
+            # 快速模式下状态文件在仿真过程中被反复覆盖，没有按时间保留，无法随回放变化
+            self.ui.statusBar().showMessage("仿真已完成，正在回放调度轨迹（快速模式：算力节点和网络状态面板"
+                                            "只显示仿真结束时的状态，不随回放变化）")
+
+    def release_runner(self):
+        """结束运行器启动的进程并释放运行器"""
+        if hasattr(self, 'runner'):
+            if self.runner.terminate() is False:
+                QMessageBox.critical(self, "错误","无法关闭mintty窗口，需要管理员权限，请手动关闭！")
+            del self.runner
+
+    def on_simulation_error(self):
+        message = "仿真未能完成！"
+        if hasattr(self.runner, "error_output"):
+            message += f"\n退出码 {self.runner.returncode}\n\n{self.runner.error_output()}"
+        QMessageBox.critical(self, "错误", message)
+
     def reset_clocks(self):
         if hasattr(self, 'files_check_timer'):
             self.files_check_timer.stop()
             self.files_check_timer.start(100)
+        # 后台解析状态文件，与当前显示的标签页无关
+        self.status_cache.set_paths(self.compute_node_status_json, self.network_status_json)
+        if not self.status_cache.isRunning():
+            self.status_cache.start()
 
     def start_running(self):
         """
@@ -1241,6 +1359,13 @@ class UserWindow(QMainWindow):
         if not self.run_clicked:
             # 首次运行才需要重置监控面板
             self.reset_simulation()
+            computing_node_dict = {
+                node.index: node
+                for node in self.nodes
+                if node.nodetype == "ComputingNode"
+            }
+            self.compute_node_table_model.set_nodes(computing_node_dict)
+            self.load_badges.set_nodes(computing_node_dict)
             self.dispatch_event_table.setVisible(True)
             self.compute_node_table.setVisible(True)
             self.show_monitor_panel()
@@ -1272,30 +1397,19 @@ class UserWindow(QMainWindow):
         if hasattr(self, 'animation_timer') and self.animation_timer.isActive():
             self.animation_timer.stop()
 
-        # 关闭当前窗口
-        import psutil
-        for proc in psutil.process_iter(['name', 'exe', 'cmdline']):
-            try:
-                # 检查进程名是否为 mintty.exe
-                if proc.info['name'] == 'mintty.exe':
-                    exe_path = proc.info['exe'] or ""
-                    target_dir = os.path.normcase(self.OMNETPP_DIR)  # 统一路径格式（Windows 下转小写+反斜杠）
-                    exe_dir = os.path.normcase(os.path.dirname(exe_path))
-                    if target_dir in exe_dir:  # 严格匹配目录
-                        proc.terminate()
-            except psutil.NoSuchProcess:
-                continue
-            except psutil.AccessDenied:
-                QMessageBox.critical(self, "错误","无法关闭mintty窗口，需要管理员权限，请手动关闭！")
-                continue
-
-        if hasattr(self, 'runner'):
-            del self.runner
+        # 关闭当前窗口（结束运行器启动的进程）
+        self.release_runner()
+        self.progress_label.hide()
+        self.simulation_done = False
 
         # 停止文件监控计时器
         if hasattr(self, 'files_check_timer') and self.files_check_timer.isActive():
             self.files_check_timer.stop()
 
+        # 停止后台状态缓存，并补读最后一次写入的状态
+        self.status_cache.stop()
+        self.status_cache.poll_once()
+
         # 停止所有正在进行的动画
         for anim in self.animations[:]:
             if hasattr(anim, 'remove_animation'):
@@ -1430,26 +1544,15 @@ class UserWindow(QMainWindow):
         self.compute_node_controls_layout.addStretch()
         self.compute_node_layout.addWidget(self.compute_node_controls)
         
-        # 创建表格显示算力节点状态
-        self.compute_node_table = QTableWidget()
+        # 创建表格显示算力节点状态（模型/视图，只渲染可见行；任务详情由模型的 ToolTipRole 提供）
+        self.compute_node_table_model = ComputeNodeStatusTableModel(self)
+        self.compute_node_table = QTableView()
+        self.compute_node_table.setModel(self.compute_node_table_model)
         self.compute_node_table.setEditTriggers(QAbstractItemView.NoEditTriggers)  # 禁止编辑
         self.compute_node_table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
         self.compute_node_table.setMinimumHeight(300)
         self.compute_node_table.setVisible(False)
         self.compute_node_table.setMouseTracking(True)
-        # 添加鼠标悬停显示任务详情的功能
-        def show_task_tooltip(row, col):
-            if col == 9:  # 任务队列列
-                item = self.compute_node_table.item(row, col)
-                if item:
-                    task_queue = item.data(Qt.UserRole)
-                    if task_queue:
-                        tooltip_text = "任务队列:\n"
-                        for task in task_queue:
-                            tooltip_text += f"任务ID: {task['taskId']}, 排队时间: {task['queuingTime']}s\n"
-                        QToolTip.showText(QCursor.pos(), tooltip_text.strip())
-        # 连接信号
-        self.compute_node_table.cellEntered.connect(show_task_tooltip)
         self.compute_node_table.horizontalHeader().setStretchLastSection(True)
         self.compute_node_table.verticalHeader().setVisible(False)
         self.compute_node_table.setAlternatingRowColors(True)
@@ -1546,26 +1649,11 @@ class UserWindow(QMainWindow):
         print(f"监控面板初始化完成，包含{self.stackedWidget.count()}个标签页")
 
     def configure_compute_node_table(self):
-        """配置算力节点表格的列标题和属性"""
-        columns = [
-            "算力节点ID",
-            "所属算力网关编号",
-            "IP地址",
-            "子网掩码",
-            "算力类型",
-            "计算能力(FLOPS)",
-            "可用存储空间(GB)",
-            "开关电容(fF)",
-            "静态功耗(nW)",
-            "价格(元/s)",
-            "任务队列"
-        ]
-        self.compute_node_table.setColumnCount(len(columns))
-        self.compute_node_table.setHorizontalHeaderLabels(columns)
+        """配置算力节点表格的列宽和属性（列标题由模型提供）"""
         self.compute_node_table.verticalHeader().setVisible(False)
 
         # 设置列宽
-        column_widths = [100, 120, 120, 120, 80, 140, 120, 100, 100, 100, 200]
+        column_widths = [100, 120, 80, 140, 120, 100, 100, 100, 120, 200]
         for i, width in enumerate(column_widths):
             self.compute_node_table.setColumnWidth(i, width)
 
@@ -1579,117 +1667,48 @@ class UserWindow(QMainWindow):
         # 切换页面
         self.stackedWidget.setCurrentIndex(index)
         
-        # 如果切换到算力节点页面且表格为空，则刷新数据
-        if index == 2 and self.compute_node_table.rowCount() == 0:
+        # 快照已由后台缓存解析好，切换页面只需按播放时钟选择快照
+        if index == 2:
             self.load_compute_node_status()
     
     def load_compute_node_status(self):
-        """加载并解析算力节点状态JSON文件"""
-        try:
-            file_path = os.path.join(self.PROJECT_DIR, "compute_node_status.json")  # 假设JSON文件路径
-            if not os.path.exists(file_path):
-                print(f"算力节点状态文件不存在: {file_path}")
-                return False
-            
-            # 检查文件是否更新
-            current_mtime = os.path.getmtime(file_path)
-            if current_mtime == self.compute_node_status_json_mtime:
-                return True  # 文件未更新，无需处理
-            
-            self.compute_node_status_json_mtime = current_mtime
-            
-            self.compute_node_status_json_reader.update(file_path)
+        """显示与播放时钟对应的算力节点状态快照"""
+        self.displayed_compute_snapshot = None
+        self.sync_monitor_panels(self.get_playback_sim_time())
 
-            data = self.compute_node_status_json_reader.get_node_status()
+    def on_status_snapshot_added(self, kind):
+        """后台缓存有新快照时，若未在播放则立即同步面板"""
+        if not self.playing:
+            self.sync_monitor_panels(self.get_playback_sim_time())
 
-            self.populate_compute_node_table(data)
-            
-        except Exception as e:
-            print(f"加载算力节点状态失败: {str(e)}")
-            return False
+    def get_playback_sim_time(self):
+        """获取当前播放时钟对应的仿真时间"""
+        time_offset = getattr(self, 'time_offset', 0.0)
+        if self.playing and hasattr(self, 'simulation_start_time'):
+            current_real_time = QDateTime.currentDateTime().toMSecsSinceEpoch() / 1000.0
+            return (current_real_time - self.simulation_start_time) * self.play_speed + time_offset
+        return time_offset
+
+    def sync_monitor_panels(self, sim_time):
+        """
+        按播放时钟同步监控面板
+        二分查找最接近 sim_time 的状态快照，只有快照变化时才重绘
+        """
+        snapshot = self.compute_node_status_history.nearest(sim_time)
+        if snapshot is not None and snapshot is not self.displayed_compute_snapshot:
+            self.displayed_compute_snapshot = snapshot
+            self.populate_compute_node_table(snapshot)
+            # 只更新数值有变化的节点角标
+            self.load_badges.apply_snapshot(snapshot)
+
+        snapshot = self.network_status_history.nearest(sim_time)
+        if snapshot is not None and snapshot is not self.displayed_network_snapshot:
+            self.displayed_network_snapshot = snapshot
+            self.update_network_status_panel(snapshot)
 
     def populate_compute_node_table(self, node_data: dict):
-        # 清空表格
-        self.compute_node_table.clear()
-
-        # 设置表头
-        headers = [
-            "节点ID", "存储空间(GB)", "算力类型", "计算能力(FLOPS)",
-            "开关电容(fF)", "静态功耗(nW)", "价格(元/s)", "能源混合参数",
-            "可用存储(GB)", "任务队列"
-        ]
-        self.compute_node_table.setColumnCount(len(headers))
-        self.compute_node_table.setHorizontalHeaderLabels(headers)
-
-        # 获取节点数据
-        node_states = node_data.get("nodeStates", [])
-
-        # 设置行数
-        self.compute_node_table.setRowCount(len(node_states))
-
-        node_dict = defaultdict(lambda: None)
-        node_dict.update({
-            node.index: node
-            for node in self.nodes
-            if node.nodetype == "ComputingNode"
-        })
-
-        # 填充表格数据
-        for row, node_state in enumerate(node_states):
-            node_id = node_state["nodeId"]
-            node = node_dict.get(node_id)
-
-            # 节点ID
-            item = QTableWidgetItem(str(node_id))
-            self.compute_node_table.setItem(row, 0, item)
-
-            # 节点属性
-            if node:
-                # 存储空间
-                node:ComputingNode
-                item = QTableWidgetItem(str(node.storage_space))
-                self.compute_node_table.setItem(row, 1, item)
-
-                # 计算类型
-                computing_type = "CPU" if node.computing_type == 0 else "GPU"
-                item = QTableWidgetItem(computing_type)
-                self.compute_node_table.setItem(row, 2, item)
-
-                # 计算能力
-                item = QTableWidgetItem(f"{node.computing_power:.2e}")
-                self.compute_node_table.setItem(row, 3, item)
-
-                # 开关电容
-                item = QTableWidgetItem(f"{node.switching_capacitance:.2e}")
-                self.compute_node_table.setItem(row, 4, item)
-
-                # 静态功耗
-                item = QTableWidgetItem(f"{node.static_power:.2e}")
-                self.compute_node_table.setItem(row, 5, item)
-
-                # 价格
-                item = QTableWidgetItem(str(node.price))
-                self.compute_node_table.setItem(row, 6, item)
-
-                # 能源混合参数
-                item = QTableWidgetItem(str(node.power_mix))
-                self.compute_node_table.setItem(row, 7, item)
-
-            # 可用存储
-            item = QTableWidgetItem(str(node_state["availableStorage"]))
-            self.compute_node_table.setItem(row, 8, item)
-
-            # 任务队列 - 显示任务数量，悬停显示详情
-            task_queue = node_state.get("taskQueue", [])
-            task_count = len(task_queue)
-            item = QTableWidgetItem(f"{task_count}个任务")
-            item.setData(Qt.UserRole, task_queue)  # 存储任务详情数据
-            self.compute_node_table.setItem(row, 9, item)
-
-        # 调整列宽
-        self.compute_node_table.resizeColumnsToContents()
-        self.compute_node_table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
-        self.compute_node_table.horizontalHeader().setStretchLastSection(True)
+        """切换算力节点表格显示的快照，视图只会读取可见行"""
+        self.compute_node_table_model.set_snapshot(node_data)
 
         # 显示表格
         self.compute_node_table.setVisible(True)
@@ -1820,55 +1839,6 @@ class UserWindow(QMainWindow):
         if hasattr(self, 'show_monitor_action') and self.show_monitor_action:
             self.show_monitor_action.setChecked(self.monitor_dock.isVisible())
 
-    def check_network_status_changes(self):
-        """检查网络状态JSON文件变化，处理空文件和解析错误"""
-        current_modified = 0.0
-        if not os.path.exists(self.network_status_json):
-            return
-
-        # 检查文件是否为空
-        if os.path.getsize(self.network_status_json) == 0:
-            return
-
-        try:
-            current_modified = os.path.getmtime(self.network_status_json)
-        except OSError:
-            return
-
-        # 如果仿真未运行或监控面板不可见，不检查更新
-        if not self.run_clicked or not hasattr(self, 'monitor_dock') or not self.monitor_dock.isVisible():
-            return
-
-        # 检查文件是否有更新
-        if current_modified > self.network_status_json_mtime and current_modified != 0:
-            print("检测到网络状态JSON文件更新，刷新监控面板...")
-            self.network_status_json_mtime = current_modified
-
-            try:
-                with open(self.network_status_json, 'r') as f:
-                    # 再次检查文件是否为空（防止在检查后被清空）
-                    if os.fstat(f.fileno()).st_size == 0:
-                        return
-
-                    network_status = json.load(f)
-                    self.update_network_status_panel(network_status)
-
-            except json.JSONDecodeError as e:
-                QMessageBox.critical(
-                    self,
-                    "文件解析错误",
-                    f"无法解析 network_status.json 文件:\n{str(e)}\n"
-                    f"文件可能已损坏或不完整。"
-                )
-                return
-            except Exception as e:
-                QMessageBox.critical(
-                    self,
-                    "文件读取错误",
-                    f"读取 network_status.json 时发生意外错误:\n{str(e)}"
-                )
-                return
-
     def check_csv_update(self):
         """检查CSV文件是否有更新"""
         try:
@@ -1950,83 +1920,52 @@ class UserWindow(QMainWindow):
         for channel in self.channels:
             channel.setSelected(True)
 
-    def update_network_status_panel(self, network_status):
-        """更新矩阵式网络状态表格，正确解析JSON数据"""
-        # 清除现有内容
-        while self.scroll_layout.count():
-            item = self.scroll_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-
+    def create_network_status_widgets(self):
+        """创建网络状态页的常驻控件，之后切换快照只更新内容"""
         # 创建标题
-        matrix_title = QLabel(f"时延矩阵 (触发任务: {network_status['triggeringTaskId']})")
-        matrix_title.setStyleSheet("font-weight: bold; margin-top: 10px;")
-        self.scroll_layout.addWidget(matrix_title)
-
-        # 获取矩阵数据
-        delay_matrix = network_status["delayMatrix"]
-        user_ids = delay_matrix["userIds"]
-        compute_node_ids = delay_matrix["computeNodeIds"]
-        delays = delay_matrix["delays"]
+        self.matrix_title = QLabel()
+        self.matrix_title.setStyleSheet("font-weight: bold; margin-top: 10px;")
+        self.scroll_layout.addWidget(self.matrix_title)
 
         # 创建表格
-        table = QTableWidget(len(user_ids) + 1, len(compute_node_ids) + 1)
-        table.setEditTriggers(QTableWidget.NoEditTriggers)
-        table.setSelectionBehavior(QAbstractItemView.SelectItems)
-        table.setAlternatingRowColors(True)
-
-        table.verticalHeader().setVisible(False)
-        table.horizontalHeader().setVisible(False)
-
-        # 设置表头 - 左上角单元格
-        corner_item = QTableWidgetItem("用户节点\\算力节点")
-        corner_item.setBackground(QColor(220, 220, 220))
-        corner_item.setTextAlignment(Qt.AlignCenter)
-        table.setItem(0, 0, corner_item)
-
-        # 设置列标题（算力节点）
-        for col, node_id in enumerate(compute_node_ids, 1):
-            item = QTableWidgetItem(f"算力节点 {node_id}")
-            item.setBackground(QColor(240, 240, 240))
-            item.setTextAlignment(Qt.AlignCenter)
-            table.setItem(0, col, item)
-
-        # 设置行标题（用户节点）和填充数据
-        for row, user_id in enumerate(user_ids, 1):
-            # 行标题
-            row_item = QTableWidgetItem(f"用户节点 {user_id}")
-            row_item.setBackground(QColor(240, 240, 240))
-            row_item.setTextAlignment(Qt.AlignCenter)
-            table.setItem(row, 0, row_item)
-
-            # 填充延迟数据
-            for col, delay in enumerate(delays[row - 1], 1):
-                cell_item = QTableWidgetItem(f"{delay:.1f}")
-                cell_item.setTextAlignment(Qt.AlignCenter)
-                table.setItem(row, col, cell_item)
-
-        # 设置表格属性
-        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        table.setMinimumHeight(200)
-        self.scroll_layout.addWidget(table)
+        self.delay_matrix_model = DelayMatrixTableModel(self)
+        self.delay_matrix_view = QTableView()
+        self.delay_matrix_view.setModel(self.delay_matrix_model)
+        self.delay_matrix_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.delay_matrix_view.setSelectionBehavior(QAbstractItemView.SelectItems)
+        self.delay_matrix_view.setAlternatingRowColors(True)
+        self.delay_matrix_view.verticalHeader().setVisible(False)
+        self.delay_matrix_view.horizontalHeader().setVisible(False)
+        self.delay_matrix_view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.delay_matrix_view.setMinimumHeight(200)
+        self.scroll_layout.addWidget(self.delay_matrix_view)
 
         # 添加时间戳和丢包率信息
         info_widget = QWidget()
         info_layout = QHBoxLayout(info_widget)
+        self.timestamp_label = QLabel()
+        self.loss_label = QLabel()
+        info_layout.addWidget(self.timestamp_label)
+        info_layout.addStretch()
+        info_layout.addWidget(self.loss_label)
+        self.scroll_layout.addWidget(info_widget)
 
-        timestamp_label = QLabel(f"时间戳: {network_status['timestamp']}")
+    def update_network_status_panel(self, network_status):
+        """更新矩阵式网络状态表格，正确解析JSON数据"""
+        if getattr(self, 'delay_matrix_view', None) is None:
+            self.create_network_status_widgets()
+
+        self.matrix_title.setText(f"时延矩阵 (触发任务: {network_status['triggeringTaskId']})")
+        self.delay_matrix_model.set_snapshot(network_status)
+
+        self.timestamp_label.setText(f"时间戳: {network_status['timestamp']}")
         loss_info = network_status["packetLoss"]
-        loss_label = QLabel(
+        self.loss_label.setText(
             f"丢包率: {loss_info['packetLossRate']}% "
             f"(发送: {loss_info['packetsSentSinceLastLog']}, "
             f"丢弃: {loss_info['packetsDroppedSinceLastLog']})"
         )
 
-        info_layout.addWidget(timestamp_label)
-        info_layout.addStretch()
-        info_layout.addWidget(loss_label)
-        self.scroll_layout.addWidget(info_widget)
-
     def getNodeType(self, nodeName):
         typeDict = {"用户节点": "UserNode", 
                     "算力节点": "ComputingNode", 
@@ -2177,43 +2116,247 @@ class UserWindow(QMainWindow):
 
         try:
             import file_utils
-            # 2. 构建目标路径 inet/examples/computing_power_network
-            target_dir = self.PROJECT_DIR
-
-            # 3. 处理 network.ned 文件
-            ned_path = os.path.join(target_dir, "network.ned")
-            nedwriter = file_utils.NEDWriter(ned_path,self.nodes,self.channels,self.PROJECT_NAME)
-            nedwriter.write()
-            del nedwriter
-
-            # 4. 处理 omnetpp.ini 文件
-            ini_path = os.path.join(target_dir, "omnetpp.ini")
-            iniwriter = file_utils.INIWriter(ini_path,self.nodes,self.channels,self.PROJECT_NAME)
-            iniwriter.write()
-            del iniwriter
-
-            # 5. 处理 config.xml 文件
-            xml_path = os.path.join(target_dir, "config.xml")
-            xmlwriter = file_utils.XMLWriter(xml_path,self.nodes,self.channels)
-            xmlwriter.write()
-            del xmlwriter
-
-            # 6. 写入任务文件
-            taskwriter = file_utils.TaskWriter(self.nodes,self.PROJECT_DIR)
-            taskwriter.write()
-            del taskwriter
-
-            # 7. 写入拓扑文件
-            file_utils.write_network_topology(self.nodes, self.PROJECT_DIR)
+            from topology import TopologySnapshot
+            topology = TopologySnapshot(self.nodes, self.channels)
+            options = self.generation_options(topology)
+            arp_mode = options["arp_mode"]
+            assignment = options["assignment"]
+            partitioning = options["partitioning"]
+            # 渲染全部产物，只重写内容有变化的文件
+            report = file_utils.generate_project(self.PROJECT_DIR, self.PROJECT_NAME,
+                                                 self.nodes, self.channels, **options)
+            print(f"配置文件已生成：重写 {len(report['written'])} 个，"
+                  f"未变化 {len(report['unchanged'])} 个，删除 {len(report['removed'])} 个")
+            # 在画布上标出每个网关所属的调度决策网关
+            self.shard_badges.apply(assignment)
+            for line in assignment.report():
+                print(f"调度分片 {line}")
+            if partitioning is not None:
+                for line in partitioning.report():
+                    print(f"并行仿真 {line}")
+            if arp_mode == file_utils.ARP_GLOBAL:
+                from address_resolution import estimate_arp_events, format_estimate
+                message = f"全局地址解析免去了：{format_estimate(estimate_arp_events(topology))}"
+                print(message)
+                self.ui.statusBar().showMessage(message)
 
         except Exception as e:
             QMessageBox.critical(None, "错误", f"提交过程中出现错误：{str(e)}")
             raise e
     
+    def generation_options(self, topology) -> dict:
+        """按菜单中勾选的选项组装 file_utils.generate_project 的参数"""
+        import file_utils
+        routing = file_utils.ROUTING_STATIC if self.static_routing_action.isChecked() \
+            else file_utils.ROUTING_OSPF
+        arp_mode = file_utils.ARP_GLOBAL if self.global_arp_action.isChecked() \
+            else file_utils.ARP_DYNAMIC
+        sharding = file_utils.SHARD_BALANCED if self.balanced_sharding_action.isChecked() \
+            else file_utils.SHARD_NEAREST
+        partitioning = None
+        if self.parsim_partitions > 1:
+            partitioning = file_utils.partition_topology(topology, self.parsim_partitions)
+        run_mode = file_utils.RUN_REALTIME if self.realtime_action.isChecked() else file_utils.RUN_BATCH
+        task_mode = file_utils.TaskWriter.CONSOLIDATED if self.consolidated_tasks_action.isChecked() \
+            else file_utils.TaskWriter.PER_USER
+        return dict(topology=topology, routing=routing, arp_mode=arp_mode,
+                    assignment=file_utils.assign_schedulers(topology, sharding),
+                    partitioning=partitioning, run_mode=run_mode, task_mode=task_mode)
+
+    def result_cache(self):
+        """菜单中勾选了使用结果缓存时返回缓存，否则返回 None"""
+        if not self.result_cache_action.isChecked():
+            return None
+        from result_cache import ResultCache
+        return ResultCache()
+
+    def on_sweep(self):
+        """
+        参数扫描：读取扫描定义文件，为每个参数点生成独立的运行目录并行运行，
+        全部结束后把各次运行的指标汇总为 <项目目录>_<扫描名>.csv
+        """
+        if not (self.OMNETPP_DIR and self.PROJECT_DIR) or not os.path.exists(self.PROJECT_DIR):
+            QMessageBox.critical(self, "错误", "请先配置路径地址")
+            return
+        if not self.nodes:
+            QMessageBox.critical(self, "错误", "请先创建网络拓扑！")
+            return
+        if self.sweep is not None:
+            QMessageBox.critical(self, "错误", "参数扫描正在运行，请结束后重试！")
+            return
+        filename, _ = QFileDialog.getOpenFileName(self, "选择扫描定义", "", "扫描定义 (*.json)")
+        if not filename:
+            return
+
+        import file_utils
+        from sim_process import check_simulator
+        from run_executor import RunExecutor
+        from sweep import SweepDefinition, ParameterSweep
+        from topology import TopologySnapshot
+        error = check_simulator(self.OMNETPP_DIR)
+        if error:
+            QMessageBox.critical(self, "错误", error)
+            return
+        try:
+            definition = SweepDefinition.load(filename)
+            count = len(definition.points()) * definition.repeats
+            reply = QMessageBox.question(self, "参数扫描",
+                                         f"扫描 {definition.name} 共 {count} 次运行，"
+                                         f"同时运行 {os.cpu_count() or 1} 个，是否开始？",
+                                         QMessageBox.Yes | QMessageBox.No)
+            if reply != QMessageBox.Yes:
+                return
+            executor = RunExecutor(self.OMNETPP_DIR, self.PROJECT_DIR, cache=self.result_cache(),
+                                   limits=self.run_limits)
+            sweep = ParameterSweep(definition, executor)
+            options = self.generation_options(TopologySnapshot(self.nodes, self.channels))
+            # 扫描没有回放，总是尽可能快地运行；执行器只能运行顺序仿真
+            options["run_mode"] = file_utils.RUN_BATCH
+            options["partitioning"] = None
+            sweep.submit(self.nodes, self.channels, **options)
+        except Exception as e:
+            QMessageBox.critical(self, "错误", f"参数扫描出现错误：{e}")
+            return
+
+        self.sweep = sweep
+        self.sweep_timer = QTimer(self)
+        self.sweep_timer.timeout.connect(self.poll_sweep)
+        self.sweep_timer.start(200)
+        self.poll_sweep()
+
+    def poll_sweep(self):
+        executor = self.sweep.executor
+        if executor.poll():
+            self.ui.statusBar().showMessage(f"参数扫描 {self.sweep.definition.name}：{executor.summary()}")
+        if not executor.finished:
+            return
+        self.sweep_timer.stop()
+        sweep, self.sweep = self.sweep, None
+        path = f"{os.path.normpath(self.PROJECT_DIR)}_{sweep.definition.name}.csv"
+        try:
+            sweep.write_table(path)
+        except OSError as e:
+            QMessageBox.critical(self, "错误", f"写入扫描结果失败：{e}")
+            return
+        message = f"参数扫描 {sweep.definition.name} 已结束：{executor.summary()}\n结果汇总：{path}"
+        failed = [run for run in executor.runs if run.error]
+        if failed:
+            message += f"\n\n{failed[0].name} 出错：\n{failed[0].error}"
+        QMessageBox.information(self, "参数扫描", message)
+
+    def cancel_sweep(self):
+        """退出时结束参数扫描启动的仿真进程"""
+        if self.sweep is not None:
+            self.sweep_timer.stop()
+            self.sweep.executor.cancel()
+            self.sweep = None
+
+    def on_parsim_settings(self):
+        """设置并行仿真的分区数，下次生成配置文件时生效；并行仿真配置只生成，不在界面中运行"""
+        partitions, ok = QInputDialog.getInt(self, "并行仿真分区",
+                                             "分区数（1 表示顺序仿真，大于 1 时只生成配置、不运行）:",
+                                             self.parsim_partitions, 1, 256)
+        if not ok:
+            return
+        self.parsim_partitions = partitions
+        if partitions > 1:
+            self.parsim_action.setText(f"并行仿真分区（{partitions} 个分区）")
+        else:
+            self.parsim_action.setText("并行仿真分区（顺序仿真）")
+
+    def on_realtime_toggled(self, checked: bool):
+        """关闭实时演示模式时提示快速模式下状态面板不随回放变化"""
+        if not checked:
+            QMessageBox.information(self, "快速模式",
+                                    "仿真将尽可能快地运行，结束后按播放速度回放调度轨迹。\n"
+                                    "算力节点和网络状态面板只显示仿真结束时的状态，不随回放变化；"
+                                    "需要观察状态变化时请使用实时演示模式。")
+
+    def on_run_limits_settings(self):
+        """设置每次运行的墙钟时间、CPU 时间和内存限制，0 表示不限制，对之后启动的仿真和参数扫描生效"""
+        from sim_process import RunLimits
+        limits = self.run_limits
+        dialog = QDialog(self)
+        dialog.setWindowTitle("运行限制")
+        layout = QFormLayout(dialog)
+        wall_time = QDoubleSpinBox()
+        wall_time.setRange(0, 7 * 24 * 60)
+        wall_time.setSuffix(" 分钟")
+        wall_time.setValue((limits.wall_time or 0) / 60)
+        cpu_time = QDoubleSpinBox()
+        cpu_time.setRange(0, 7 * 24 * 60)
+        cpu_time.setSuffix(" 分钟")
+        cpu_time.setValue((limits.cpu_time or 0) / 60)
+        memory = QSpinBox()
+        memory.setRange(0, 1024 * 1024)
+        memory.setSuffix(" MB")
+        memory.setValue((limits.memory or 0) // 2 ** 20)
+        layout.addRow("墙钟时间（0 表示不限制）:", wall_time)
+        layout.addRow("CPU 时间（0 表示不限制）:", cpu_time)
+        layout.addRow("内存（0 表示不限制）:", memory)
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(dialog.accept)
+        buttons.rejected.connect(dialog.reject)
+        layout.addRow(buttons)
+        if dialog.exec() != QDialog.Accepted:
+            return
+        self.run_limits = RunLimits(wall_time=wall_time.value() * 60, cpu_time=cpu_time.value() * 60,
+                                    memory=memory.value() * 2 ** 20)
+        self.run_limits_action.setText(f"运行限制（{self.run_limits.describe()}）")
+
+    def on_allocate_ip(self):
+        """为当前拓扑自动分配子网和IP地址，已有的合法地址保持不变，可整体撤销"""
+        if not self.nodes:
+            QMessageBox.critical(self, "错误", "请先创建网络拓扑！")
+            return
+
+        command = AllocateAddressesCommand(self)
+        try:
+            report = command.allocate()
+        except Exception as e:
+            QMessageBox.critical(self, "错误", f"IP地址分配失败：{str(e)}")
+            return
+        self.undo_stack.push(command)
+
+        message = f"新分配 {len(report['assigned'])} 条链路，保留 {len(report['kept'])} 条链路的原有地址。"
+        if report["skipped"]:
+            message += "\n\n以下链路两端均不是路由器或网关，未分配地址：\n" + "\n".join(report["skipped"][:20])
+            if len(report["skipped"]) > 20:
+                message += f"\n……共 {len(report['skipped'])} 条"
+        QMessageBox.information(self, "IP地址分配", message)
+
+    def on_generate_topology(self):
+        """按参数生成合成拓扑，一次性添加到画布，可整体撤销"""
+        from topology_generator_dialog import TopologyGeneratorDialog
+        from topology_generator import generate_topology
+        dialog = TopologyGeneratorDialog(self)
+        if dialog.exec() != QDialog.Accepted:
+            return
+
+        start = time.perf_counter()
+        try:
+            # 新节点从画布上已有编号之后开始编号，避免重名
+            model = generate_topology(dialog.params(), self.indexDict)
+            if dialog.allocate_ip():
+                from ip_allocator import allocate_addresses
+                allocate_addresses(model.nodes, model.channels)
+        except Exception as e:
+            QMessageBox.critical(self, "错误", f"拓扑生成失败：{str(e)}")
+            return
+
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            self.undo_stack.push(GenerateTopologyCommand(self, model))
+        finally:
+            QApplication.restoreOverrideCursor()
+        print(f"生成拓扑：{len(model.nodes)}个节点，{len(model.channels)}条链路，"
+              f"用时{time.perf_counter() - start:.2f}s")
+
     # 清除所有节点
     def on_clear(self):
         self.nodes = []
         self.channels = []
+        self.shard_badges.clear()
         self.typeNumDict = {"UserNode": 0,
                             "ComputingNode": 0,
                             "UserGateway": 0,